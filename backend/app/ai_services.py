@@ -1,60 +1,75 @@
 import os
-import json
-import pandas as pd
-import requests
-
-# Optional sentence embedding support — try to load sentence-transformers if available.
-EMBEDDING_AVAILABLE = False
-_embed_model = None
-try:
-    from sentence_transformers import SentenceTransformer
-    _embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-    EMBEDDING_AVAILABLE = True
-    print('[AIService] sentence-transformers available — using semantic similarity')
-except Exception:
-    EMBEDDING_AVAILABLE = False
-    _embed_model = None
-
-CSV_PATH = os.path.join(os.path.dirname(__file__), "../PM_Questions_8000_expanded_clean_final5.csv")
-
-try:
-    df = pd.read_csv(CSV_PATH)
-    VALID_COMPANIES = sorted(df["Company"].dropna().unique().tolist())
-    VALID_ROLES = sorted(df["Experience Level"].dropna().unique().tolist())
-    VALID_LEVELS = sorted(df["Category"].dropna().unique().tolist())
-except Exception as e:
-    print(f"[AIService] CSV load failed: {e}")
-    VALID_COMPANIES = ["Unknown Company"]
-    VALID_ROLES = ["PM", "Senior PM", "APM", "Group PM", "Principal PM", "Director"]
-    VALID_LEVELS = ["Strategic"]
-
-SYSTEM_PROMPT = f"""
-You are an expert HR and Product Management recruiter. Read the job description carefully and extract these THREE pieces of information:
-
-1️⃣ company_name — The company hiring for this role. Match it to one of these companies if mentioned:
-{VALID_COMPANIES[:80]}
-If the company is NOT in the list above or not clearly mentioned, respond with "Unknown Company".
-
-2️⃣ years_of_experience — Infer the required years of experience from the JD. Return EXACTLY ONE of:
-   "0-2" (entry level, APM, junior PM)
-   "3-5" (mid-level PM)
-   "6-10" (senior PM)
-   "10+" (principal/director level)
-Look for keywords like "years", "experience", "senior", "junior", "lead", "direct". If not found, default to "6-10".
-
-3️⃣ level — The job category or seniority level. Match to one of these:
-{VALID_LEVELS}
-Common matches: "Strategic" (if product strategy mentioned), or relevant category.
-
-IMPORTANT RULES:
-- Return ONLY valid JSON, no extra text before or after
-- All values must be EXACTLY as shown in the examples
-- If unsure, use defaults: company="Unknown Company", years="6-10", level="Strategic"
-- Do NOT make up companies or experience levels
-
-Example valid response:
-{{"company_name": "Google", "years_of_experience": "6-10", "level": "Strategic"}}
-"""
+import time
+import asyncio
+import concurrent.futures
+import threading
+
+from .llm_client import LLMHttpClient, AsyncLLMHttpClient
+from .cache import PersistentCache, content_hash
+from .singleflight import SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .llm_scheduler import LLMScheduler, current_llm_context, run_in_llm_context
+from .embeddings import embedding_store, batch_similarities
+from .hedging import HedgePolicy, HedgeCancelled, check_cancelled, is_cancelled
+from .heuristics import heuristic_evaluate_batch
+from .llm_json import parse_llm_json
+from .llm_prefix import PrefixCacheTracker, PromptContextStore, estimate_tokens
+from .llm_profiles import profile_for
+from .llm_stream import StreamAccumulator, StreamResult, StreamStats
+from .llm_router import ModelRouter, ROUTE_ANSWER
+from .jd_cache import JDExtractionCache
+from .jd_parser import company_scanner, parse_jd
+from .multi_match import KeywordGroups
+from .question_vocab import QuestionVocabulary
+
+# Fixed per-task instructions, sent as Ollama's `system` prompt. Keeping them
+# byte-identical across calls (and the variable text in `prompt`) lets the model
+# server reuse the evaluated prefix instead of re-reading it on every request.
+ANSWER_SYSTEM_PROMPT = (
+    "You are an expert interview coach and candidate.\n"
+    "Given the question below, produce a high-quality sample answer suitable for a mid-to-senior product manager. Use a clear structure (summary, approach, example, metrics)."
+)
+
+BATCH_ANSWER_SYSTEM_PROMPT = (
+    "You are an expert interview coach. For each numbered question below, produce a high-quality model answer.\n"
+    "Output must be a single valid JSON array where each element is the model answer string for the corresponding question."
+)
+
+EVAL_SYSTEM_PROMPT = (
+    "You are an expert interview evaluator. Compare the USER_ANSWER to the IDEAL_ANSWER for the question below.\n"
+    "Produce ONLY a single valid JSON object (no extra text) with the following structure:\n"
+    "{\n"
+    "  \"similarity_score\": <float 0.0-1.0>,\n"
+    "  \"score\": <int 0-100>,\n"
+    "  \"ideal_answer\": \"<string>\",\n"
+    "  \"suggestions\": {\n"
+    "    \"rating\": \"good|satisfactory|needs_improvement\",\n"
+    "    \"feedback\": {\n"
+    "      \"comparison\": \"short human-readable comparison sentence\",\n"
+    "      \"strengths\": [\"...\"],\n"
+    "      \"improvements\": [\"...\"]\n"
+    "    }\n"
+    "  }\n"
+    "}\n\n"
+    "Guidance: keep feedback short and actionable (1-3 bullets per section). Similarity_score should be a decimal between 0 and 1. Score should be integer 0-100 roughly similarity_score*100 with professional judgment. Do NOT include internal notes or technical terms like 'fuzzy' or 'heuristic'."
+)
+
+EVAL_RETRY_SYSTEM_PROMPT = (
+    "Provide ONLY a JSON object with keys: similarity_score (0-1 float), score (0-100 int), ideal_answer (string), suggestions (object with rating and feedback)."
+)
+
+BATCH_EVAL_SYSTEM_PROMPT = (
+    "You are an expert interview evaluator. For each numbered question below, you will be given the QUESTION and the USER_ANSWER.\n"
+    "For each item, produce two things: (1) a concise IDEAL model answer, and (2) a short JSON evaluation object with keys: score (0-100), strengths (array of strings), weaknesses (array of strings), feedback (string).\n"
+    "If an item already provides an IDEAL_ANSWER, evaluate against it instead of writing a new one.\n"
+    "IMPORTANT: OUTPUT MUST BE a single valid JSON array ONLY. Do NOT include any extra commentary or surrounding text. Each array element must be an object with keys exactly: index, model_answer, score, strengths, weaknesses, feedback, where index is the item's Q number."
+)
+
+# Part of every evaluation-cache key: editing any evaluation prompt invalidates
+# the stored results (EVAL_PROMPT_VERSION forces it, e.g. after a parsing change).
+EVAL_PROMPT_VERSION = os.environ.get("EVAL_PROMPT_VERSION") or content_hash(
+    EVAL_SYSTEM_PROMPT, EVAL_RETRY_SYSTEM_PROMPT, BATCH_EVAL_SYSTEM_PROMPT
+)[:12]
 
 class AIService:
     def __init__(self):
@@ -67,25 +82,110 @@ class AIService:
         self.desired_model = os.environ.get("LLM_MODEL", "qwen2:7b-instruct")
         # If set, enforce using the LLM and do NOT fall back to the heuristic evaluator.
         self.force_llm = str(os.environ.get("LLM_FORCE", "0")).lower() in ("1", "true", "yes")
-        self._answer_cache = {}
+        # Model used for generating ideal answers through the wrapper.
+        self.answer_model = os.environ.get("LLM_ANSWER_MODEL", "llama3")
+        # Generated model answers: bounded LRU/TTL in memory, backed by the
+        # shared cache_entries table so warm answers survive restarts and are
+        # shared across workers.
+        self.answer_cache = PersistentCache(
+            "model_answer",
+            max_entries=int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "2000")),
+            ttl_seconds=float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+            persist=str(os.environ.get("ANSWER_CACHE_PERSIST", "1")).lower() in ("1", "true", "yes"),
+        )
+        # LLM evaluation results for byte-identical inputs (retakes, resubmitted
+        # answers), keyed by question, normalized answer, model-answer hash,
+        # evaluator model and EVAL_PROMPT_VERSION. Heuristic fallbacks are not stored.
+        self.eval_cache_enabled = str(os.environ.get("EVAL_CACHE", "1")).lower() in ("1", "true", "yes")
+        self.eval_cache = PersistentCache(
+            "evaluation",
+            max_entries=int(os.environ.get("EVAL_CACHE_MAX_ENTRIES", "5000")),
+            ttl_seconds=float(os.environ.get("EVAL_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            persist=str(os.environ.get("EVAL_CACHE_PERSIST", "1")).lower() in ("1", "true", "yes"),
+        )
+        # Shared breaker for the LLM endpoint: while it is open, LLM calls return
+        # immediately and callers fall through to heuristic / cached paths instead
+        # of waiting out retries and long timeouts.
+        self.breaker = CircuitBreaker(
+            "llm",
+            failure_threshold=int(os.environ.get("LLM_BREAKER_FAILURE_THRESHOLD", "5")),
+            recovery_timeout=float(os.environ.get("LLM_BREAKER_RECOVERY_SECONDS", "30")),
+            half_open_max_calls=int(os.environ.get("LLM_BREAKER_HALF_OPEN_CALLS", "1")),
+        )
+        # One admission queue for every LLM call in this process: caps concurrency
+        # at what the model server can decode and orders waiters by priority class
+        # (JD > evaluation > background) and round-robin per user.
+        self.scheduler = LLMScheduler(max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")))
+        self.queue_timeout = float(os.environ.get("LLM_QUEUE_TIMEOUT_SECONDS", "0")) or None
+        # Batch evaluation packs items into chunks of roughly this many prompt
+        # tokens (and at most this many items), sent concurrently.
+        self.eval_batch_token_budget = int(os.environ.get("EVAL_BATCH_TOKEN_BUDGET", "1500"))
+        self.eval_batch_max_items = max(1, int(os.environ.get("EVAL_BATCH_MAX_ITEMS", "4")))
+        self.eval_batch_retries = max(0, int(os.environ.get("EVAL_BATCH_RETRIES", "1")))
+        # Ask Ollama to keep the model loaded between calls (duration string or
+        # seconds; "-1" keeps it resident), so requests do not pay a reload.
+        self.keep_alive = os.environ.get("LLM_KEEP_ALIVE", "30m")
+        # Opt-in: continue from the `context` returned by a priming call with each
+        # task's system prompt instead of sending the prefix again.
+        self.reuse_context = str(os.environ.get("LLM_REUSE_CONTEXT", "0")).lower() in ("1", "true", "yes")
+        self.prefix_cache = PrefixCacheTracker()
+        # Stream /api/generate and close the stream as soon as a JSON task's
+        # object/array is complete, instead of waiting for trailing output.
+        self.stream = str(os.environ.get("LLM_STREAM", "1")).lower() in ("1", "true", "yes")
+        self.stream_stats = StreamStats()
+        self.prompt_contexts = PromptContextStore()
+        # Extraction results for JDs seen before (exact or near-duplicate text),
+        # so a re-pasted JD skips the LLM call entirely.
+        self.jd_cache = JDExtractionCache.from_env()
+        # The deterministic JD parser answers on its own at or above this
+        # confidence; below it the LLM extraction runs (1.01 disables the fast path).
+        self.jd_fast_path_min_confidence = float(os.environ.get("JD_FAST_PATH_MIN_CONFIDENCE", "0.8"))
+        # Task -> model table (JD extraction, answers, evaluation) with per-route
+        # latency budgets; a route whose p95 goes over budget is served by the
+        # next, smaller model configured for it until it recovers.
+        self.router = ModelRouter.from_env()
+        # Company / level vocabularies and the JD-extraction prompt, read from
+        # the questions table on first use instead of from the CSV at import.
+        self.vocabulary = QuestionVocabulary.from_env()
+        # Optional hedging of single-answer evaluation across the direct prompt
+        # and the wrapper route (LLM_HEDGE, off by default).
+        self.hedge = HedgePolicy.from_env()
+        # Coalesces identical concurrent LLM requests (answer generation, JD extraction).
+        self._inflight = SingleFlight()
+        # skill descriptions never change: encode them once, as soon as the model loads
+        embedding_store.register_static(" ".join(kws) for kws in self.SKILL_KEYWORDS.values())
+        # One keep-alive connection pool shared by every LLM call (and every
+        # evaluation worker thread) instead of a new TCP connection per request.
+        self.http = LLMHttpClient.from_env()
+        # Async twin used by async routes (e.g. JD extraction) so a slow LLM call
+        # awaits instead of blocking the uvicorn event loop.
+        self.async_http = AsyncLLMHttpClient.from_env()
+
+        # Model discovery talks to /api/tags (retrying while the LLM service
+        # starts), so it runs on a daemon thread instead of blocking import.
+        # Until it finishes, calls use the configured model (or llama3).
+        self.model = self.desired_model or "llama3"
+        if str(os.environ.get("LLM_MODEL_DISCOVERY", "1")).lower() in ("1", "true", "yes"):
+            threading.Thread(target=self._discover_model, name="llm-model-discovery", daemon=True).start()
 
-        if self.desired_model:
-            # Prefer the explicitly configured desired model. Set it as the model
-            # to use and attempt to verify availability; if verification fails,
-            # we still keep the desired_model so the runtime will attempt to use it.
-            self.model = self.desired_model
-            try:
-                r = requests.get(f"{self.llm_api_url}/api/tags", timeout=5)
+        print(f"[AIService] Using LLM endpoint: {self.llm_api_url}, model: {self.model}")
+
+    def _discover_model(self) -> None:
+        try:
+            if self.desired_model:
+                # Prefer the explicitly configured desired model: keep using it and
+                # only report whether the endpoint lists it; if it is missing we
+                # still attempt it and fall back on failure.
+                r = self.http.get(f"{self.llm_api_url}/api/tags", read_timeout=5)
                 models = r.json().get("models", [])
                 listed = [m.get("name", "") for m in models]
                 if not any(self.desired_model == n or self.desired_model in n for n in listed):
                     print(f"[AIService] Desired model '{self.desired_model}' not listed by LLM endpoint; will still attempt to use it and fallback on failure.")
-            except Exception as e:
-                print(f"[AIService] Could not contact LLM tags endpoint to verify desired model: {e}; will attempt to use desired model and fallback on errors.")
-        else:
-            self.model = self._get_available_model()
-
-        print(f"[AIService] Using LLM endpoint: {self.llm_api_url}, model: {self.model}")
+            else:
+                self.model = self._get_available_model()
+                print(f"[AIService] Discovered LLM model: {self.model}")
+        except Exception as e:
+            print(f"[AIService] Could not contact LLM tags endpoint to verify desired model: {e}; will attempt to use desired model and fallback on errors.")
 
     def _get_available_model(self):
         # Try to query the tags endpoint a few times in case the LLM service
@@ -95,7 +195,7 @@ class AIService:
         delay = 2
         for attempt in range(tries):
             try:
-                r = requests.get(f"{self.llm_api_url}/api/tags", timeout=5)
+                r = self.http.get(f"{self.llm_api_url}/api/tags", read_timeout=5)
                 models = r.json().get("models", [])
                 if models:
                     # If a desired model was configured, prefer it when returned by the endpoint
@@ -114,7 +214,6 @@ class AIService:
             except Exception:
                 # Sleep briefly and retry
                 try:
-                    import time
                     time.sleep(delay)
                 except Exception:
                     pass
@@ -124,46 +223,297 @@ class AIService:
             return self.desired_model
         return "llama3"
 
-    def _query_ollama(self, prompt: str) -> str:
+    def pool_stats(self) -> dict:
+        """Connection-pool statistics for the shared LLM HTTP clients."""
+        return {**self.http.stats(), "async": self.async_http.stats()}
+
+    async def aclose(self) -> None:
+        await self.async_http.aclose()
+        self.http.close()
+
+    def _guarded_post(self, url: str, **kwargs):
+        """POST through the shared pool, the LLM scheduler and the circuit breaker.
+        Raises CircuitOpenError without touching the network (or queueing) while
+        the circuit is open; connection errors and 5xx responses count as breaker
+        failures."""
+        if self.breaker.is_open():
+            raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+        with self.scheduler.slot(timeout=self.queue_timeout):
+            check_cancelled()
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+            try:
+                resp = self.http.post(url, **kwargs)
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+        if resp.status_code >= 500:
+            self.breaker.record_failure(f"HTTP {resp.status_code}")
+        else:
+            self.breaker.record_success()
+        return resp
+
+    async def _aguarded_post(self, url: str, **kwargs):
+        """Async counterpart of `_guarded_post`."""
+        if self.breaker.is_open():
+            raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+        async with self.scheduler.aslot(timeout=self.queue_timeout):
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+            try:
+                resp = await self.async_http.post(url, **kwargs)
+            except asyncio.CancelledError:
+                # no outcome: free a half-open probe slot instead of holding it forever
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+        if resp.status_code >= 500:
+            self.breaker.record_failure(f"HTTP {resp.status_code}")
+        else:
+            self.breaker.record_success()
+        return resp
+
+    def _guarded_stream(self, url: str, payload: dict, deadline: float, expect: str | None) -> tuple[int, StreamResult]:
+        """Streamed POST through the scheduler and breaker (see `_guarded_post`).
+        The body is consumed inside the scheduler slot and the connection closed
+        as soon as the expected JSON value is complete (app/llm_stream.py), or
+        as soon as a hedged call is cancelled (raises HedgeCancelled)."""
+        if self.breaker.is_open():
+            raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+        cancelled = False
+        with self.scheduler.slot(timeout=self.queue_timeout):
+            # a hedged call that lost while queued gives its slot straight back
+            check_cancelled()
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+            try:
+                resp = self.http.post(url, json=payload, read_timeout=deadline, stream=True)
+                try:
+                    if resp.status_code >= 400:
+                        result = StreamResult(body=self._json_or_empty(resp))
+                    else:
+                        acc = StreamAccumulator(expect, deadline)
+                        for line in resp.iter_lines():
+                            if is_cancelled():
+                                cancelled = True
+                                break
+                            if acc.add_line(line):
+                                break
+                        result = acc.result()
+                finally:
+                    resp.close()
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+        if resp.status_code >= 500:
+            self.breaker.record_failure(f"HTTP {resp.status_code}")
+        else:
+            self.breaker.record_success()
+        if cancelled:
+            raise HedgeCancelled("hedged LLM stream closed")
+        self.stream_stats.record(result)
+        return resp.status_code, result
+
+    async def _aguarded_stream(self, url: str, payload: dict, deadline: float, expect: str | None) -> tuple[int, StreamResult]:
+        """Async counterpart of `_guarded_stream`."""
+        if self.breaker.is_open():
+            raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+        async with self.scheduler.aslot(timeout=self.queue_timeout):
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(f"LLM circuit open; skipping {url}")
+            try:
+                resp = await self.async_http.stream("POST", url, json=payload, read_timeout=deadline)
+                try:
+                    if resp.status_code >= 400:
+                        await resp.aread()
+                        result = StreamResult(body=self._json_or_empty(resp))
+                    else:
+                        acc = StreamAccumulator(expect, deadline)
+                        async for line in resp.aiter_lines():
+                            if acc.add_line(line):
+                                break
+                        result = acc.result()
+                finally:
+                    await resp.aclose()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise
+        if resp.status_code >= 500:
+            self.breaker.record_failure(f"HTTP {resp.status_code}")
+        else:
+            self.breaker.record_success()
+        self.stream_stats.record(result)
+        return resp.status_code, result
+
+    def _generate_once(self, payload: dict, deadline: float, task: str) -> tuple[int, dict, str]:
+        """One `/api/generate` call: (status code, final JSON body, output text)."""
+        url = f"{self.llm_api_url}/api/generate"
+        if not self.stream:
+            response = self._guarded_post(url, json=payload, read_timeout=deadline)
+            body = response.json()
+            return response.status_code, body, self._response_text(body)
+        expect = profile_for(task).expect_json
+        status, result = self._guarded_stream(url, self._stream_payload(payload, expect), deadline, expect)
+        return status, result.body, self._stream_text(task, result)
+
+    async def _agenerate_once(self, payload: dict, deadline: float, task: str) -> tuple[int, dict, str]:
+        """Async counterpart of `_generate_once`."""
+        url = f"{self.llm_api_url}/api/generate"
+        if not self.stream:
+            response = await self._aguarded_post(url, json=payload, read_timeout=deadline)
+            body = response.json()
+            return response.status_code, body, self._response_text(body)
+        expect = profile_for(task).expect_json
+        status, result = await self._aguarded_stream(url, self._stream_payload(payload, expect), deadline, expect)
+        return status, result.body, self._stream_text(task, result)
+
+    @staticmethod
+    def _json_or_empty(resp) -> dict:
+        try:
+            body = resp.json()
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    @staticmethod
+    def _stream_payload(payload: dict, expect: str | None) -> dict:
+        # `json_expect` lets the wrapper stop its own Ollama stream early; Ollama ignores it
+        payload = {**payload, "stream": True}
+        if expect:
+            payload["json_expect"] = expect
+        return payload
+
+    def _stream_text(self, task: str, result: StreamResult) -> str:
+        if not result.streamed:
+            return self._response_text(result.body)
+        if result.stopped_early:
+            print(f"[AIService] Closed LLM stream for task={task} once its JSON was complete ({result.chunks} chunks)")
+        return result.text.strip()
+
+    @staticmethod
+    def _response_text(resp_json: dict) -> str:
+        # Try multiple possible response structures
+        raw_text = (
+            resp_json.get("response")
+            or resp_json.get("data", {}).get("output_text")
+            or resp_json.get("message")
+            or resp_json.get("text")
+            or ""
+        )
+        return (raw_text or "").strip()
+
+    def _task_default_model(self, task: str) -> str:
+        return self.answer_model if ModelRouter.route_of(task) == ROUTE_ANSWER else self.model
+
+    def _route_model(self, task: str) -> str:
+        """Model currently serving `task` (see app/llm_router.py)."""
+        return self.router.model_for(task, self._task_default_model(task))
+
+    def _record_latency(self, task: str, model: str, started: float, ok: bool = True) -> None:
+        self.router.record(task, model, time.monotonic() - started, ok=ok, default=self._task_default_model(task))
+
+    def _call_options(self, task: str, prompt: str, system: str | None, items: int = 1) -> tuple[dict, float]:
+        """(Ollama options, read timeout) for one call from the task's generation
+        profile (app/llm_profiles.py): capped output, shared num_ctx, and a
+        deadline derived from the cap instead of the global LLM_READ_TIMEOUT."""
+        profile = profile_for(task)
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+        deadline = min(self.http.read_timeout, profile.deadline_seconds(items, prompt_tokens))
+        return profile.options(items, prompt_tokens), deadline
+
+    def _generate_payload(self, prompt: str, system: str | None = None, context: list | None = None, model: str | None = None, **extra) -> dict:
+        """`/api/generate` body: the stable instructions go in `system`, only the
+        per-request text in `prompt`. With a primed `context` the system prompt is
+        already part of it and is not sent again."""
+        payload = {"model": model or self.model, "prompt": prompt, "stream": False, "keep_alive": self.keep_alive, **extra}
+        if context:
+            payload["context"] = context
+        elif system:
+            payload["system"] = system
+        return payload
+
+    def _prime_context(self, system: str, model: str | None = None, task: str = "generate") -> list | None:
+        """LLM_REUSE_CONTEXT: evaluate `system` once and keep the returned context."""
+        model = model or self.model
+        context = self.prompt_contexts.get(model, system)
+        if context is not None:
+            return context
+        # same num_ctx as the task's calls, or Ollama would reload the model
+        options, deadline = self._call_options(task, "", system)
+        try:
+            response = self._guarded_post(
+                f"{self.llm_api_url}/api/generate",
+                json=self._generate_payload("Reply with OK.", system, model=model, options={**options, "num_predict": 1}),
+                read_timeout=deadline,
+            )
+            context = response.json().get("context")
+        except Exception as e:
+            print(f"[AIService] Context priming failed: {e}")
+            return None
+        if not context:
+            # the endpoint does not return context (e.g. an older wrapper): stop trying
+            print("[AIService] LLM endpoint returned no context; disabling LLM_REUSE_CONTEXT")
+            self.reuse_context = False
+            return None
+        self.prompt_contexts.set(model, system, context)
+        return context
+
+    def _record_prefix(self, task: str, system: str | None, prompt: str, resp_json: dict) -> None:
+        hit = self.prefix_cache.record(task, system, prompt, resp_json)
+        if hit is False and system:
+            print(f"[AIService] Prefix cache miss for task={task} (prompt_eval_count={resp_json.get('prompt_eval_count')})")
+
+    def _query_ollama(self, prompt: str, system: str | None = None, task: str = "generate", items: int = 1,
+                      model: str | None = None) -> str:
         """
         Send prompt to the configured LLM endpoint and return the model's text output.
         Adds flexible parsing for different JSON response formats and detailed error logs.
+        `system` carries the task's fixed instructions (see the *_SYSTEM_PROMPT
+        constants); `task` selects the model route and generation profile and
+        labels the call in the statistics; `items` is the batch size for batch tasks.
+        `model` pins the model instead of routing (callers that key caches by it).
         """
         tries = 3
         delay = 1
         last_exc = None
+        model = model or self._route_model(task)
+        context = self._prime_context(system, model, task) if (self.reuse_context and system) else None
+        options, deadline = self._call_options(task, prompt, system, items)
+        print(f"[AIService] LLM call model={model} task={task} options={options} deadline={deadline:.0f}s")
 
         for attempt in range(tries):
+            started = time.monotonic()
             try:
-                response = requests.post(
-                    f"{self.llm_api_url}/api/generate",
-                    json={"model": self.model, "prompt": prompt, "stream": False},
-                    timeout=600,
-                )
-
-                # Try multiple possible response structures
-                resp_json = response.json()
-                raw_text = (
-                    resp_json.get("response")
-                    or resp_json.get("data", {}).get("output_text")
-                    or resp_json.get("message")
-                    or resp_json.get("text")
-                    or ""
+                check_cancelled()
+                status, resp_json, raw_text = self._generate_once(
+                    self._generate_payload(prompt, system, context, model=model, options=options), deadline, task
                 )
-
-                raw_text = (raw_text or "").strip()
+                self._record_latency(task, model, started, ok=status < 400)
+                self._record_prefix(task, system, prompt, resp_json)
 
                 # Optional: small debug log for troubleshooting
                 if not raw_text:
-                    print(f"[AIService] Empty response on attempt {attempt+1} from {self.llm_api_url}, model={self.model}")
+                    print(f"[AIService] Empty response on attempt {attempt+1} from {self.llm_api_url}, model={model}")
                 else:
                     return raw_text
 
+            except CircuitOpenError as e:
+                # fail fast: no point retrying against an endpoint known to be down
+                last_exc = e
+                break
+            except HedgeCancelled:
+                # the other hedged path already answered
+                raise
             except Exception as e:
                 last_exc = e
+                self._record_latency(task, model, started, ok=False)
                 print(f"[AIService] LLM query error on attempt {attempt+1}: {e}")
                 try:
-                    import time
                     time.sleep(delay)
                     delay *= 2
                 except Exception:
@@ -172,6 +522,47 @@ class AIService:
         print(f"[Ollama error] Failed after {tries} attempts: {last_exc}")
         return ""
 
+    async def _aquery_ollama(self, prompt: str, system: str | None = None, task: str = "generate", items: int = 1,
+                             model: str | None = None) -> str:
+        """Async variant of `_query_ollama` for async routes: same retries and
+        backoff, but awaits the HTTP call and the sleeps instead of blocking."""
+        tries = 3
+        delay = 1
+        last_exc = None
+        model = model or self._route_model(task)
+        context = None
+        if self.reuse_context and system:
+            context = self.prompt_contexts.get(model, system)
+            if context is None:
+                context = await asyncio.to_thread(self._prime_context, system, model, task)
+        options, deadline = self._call_options(task, prompt, system, items)
+        print(f"[AIService] LLM call model={model} task={task} options={options} deadline={deadline:.0f}s")
+
+        for attempt in range(tries):
+            started = time.monotonic()
+            try:
+                status, resp_json, raw_text = await self._agenerate_once(
+                    self._generate_payload(prompt, system, context, model=model, options=options), deadline, task
+                )
+                self._record_latency(task, model, started, ok=status < 400)
+                self._record_prefix(task, system, prompt, resp_json)
+                if not raw_text:
+                    print(f"[AIService] Empty response on attempt {attempt+1} from {self.llm_api_url}, model={model}")
+                else:
+                    return raw_text
+            except CircuitOpenError as e:
+                last_exc = e
+                break
+            except Exception as e:
+                last_exc = e
+                self._record_latency(task, model, started, ok=False)
+                print(f"[AIService] Async LLM query error on attempt {attempt+1}: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        print(f"[Ollama error] Failed after {tries} attempts: {last_exc}")
+        return ""
+
     def _wrapper_generate_answer(self, question_text: str, skills: list | None = None, model: str | None = None) -> str:
         """Call the LLM wrapper `/api/generate-answer` to get a single structured model answer."""
         try:
@@ -179,12 +570,18 @@ class AIService:
             payload = {"question": question_text, "skills": skills or []}
             if model:
                 payload["model"] = model
-            resp = requests.post(url, json=payload, timeout=600)
+            started = time.monotonic()
+            # the wrapper applies the "answer" generation profile itself
+            resp = self._guarded_post(url, json=payload, read_timeout=self._call_options("answer", question_text, None)[1])
+            if model:
+                self._record_latency("answer", model, started, ok=resp.status_code == 200)
             if resp.status_code == 200:
                 data = resp.json()
                 # wrapper returns {'answer': '...'}
                 ans = data.get('answer') or data.get('response') or ''
                 return (ans or '').strip()
+        except CircuitOpenError:
+            pass
         except Exception as e:
             print(f"[AIService _wrapper_generate_answer error] {e}")
         return ""
@@ -201,7 +598,13 @@ class AIService:
                 payload['model'] = model
             elif getattr(self, 'eval_model_override', None):
                 payload['model'] = getattr(self, 'eval_model_override')
-            resp = requests.post(url, json=payload, timeout=600)
+            started = time.monotonic()
+            # the wrapper may make an "evaluate" call and an "evaluate_retry" call
+            text = f"{question_text}\n{user_answer}\n{model_answer or ''}"
+            deadline = self._call_options("evaluate", text, None)[1] + self._call_options("evaluate_retry", text, None)[1]
+            resp = self._guarded_post(url, json=payload, read_timeout=min(self.http.read_timeout, deadline))
+            if payload.get('model'):
+                self._record_latency("evaluate", payload['model'], started, ok=resp.status_code == 200)
             if resp.status_code == 200:
                 data = resp.json()
                 # Normalize possible wrapper structures: accept nested suggestions.feedback or top-level keys
@@ -223,9 +626,16 @@ class AIService:
                 out['improvements'] = improvements or []
                 out['feedback'] = feedback_text or ''
                 out['suggestions'] = data.get('suggestions') or {}
+                # the wrapper's "evaluation unavailable" placeholder (flagged by
+                # newer wrappers, recognized by its text for older ones)
+                out['fallback'] = bool(data.get('fallback')) or str(out['feedback']).startswith('Evaluation unavailable')
                 return out
             else:
                 print(f"[AIService _wrapper_evaluate_answer] HTTP {resp.status_code}: {resp.text[:200]}")
+        except CircuitOpenError:
+            pass
+        except HedgeCancelled:
+            raise
         except Exception as e:
             print(f"[AIService _wrapper_evaluate_answer error] {e}")
         return {}
@@ -242,6 +652,59 @@ class AIService:
                 return v
         return valid_list[0]
 
+    def _answer_cache_key(self, question_text: str, skills: list | None = None, model: str | None = None) -> str:
+        """Cache key for a generated model answer: question-text hash + skills + model.
+
+        Only answers from `answer_model` itself are cached (see
+        `_caches_answers_from`), so lookups use it by default."""
+        skills_key = ",".join(sorted({(s or "").strip().lower() for s in (skills or []) if s}))
+        return content_hash((question_text or "").strip(), skills_key, model or self.answer_model)
+
+    def _caches_answers_from(self, model: str) -> bool:
+        """True when answers produced by `model` may be cached. A downgraded
+        answer route (app/llm_router.py) serves a smaller fallback model; its
+        answers are returned but not stored under `answer_model`, which is what
+        the cache and precompute_answers.py stand for."""
+        return model == self.answer_model
+
+    def _caches_evaluations_from(self, model: str) -> bool:
+        """True when evaluations produced by `model` may be cached: only the
+        evaluate route's primary, never a downgraded fallback model."""
+        return model == self.router.primary("evaluate", self.model)
+
+    def _eval_cache_key(self, kind: str, question_text: str, user_answer: str, model_answer: str | None,
+                        skills: list | None = None) -> str:
+        """Evaluation-cache key. `kind` separates single ("single") and batch
+        ("batch") results, whose shapes differ; whitespace-only edits of the
+        answer map to the same key. The evaluate route's primary model is part
+        of the key, and only its results are stored (`_caches_evaluations_from`)."""
+        normalized = " ".join((user_answer or "").split())
+        skills_key = ",".join(sorted({(s or "").strip().lower() for s in (skills or []) if s}))
+        return content_hash(
+            kind,
+            (question_text or "").strip(),
+            normalized,
+            content_hash((model_answer or "").strip()),
+            skills_key,
+            self.router.primary("evaluate", self.model),
+            EVAL_PROMPT_VERSION,
+        )
+
+    @staticmethod
+    def _cacheable_evaluation(result: dict) -> bool:
+        """Only real evaluations go into the evaluation cache: a valid 0-100
+        score (the batch path's validation) and some actual feedback, never a
+        placeholder, so one transient LLM failure is not replayed for a week."""
+        if not isinstance(result, dict) or result.get('fallback'):
+            return False
+        try:
+            score = int(round(float(result.get('score'))))
+        except (TypeError, ValueError):
+            return False
+        if not 0 <= score <= 100:
+            return False
+        return bool(result.get('feedback') or result.get('strengths') or result.get('weaknesses'))
+
     def _fallback_model_answer(self, question_text: str, skills: list | None = None) -> str:
         """Deterministic high-quality scaffolded model answer used when the LLM
         is unavailable. This produces a detailed, multi-paragraph answer that
@@ -266,108 +729,20 @@ class AIService:
           - metrics (numbers, % or terms like 'NPS', 'retention')
         The function returns score (0-100), strengths, weaknesses, and feedback.
         """
-        ua = (user_answer or "").strip()
-        ma = (model_answer or "").strip()
-
-        # token-level signals
-        ua_lower = ua.lower()
-        ma_lower = ma.lower()
-        tokens_ua = set([t for t in ua_lower.split() if t])
-        tokens_ma = set([t for t in ma_lower.split() if t])
-        overlap = len(tokens_ua & tokens_ma)
-
-        # structural and content signals
-        has_summary = any(kw in ua_lower for kw in ["i would","my approach","summary","approach","steps","first"]) or len(ua.split()) > 40
-        has_example = any(kw in ua_lower for kw in ["example","project","launched","led","implemented","we did","for example"]) or any(ch.isdigit() for ch in ua)
-        has_metrics = any(kw in ua_lower for kw in ["nps","%","percent","retention","growth","metric","kpi","users"]) or any(token.isdigit() for token in ua_lower.split())
-
-        # base signals -> flexible weighted composition to increase spread
-        # overlap contributes strongly when present; length contributes modestly
-        overlap_score = min(70, int((overlap / max(1, len(tokens_ma))) * 70)) if tokens_ma else 0
-        length_score = min(20, int((len(ua.split()) / 50) * 20))
-        bonus = 0
-        if has_summary: bonus += 6
-        if has_example: bonus += 10
-        if has_metrics: bonus += 8
-
-        raw = overlap_score + length_score + bonus
-
-        # deterministic tip/template selection for varied, sensible feedback
-        rnd = __import__('random').Random()
-        rnd.seed((question_text or '') + '|' + (ua or ''))
-        tip_templates = [
-            "Start with a one-sentence summary, then outline 2–4 steps, and finish with expected impact.",
-            "Use the STAR format: Situation → Task → Action → Result. Be concise and include metrics.",
-            "Quantify impact where possible (e.g., % lift, absolute users). Mention how you'd measure success.",
-            "Lead with the decision, then explain trade-offs and measurable outcomes. This helps interviewers follow your thinking.",
-        ]
-        tip = rnd.choice(tip_templates)
-
-        # build score with topical relevance and length signals, plus small deterministic jitter
-        topical = int(min(70, (overlap / max(1, len(tokens_ma))) * 70)) if tokens_ma else 0
-        length_sig = min(30, int((len(ua.split()) / 60) * 30))
-        base = topical + length_sig
-        jitter = rnd.randint(-6, 6)
-        score = int(max(0, min(100, base + jitter)))
-
-        # build readable strengths/weaknesses and short actionable tips
-        strengths = []
-        weaknesses = []
-        tips = []
-        if overlap > 0:
-            strengths.append('You covered some of the key points from the ideal answer.')
-        if has_example:
-            strengths.append('Good — you used a short example to illustrate your point.')
-        if has_metrics:
-            strengths.append('Nice use of metrics to quantify impact.')
-
-        if not has_example:
-            weaknesses.append('Missing a concise example — add a 1–2 sentence STAR example (Situation, Action, Result).')
-            tips.append('Pick one relevant project and state what you changed and the measurable outcome.')
-        if not has_metrics:
-            weaknesses.append('No concrete metrics — include an outcome (e.g., % increase, absolute numbers).')
-            tips.append('State the metric you would track and the expected lift (e.g., +8% conversion).')
-        if not any(k in ua_lower for k in ['summary','i would','in short','approach','steps']):
-            weaknesses.append('Starts without a one-line summary — lead with your recommendation.')
-            tips.append("Open with a 1-line recommendation, then list 2–3 steps and finish with impact.")
-
-        # Missing model points (short list) — give a few example sentences the user missed
-        missing_points = []
-        try:
-            ma_sents = [s.strip() for s in __import__('re').split(r"(?<=[.?!])\s+", ma) if s.strip()]
-            for s in ma_sents[:4]:
-                words = set([w for w in s.lower().split() if w])
-                if len(words & tokens_ua) / max(1, len(words)) < 0.25:
-                    missing_points.append(s)
-        except Exception:
-            missing_points = []
-
-        # Compose short, user-friendly feedback
-        feedback_lines = [f"Score: {score}/100."]
-        if strengths:
-            feedback_lines.append('What went well:')
-            for s in strengths:
-                feedback_lines.append(f"- {s}")
-        if weaknesses:
-            feedback_lines.append('What to improve:')
-            for w in weaknesses:
-                feedback_lines.append(f"- {w}")
-        if tips:
-            feedback_lines.append('Quick tips:')
-            for t in tips[:2]:
-                feedback_lines.append(f"- {t}")
-        if missing_points:
-            feedback_lines.append('Example points you could add:')
-            for p in missing_points[:3]:
-                feedback_lines.append(f"- {p}")
-        feedback_lines.append('Try: Summary → Approach → Example → Metric.')
-
-        return {
-            'score': int(score),
-            'strengths': strengths,
-            'weaknesses': weaknesses,
-            'feedback': '\n'.join(feedback_lines),
-        }
+        return heuristic_evaluate_batch([(question_text, user_answer, model_answer)])[0]
+
+    def heuristic_fallback_active(self) -> bool:
+        """True when the LLM circuit is open and heuristics are allowed, i.e. every
+        answer of a submission would end up on the heuristic path anyway."""
+        return self.breaker.is_open() and os.environ.get('ALLOW_HEURISTIC', '1') == '1'
+
+    def heuristic_evaluate_batch(self, items: list[dict]) -> list[dict]:
+        """`_heuristic_evaluate` for a whole submission in one vectorized pass.
+        Items are dicts with question, user_answer and model_answer."""
+        return heuristic_evaluate_batch(
+            (it.get("question") or "", it.get("user_answer") or "", it.get("model_answer") or "")
+            for it in items
+        )
 
     def _label_for_score(self, score: int) -> str:
         if score >= 85:
@@ -477,6 +852,54 @@ class AIService:
         "execution": ["execution","launch","timeline","milestone","stakeholder","resourcing","delivery","implementation"]
     }
 
+    # Answer-level signals for the per-skill heuristic (substring matches)
+    EXAMPLE_SIGNALS = ["example", "project", "launched", "led", "for instance"]
+    METRIC_SIGNALS = ["%", "percent", "nps", "kpi", "metric", "users", "retention", "growth"]
+    STRUCTURE_SIGNALS = ["i would", "approach", "steps", "first", "second", "then", "finally", "summary"]
+
+    # One matcher over every skill keyword and signal list, so an answer is
+    # scanned once per request instead of once per keyword per skill.
+    _SIGNAL_GROUPS = KeywordGroups({
+        "example": EXAMPLE_SIGNALS,
+        "metric": METRIC_SIGNALS,
+        "structure": STRUCTURE_SIGNALS,
+        **{f"skill:{name}": kws for name, kws in SKILL_KEYWORDS.items()},
+    })
+
+    def _embedding_similarities(self, triples: list[tuple]) -> list:
+        """Semantic signals for (user_answer, model_answer, skills) triples in one
+        batched encode. Returns one {"answer": float, "skills": {skill: float}} per
+        triple, or Nones while the embedding model is not ready."""
+        if not triples or not embedding_store.model.ready:
+            return [None] * len(triples)
+        skill_names = []
+        for _ua, _ma, skills in triples:
+            for sk in skills:
+                if sk not in skill_names:
+                    skill_names.append(sk)
+        skill_texts = [" ".join(self.SKILL_KEYWORDS.get(sk, [])) for sk in skill_names]
+        try:
+            sims = batch_similarities(
+                embedding_store,
+                [(ua or "").strip() for ua, _ma, _sk in triples],
+                [(ma or "").strip() for _ua, ma, _sk in triples],
+                skill_texts,
+            )
+        except Exception as e:
+            print(f"[AIService embeddings] batch encode failed: {e}")
+            sims = None
+        if sims is None:
+            return [None] * len(triples)
+        answer_sims, skill_sims = sims
+        col = {sk: j for j, sk in enumerate(skill_names)}
+        return [
+            {
+                "answer": float(answer_sims[i]),
+                "skills": {sk: float(skill_sims[i, col[sk]]) for sk in skills},
+            }
+            for i, (_ua, _ma, skills) in enumerate(triples)
+        ]
+
     def _skill_heuristic_eval(self, question_text: str, user_answer: str, model_answer: str, skills: list[str] | None = None) -> dict:
         """Produce a per-skill breakdown (score, strengths, weaknesses, feedback).
 
@@ -501,24 +924,18 @@ class AIService:
         rnd = __import__('random').Random()
         rnd.seed(seed_key)
 
-        # Prepare skill descriptions for embedding if available
-        skill_texts = {sk: " ".join(self.SKILL_KEYWORDS.get(sk, [])) for sk in candidates}
+        # None until the background warm-up has finished; keyword path until then.
+        similarities = self._embedding_similarities([(ua, ma, candidates)])[0]
+        answer_sim = similarities.get("answer") if similarities else None
+        skill_sims = similarities.get("skills", {}) if similarities else {}
 
-        ua_vec = None
-        model_vec = None
-        skill_vecs = {}
-        if EMBEDDING_AVAILABLE and _embed_model is not None:
-            try:
-                ua_vec = _embed_model.encode([ua], convert_to_numpy=True)[0]
-                model_vec = _embed_model.encode([ma], convert_to_numpy=True)[0]
-                texts = [skill_texts[sk] for sk in candidates]
-                vecs = _embed_model.encode(texts, convert_to_numpy=True)
-                for i, sk in enumerate(candidates):
-                    skill_vecs[sk] = vecs[i]
-            except Exception:
-                ua_vec = None
-                model_vec = None
-                skill_vecs = {}
+        # every keyword/signal present in the answer, from a single scan
+        found = self._SIGNAL_GROUPS.keywords_in(ua_lower)
+        found_groups = self._SIGNAL_GROUPS.groups_of(found)
+        has_digit = any(ch.isdigit() for ch in ua)
+        has_example = "example" in found_groups or has_digit
+        has_metric = "metric" in found_groups or has_digit
+        has_structure = "structure" in found_groups or len(ua.split()) > 40
 
         # tip template bank to vary tips deterministically
         tip_bank = [
@@ -533,37 +950,15 @@ class AIService:
             keywords = self.SKILL_KEYWORDS.get(key.lower(), []) if isinstance(self.SKILL_KEYWORDS, dict) else self.SKILL_KEYWORDS.get(key, [])
 
             # semantic similarity signals (stronger weight when available)
-            semantic_skill_sim = None
-            if ua_vec is not None and sk in skill_vecs:
-                try:
-                    import numpy as _np
-                    sdot = float(_np.dot(ua_vec, skill_vecs[sk]))
-                    snorm = float(_np.linalg.norm(ua_vec) * _np.linalg.norm(skill_vecs[sk]))
-                    semantic_skill_sim = sdot / snorm if snorm > 0 else 0.0
-                except Exception:
-                    semantic_skill_sim = None
-
-            semantic_similarity = None
-            if ua_vec is not None and model_vec is not None:
-                try:
-                    import numpy as _np
-                    dot = float(_np.dot(ua_vec, model_vec))
-                    norm = float(_np.linalg.norm(ua_vec) * _np.linalg.norm(model_vec))
-                    semantic_similarity = dot / norm if norm > 0 else 0.0
-                except Exception:
-                    semantic_similarity = None
+            semantic_skill_sim = skill_sims.get(sk)
+            semantic_similarity = answer_sim
 
             # keyword coverage and overlap
-            kw_present = sum(1 for kw in keywords if kw in ua_lower)
+            kw_present = sum(1 for kw in keywords if kw in found)
             kw_ratio = kw_present / max(1, len(keywords)) if keywords else 0.0
             overlap = len([w for w in ua_tokens if w in ma_tokens])
             overlap_ratio = overlap / max(1, len(ma_tokens)) if ma_tokens else 0.0
 
-            # signals
-            has_example = any(tok in ua_lower for tok in ["example", "project", "launched", "led", "for instance"]) or any(ch.isdigit() for ch in ua)
-            has_metric = any(tok in ua_lower for tok in ["%", "percent", "nps", "kpi", "metric", "users", "retention", "growth"]) or any(ch.isdigit() for ch in ua)
-            has_structure = any(kw in ua_lower for kw in ["i would", "approach", "steps", "first", "second", "then", "finally", "summary"]) or len(ua.split()) > 40
-
             # Compose a richer score: prefer embeddings when available and scale to produce wider spread
             if semantic_skill_sim is not None:
                 semantic_component = min(80, int(semantic_skill_sim * 80))
@@ -655,6 +1050,23 @@ class AIService:
         model answer strings matching the input order. Falls back to per-question
         generation when the LLM endpoint cannot provide a structured array.
         """
+        # Serve what we can from the answer cache and only ask the LLM for misses.
+        keys = [self._answer_cache_key(q.get('question') or q.get('text') or '', q.get('skills') or []) for q in questions]
+        cached = [self.answer_cache.get(k) for k in keys]
+        missing = [i for i, c in enumerate(cached) if not c]
+        if not missing:
+            return [str(c) for c in cached]
+        if len(missing) < len(questions):
+            answers = self.generate_answers_batch([questions[i] for i in missing])
+            out = list(cached)
+            for i, a in zip(missing, answers):
+                out[i] = a
+            return [str(a) for a in out]
+
+        # Identical batches submitted concurrently share one in-flight generation.
+        return self._inflight.do(("answers", tuple(keys)), self._generate_answers_batch_uncached, questions)
+
+    def _generate_answers_batch_uncached(self, questions: list[dict]) -> list:
         try:
             parts = []
             for i, q in enumerate(questions):
@@ -663,28 +1075,27 @@ class AIService:
                 sk = f"\nSkills: {', '.join(sks)}" if sks else ''
                 parts.append(f"Q{i+1}: {qq}{sk}")
 
-            prompt = (
-                "You are an expert interview coach. For each numbered question below, produce a high-quality model answer.\n"
-                "Output must be a single valid JSON array where each element is the model answer string for the corresponding question.\n\n"
-                "Questions:\n" + "\n".join(parts) + "\n\nJSON:\n"
-            )
-            raw = self._query_ollama(prompt)
-            if raw and raw.strip():
-                try:
-                    data = json.loads(raw)
-                    if isinstance(data, list) and len(data) == len(questions):
-                        return [str(x) for x in data]
-                except Exception:
-                    # try to extract JSON array substring
-                    start = raw.find('[')
-                    end = raw.rfind(']')
-                    if start != -1 and end != -1 and end > start:
-                        try:
-                            data = json.loads(raw[start:end+1])
-                            if isinstance(data, list) and len(data) == len(questions):
-                                return [str(x) for x in data]
-                        except Exception:
-                            pass
+            prompt = "Questions:\n" + "\n".join(parts) + "\n\nJSON:\n"
+            model = self._route_model("answers_batch")
+            raw = self._query_ollama(prompt, BATCH_ANSWER_SYSTEM_PROMPT, task="answers_batch", items=len(questions), model=model)
+            parsed = parse_llm_json(raw, "array")
+            recovered = [(pos, x) for pos, x in parsed.indexed_items() if pos < len(questions) and x]
+            if recovered and parsed.items_found <= len(questions):
+                answers = [None] * len(questions)
+                for pos, x in recovered:
+                    answers[pos] = str(x)
+                    q = questions[pos]
+                    if len(answers[pos]) > 20 and self._caches_answers_from(model):
+                        self.answer_cache.set(self._answer_cache_key(q.get('question') or q.get('text') or '', q.get('skills') or []), answers[pos])
+                missing = [i for i, a in enumerate(answers) if not a]
+                if missing:
+                    # only the answers the model dropped or garbled go to the per-question path
+                    print(f"[AIService generate_answers_batch] recovered {len(recovered)}/{len(questions)} answers (truncated={parsed.truncated}); generating {len(missing)} individually")
+                    for i in missing:
+                        qa = questions[i].get('question') or questions[i].get('text') or ''
+                        sk = questions[i].get('skills') or []
+                        answers[i] = self.generate_answer(qa, sk) or self._fallback_model_answer(qa, sk)
+                return answers
 
             # If LLM didn't return structured output, log warning and continue to fallback
             print(f"[AIService generate_answers_batch] LLM did not return structured batch answers, using per-question fallback")
@@ -699,10 +1110,9 @@ class AIService:
             for q in questions:
                 qa = q.get('question') or q.get('text') or ''
                 sk = q.get('skills') or []
-                a = self._wrapper_generate_answer(qa, sk, model='llama3')
-                if not a:
-                    # fallback to existing generate_answer which may call LLM directly
-                    a = self.generate_answer(qa, sk)
+                # generate_answer tries the wrapper first, then the LLM directly,
+                # and caches what it gets
+                a = self.generate_answer(qa, sk)
                 out.append(a or self._fallback_model_answer(qa, sk))
             return out
         except Exception as e:
@@ -727,117 +1137,78 @@ class AIService:
         when the LLM is unavailable (unless force_llm is enabled, in which case an
         exception is raised).
         """
-        key = (question_text or "").strip()
+        key = self._answer_cache_key(question_text, skills)
         try:
-            if key in self._answer_cache:
-                return self._answer_cache[key]
-
-            skills_text = "\nSkills to emphasize: " + ", ".join(skills) if skills else ""
-            prompt = (
-                "You are an expert interview coach and candidate.\n"
-                "Given the question below, produce a high-quality sample answer suitable for a mid-to-senior product manager. Use a clear structure (summary, approach, example, metrics).\n\n"
-                "Question:\n" + question_text + "\n\n" + skills_text + "\n\nAnswer:\n"
-            )
+            cached = self.answer_cache.get(key)
+            if cached:
+                return cached
 
-            # Prefer using the wrapper's generate endpoint with local llama3 model if available
-            try:
-                ans = self._wrapper_generate_answer(question_text, skills, model='llama3')
-            except Exception:
-                ans = ""
-            if not ans:
-                ans = self._query_ollama(prompt)
-            if not ans or not ans.strip():
-                if getattr(self, 'force_llm', False):
-                    raise Exception("LLM returned empty response and LLM_FORCE is enabled")
-                skills_text = ", ".join(skills) if skills else ""
-                ans = (
-                    f"Summary:\nProvide a concise recommendation and primary outcome.\n\n"
-                    f"Approach:\n1) Clarify goals and target users. 2) Break problem into key pillars (user research, MVP, metrics).\n"
-                    f"Example:\nDescribe a specific project example: timeline, decisions made, trade-offs, stakeholders involved, and measurable outcomes.\n\n"
-                    f"Metrics & Impact:\nList the metrics you would track (e.g., activation, retention, NPS) and target improvements.\n\n"
-                    f"Skills emphasized: {skills_text}."
-                )
-
-            # Cache non-trivial answers
-            try:
-                if ans and len(ans) > 20:
-                    self._answer_cache[key] = ans
-            except Exception:
-                pass
-
-            return ans
+            # Concurrent callers for the same question share one in-flight generation.
+            return self._inflight.do(("answer", key), self._generate_answer_uncached, question_text, skills, key)
         except Exception as e:
             print(f"[AIService generate_answer error] {e}")
             # final fallback deterministic answer
             return self._fallback_model_answer(question_text, skills)
 
-    def evaluate_answer(self, question_text: str, user_answer: str, model_answer: str) -> dict:
-        """
-        Ask the model to compare the user's answer to the model answer and return a JSON
-        summary with a numeric score (0-100), strengths, weaknesses and suggested improvements.
-        """
-        # Prefer using the LLM to produce a structured, rich JSON evaluation.
-        # We'll try up to two LLM calls before falling back to the heuristic evaluator.
+    def _generate_answer_uncached(self, question_text: str, skills: list | None, key: str) -> str:
+        """LLM part of `generate_answer` (cache miss). Raises when LLM_FORCE is set
+        and the LLM returns nothing."""
+        skills_text = "\nSkills to emphasize: " + ", ".join(skills) if skills else ""
+        prompt = "Question:\n" + question_text + "\n\n" + skills_text + "\n\nAnswer:\n"
+
+        # Prefer using the wrapper's generate endpoint with the answer model if available
+        model = self._route_model("answer")
         try:
-            if not model_answer or not model_answer.strip():
-                model_answer = self.generate_answer(question_text)
+            ans = self._wrapper_generate_answer(question_text, skills, model=model)
+        except Exception:
+            ans = ""
+        if not ans:
+            ans = self._query_ollama(prompt, ANSWER_SYSTEM_PROMPT, task="answer", model=model)
+        if not ans or not ans.strip():
+            if getattr(self, 'force_llm', False):
+                raise Exception("LLM returned empty response and LLM_FORCE is enabled")
+            skills_text = ", ".join(skills) if skills else ""
+            # Template answers are not cached so a recovered LLM gets a chance next time.
+            return (
+                f"Summary:\nProvide a concise recommendation and primary outcome.\n\n"
+                f"Approach:\n1) Clarify goals and target users. 2) Break problem into key pillars (user research, MVP, metrics).\n"
+                f"Example:\nDescribe a specific project example: timeline, decisions made, trade-offs, stakeholders involved, and measurable outcomes.\n\n"
+                f"Metrics & Impact:\nList the metrics you would track (e.g., activation, retention, NPS) and target improvements.\n\n"
+                f"Skills emphasized: {skills_text}."
+            )
+
+        # Cache non-trivial answers of the answer model itself
+        try:
+            if len(ans) > 20 and self._caches_answers_from(model):
+                self.answer_cache.set(key, ans)
+        except Exception:
+            pass
 
+        return ans
+
+    def _evaluate_direct(self, question_text: str, user_answer: str, model_answer: str,
+                         model: str | None = None) -> dict | None:
+        """Direct `/api/generate` evaluation (one retry with a simpler prompt) on
+        `model` (default: the routed one); None when the LLM gave no structured output."""
+        try:
             eval_prompt = (
-                "You are an expert interview evaluator. Compare the USER_ANSWER to the IDEAL_ANSWER for the question below.\n"
-                "Produce ONLY a single valid JSON object (no extra text) with the following structure:\n"
-                "{\n"
-                "  \"similarity_score\": <float 0.0-1.0>,\n"
-                "  \"score\": <int 0-100>,\n"
-                "  \"ideal_answer\": \"<string>\",\n"
-                "  \"suggestions\": {\n"
-                "    \"rating\": \"good|satisfactory|needs_improvement\",\n"
-                "    \"feedback\": {\n"
-                "      \"comparison\": \"short human-readable comparison sentence\",\n"
-                "      \"strengths\": [\"...\"],\n"
-                "      \"improvements\": [\"...\"]\n"
-                "    }\n"
-                "  }\n"
-                "}\n\n"
-                "Guidance: keep feedback short and actionable (1-3 bullets per section). Similarity_score should be a decimal between 0 and 1. Score should be integer 0-100 roughly similarity_score*100 with professional judgment. Do NOT include internal notes or technical terms like 'fuzzy' or 'heuristic'.\n\n"
                 "Question:\n" + question_text + "\n\n"
                 "IDEAL_ANSWER:\n" + (model_answer or "") + "\n\n"
                 "USER_ANSWER:\n" + (user_answer or "") + "\n\n"
                 "JSON:\n"
             )
 
-            raw = self._query_ollama(eval_prompt)
-            data = {}
-            if raw and raw.strip():
-                try:
-                    data = json.loads(raw)
-                except Exception:
-                    # try to extract the first JSON object substring
-                    start = raw.find('{')
-                    end = raw.rfind('}')
-                    if start != -1 and end != -1 and end > start:
-                        try:
-                            data = json.loads(raw[start:end+1])
-                        except Exception:
-                            data = {}
+            raw = self._query_ollama(eval_prompt, EVAL_SYSTEM_PROMPT, task="evaluate", model=model)
+            data = parse_llm_json(raw, "object").value or {}
 
             # If we didn't get a structured response, retry once with a simpler prompt
             if not data:
+                check_cancelled()
                 retry_prompt = (
-                    "Provide ONLY a JSON object with keys: similarity_score (0-1 float), score (0-100 int), ideal_answer (string), suggestions (object with rating and feedback).\n"
                     "Question:\n" + question_text + "\nIDEAL_ANSWER:\n" + (model_answer or "") + "\nUSER_ANSWER:\n" + (user_answer or "") + "\nJSON:\n"
                 )
-                raw2 = self._query_ollama(retry_prompt)
-                if raw2 and raw2.strip():
-                    try:
-                        data = json.loads(raw2)
-                    except Exception:
-                        start = raw2.find('{')
-                        end = raw2.rfind('}')
-                        if start != -1 and end != -1 and end > start:
-                            try:
-                                data = json.loads(raw2[start:end+1])
-                            except Exception:
-                                data = {}
+                raw2 = self._query_ollama(retry_prompt, EVAL_RETRY_SYSTEM_PROMPT, task="evaluate_retry", model=model)
+                data = parse_llm_json(raw2, "object").value or {}
 
             # If we have structured data, normalize it to the expected shape
             if data and isinstance(data, dict):
@@ -863,14 +1234,24 @@ class AIService:
             # If the LLM could not produce structured output, respect force_llm setting.
             if getattr(self, 'force_llm', False):
                 raise Exception("LLM did not return structured evaluation and LLM_FORCE is enabled")
+        except HedgeCancelled:
+            pass
         except Exception as e:
             print(f"[AIService evaluate_answer LLM error] {e}")
-        # If structured LLM output was not produced, try the wrapper's evaluate endpoint
+        return None
+
+    def _evaluate_via_wrapper(self, question_text: str, user_answer: str, model_answer: str,
+                              model: str | None = None) -> dict | None:
+        """The wrapper's `/api/evaluate-answer` route; None when it gave no result."""
         try:
-            # Use qwen2:7b-instruct for evaluation (preferred for scoring/feedback)
-            wrapper_resp = self._wrapper_evaluate_answer(question_text, user_answer, model_answer, model='qwen2:7b-instruct')
+            check_cancelled()
+            # Use the evaluation route's model (LLM_MODEL_EVALUATE, default LLM_MODEL)
+            wrapper_resp = self._wrapper_evaluate_answer(question_text, user_answer, model_answer, model=model or self._route_model("evaluate"))
             # wrapper returns a dict with similarity_score, score, strengths, improvements, feedback
-            if wrapper_resp and isinstance(wrapper_resp, dict):
+            if wrapper_resp and isinstance(wrapper_resp, dict) and wrapper_resp.get('fallback'):
+                # the model gave the wrapper nothing usable either: not a result
+                print("[AIService evaluate_answer] wrapper returned its placeholder evaluation")
+            elif wrapper_resp and isinstance(wrapper_resp, dict):
                 sim = float(wrapper_resp.get('similarity_score') or wrapper_resp.get('score', 0) / 100.0 or 0.0)
                 score = int(wrapper_resp.get('score') or round(sim * 100))
                 strengths = wrapper_resp.get('strengths') or wrapper_resp.get('strengths', [])
@@ -885,8 +1266,49 @@ class AIService:
                     'ideal_answer': wrapper_resp.get('ideal_answer') or model_answer,
                     'suggestions': wrapper_resp.get('suggestions') or {},
                 }
+        except HedgeCancelled:
+            pass
         except Exception as e:
             print(f"[AIService evaluate_answer wrapper fallback error] {e}")
+        return None
+
+    def evaluate_answer(self, question_text: str, user_answer: str, model_answer: str) -> dict:
+        """
+        Ask the model to compare the user's answer to the model answer and return a JSON
+        summary with a numeric score (0-100), strengths, weaknesses and suggested improvements.
+        """
+        try:
+            if not model_answer or not model_answer.strip():
+                model_answer = self.generate_answer(question_text)
+        except Exception as e:
+            print(f"[AIService evaluate_answer model answer error] {e}")
+
+        cache_key = None
+        if self.eval_cache_enabled:
+            cache_key = self._eval_cache_key("single", question_text, user_answer, model_answer)
+            cached = self.eval_cache.get(cache_key)
+            if cached:
+                print("[AIService evaluate_answer] evaluation cache hit")
+                return cached
+
+        # both paths evaluate with the model routed now; it decides cacheability
+        model = self._route_model("evaluate")
+        direct = lambda: self._evaluate_direct(question_text, user_answer, model_answer, model)
+        wrapper = lambda: self._evaluate_via_wrapper(question_text, user_answer, model_answer, model)
+        if self.hedge.enabled:
+            # Both paths race: the backup starts once the primary is slower than
+            # the hedge delay (or has failed), the first structured result wins.
+            primary, backup = (wrapper, direct) if self.hedge.primary == "wrapper" else (direct, wrapper)
+            result, winner = self.hedge.run(primary, backup)
+            if result and winner == "backup":
+                print("[AIService evaluate_answer] hedged backup path won")
+        else:
+            # Prefer the direct LLM prompt (two attempts), then the wrapper's evaluate endpoint.
+            result = direct() or wrapper()
+        if result:
+            if cache_key and self._cacheable_evaluation(result) and self._caches_evaluations_from(model):
+                self.eval_cache.set(cache_key, result)
+            return result
 
         # Heuristic fallback only if explicitly allowed via env var
         try:
@@ -910,53 +1332,217 @@ class AIService:
             print(f"[AIService evaluate_answer final fallback error] {e}")
             return {'score': 0, 'strengths': [], 'weaknesses': [], 'feedback': 'Evaluation failed.'}
 
-    def evaluate_answers_batch(self, items: list[dict]) -> list[dict]:
-        """
-        Attempt to evaluate multiple user answers in one shot. Expects items to be a list
-        of dicts with keys: 'question' (text), 'user_answer' (text), optionally 'skills'.
-        Returns a list of dicts with keys: model_answer, score, strengths, weaknesses, feedback.
-        If the batch attempt fails, returns an empty list to signal fallback.
-        """
+    def _eval_batch_item_text(self, number: int, it: dict) -> str:
+        q = it.get("question") or ""
+        ua = it.get("user_answer") or ""
+        skills = it.get("skills") or []
+        sk = f"\nSkills: {', '.join(skills)}" if skills else ""
+        ideal = f"\nIDEAL_ANSWER: {it['model_answer']}" if it.get("model_answer") else ""
+        return f"Q{number}: {q}{sk}{ideal}\nUSER_ANSWER: {ua}"
+
+    def _chunk_eval_items(self, indices: list[int], items: list[dict]) -> list[list[int]]:
+        """Pack item indices into chunks that stay under the prompt-token budget
+        (and the per-chunk item cap). An oversized item gets a chunk of its own."""
+        chunks: list[list[int]] = []
+        current: list[int] = []
+        used = 0
+        for idx in indices:
+            cost = estimate_tokens(self._eval_batch_item_text(idx + 1, items[idx]))
+            if current and (used + cost > self.eval_batch_token_budget or len(current) >= self.eval_batch_max_items):
+                chunks.append(current)
+                current, used = [], 0
+            current.append(idx)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _validate_eval_element(obj, it: dict) -> dict | None:
+        """Normalize one element of a batch-evaluation array, or None if unusable."""
+        if not isinstance(obj, dict):
+            return None
         try:
-            parts = []
-            for i, it in enumerate(items):
-                q = it.get("question") or ""
-                ua = it.get("user_answer") or ""
-                skills = it.get("skills") or []
-                sk = f"\nSkills: {', '.join(skills)}" if skills else ""
-                parts.append(f"Q{i+1}: {q}{sk}\nUSER_ANSWER: {ua}")
-
-            prompt = (
-                "You are an expert interview evaluator. For each numbered question below, you will be given the QUESTION and the USER_ANSWER.\n"
-                "For each item, produce two things: (1) a concise IDEAL model answer, and (2) a short JSON evaluation object with keys: score (0-100), strengths (array of strings), weaknesses (array of strings), feedback (string).\n"
-                "IMPORTANT: OUTPUT MUST BE a single valid JSON array ONLY. Do NOT include any extra commentary or surrounding text. Each array element must be an object with keys exactly: model_answer, score, strengths, weaknesses, feedback.\n\n"
-                "Items:\n" + "\n".join(parts) + "\n\nJSON:\n"
-            )
+            score = int(round(float(obj.get("score"))))
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= score <= 100:
+            return None
 
-            raw = self._query_ollama(prompt)
-            print(f"[AIService evaluate_answers_batch] Raw response (first 200 chars): {raw[:200] if raw else 'EMPTY'}")
-            print(f"[AIService evaluate_answers_batch] Items count: {len(items)}")
-            try:
-                data = json.loads(raw) if raw and raw.strip() else None
-                print(f"[AIService evaluate_answers_batch] Parsed data type: {type(data)}, length: {len(data) if isinstance(data, list) else 'N/A'}")
-                if isinstance(data, list) and len(data) == len(items):
-                    out = []
-                    for obj in data:
-                        out.append({
-                            "model_answer": obj.get("model_answer") or obj.get("ideal_answer") or "",
-                            "score": int(obj.get("score") or 0) if obj.get("score") is not None else 0,
-                            "strengths": obj.get("strengths") or [],
-                            "weaknesses": obj.get("weaknesses") or [],
-                            "feedback": obj.get("feedback") or "",
-                        })
-                    return out
-            except Exception:
-                # ignore and fall back below
-                pass
+        def _list(v):
+            if isinstance(v, list):
+                return [str(x) for x in v if x]
+            return [str(v)] if v else []
+
+        return {
+            "model_answer": it.get("model_answer") or obj.get("model_answer") or obj.get("ideal_answer") or "",
+            "score": score,
+            "strengths": _list(obj.get("strengths")),
+            "weaknesses": _list(obj.get("weaknesses")),
+            "feedback": obj.get("feedback") if isinstance(obj.get("feedback"), str) else "",
+        }
+
+    def _evaluate_chunk(self, chunk: list[int], items: list[dict], model: str | None = None) -> dict:
+        """One LLM call for a chunk (on `model`, default the routed one); returns
+        {item index: result} for the elements that validated. Elements are matched
+        by their `index` key (the Q number), falling back to position when the
+        model omitted it."""
+        parts = [self._eval_batch_item_text(idx + 1, items[idx]) for idx in chunk]
+        prompt = "Items:\n" + "\n".join(parts) + "\n\nJSON:\n"
+        raw = self._query_ollama(prompt, BATCH_EVAL_SYSTEM_PROMPT, task="evaluate_batch", items=len(chunk), model=model)
+        parsed = parse_llm_json(raw, "array")
+        elements = parsed.indexed_items()
+        if not elements:
+            single = None
+            if len(chunk) == 1:
+                # a one-item chunk often comes back as a bare object
+                single = parsed.value if parsed.lone_object else parse_llm_json(raw, "object").value
+            elements = [(0, single)] if isinstance(single, dict) else []
+        if not elements:
+            print(f"[AIService evaluate_answers_batch] chunk {[i + 1 for i in chunk]}: unparseable response (first 200 chars): {raw[:200] if raw else 'EMPTY'}")
+            return {}
+        if parsed.repaired:
+            print(f"[AIService evaluate_answers_batch] chunk {[i + 1 for i in chunk]}: recovered {len(elements)} element(s), truncated={parsed.truncated}, failed positions={parsed.failed_items}")
+
+        positional = max(parsed.items_found, len(elements)) == len(chunk)
+        out = {}
+        for pos, obj in elements:
+            idx = None
+            if isinstance(obj, dict):
+                try:
+                    number = int(str(obj.get("index")).lstrip("Qq"))
+                    idx = number - 1 if number - 1 in chunk else None
+                except (TypeError, ValueError):
+                    idx = None
+            if idx is None and positional:
+                idx = chunk[pos]
+            if idx is None or idx in out:
+                continue
+            result = self._validate_eval_element(obj, items[idx])
+            if result is not None:
+                out[idx] = result
+        return out
+
+    def _complete_with_heuristics(self, items: list[dict], results: dict) -> list[dict]:
+        """Batch-shaped results for every item: `results` as given, heuristic
+        evaluations for the others (not cached)."""
+        pending = [i for i in range(len(items)) if i not in results]
+        answers = {}
+        for i in pending:
+            it = items[i]
+            answers[i] = it.get("model_answer") or self.generate_answer(it.get("question") or "", it.get("skills") or [])
+        evals = self.heuristic_evaluate_batch([
+            {"question": items[i].get("question") or "", "user_answer": items[i].get("user_answer") or "", "model_answer": answers[i]}
+            for i in pending
+        ])
+        out = dict(results)
+        for i, ev in zip(pending, evals):
+            out[i] = {
+                "model_answer": answers[i],
+                "score": int(ev.get("score") or 0),
+                "strengths": ev.get("strengths") or [],
+                "weaknesses": ev.get("weaknesses") or [],
+                "feedback": ev.get("feedback") or "",
+            }
+        return [out[i] for i in range(len(items))]
 
-            # If batch attempt failed or returned nothing, return an empty list so
-            # the router will fall back to per-question generation + evaluation
+    def evaluate_answers_batch(self, items: list[dict]) -> list[dict]:
+        """
+        Evaluate multiple user answers with as few LLM round trips as possible. Expects
+        items to be a list of dicts with keys: 'question' (text), 'user_answer' (text),
+        optionally 'skills' and a precomputed 'model_answer' (used as the IDEAL answer
+        instead of generating one).
+
+        Items are packed into chunks by estimated prompt tokens
+        (EVAL_BATCH_TOKEN_BUDGET / EVAL_BATCH_MAX_ITEMS) and the chunks are sent
+        concurrently. Each returned element is validated on its own; only items whose
+        element was missing or malformed are re-submitted (EVAL_BATCH_RETRIES rounds),
+        and whatever is still missing after that is evaluated one by one.
+
+        Returns a list of dicts with keys: model_answer, score, strengths, weaknesses,
+        feedback. Returns an empty list when no chunk produced a usable result (or the
+        LLM circuit is open) so the router uses its fallback path.
+        """
+        if not items:
             return []
+        keys = [None] * len(items)
+        cached: dict = {}
+        if self.eval_cache_enabled:
+            keys = [
+                self._eval_cache_key("batch", it.get("question") or "", it.get("user_answer") or "",
+                                     it.get("model_answer"), it.get("skills") or [])
+                for it in items
+            ]
+            for i, key in enumerate(keys):
+                hit = self.eval_cache.get(key)
+                if hit:
+                    cached[i] = hit
+            if len(cached) == len(items):
+                print(f"[AIService evaluate_answers_batch] all {len(items)} item(s) from the evaluation cache")
+                return [cached[i] for i in range(len(items))]
+        if self.heuristic_fallback_active():
+            if not cached:
+                return []
+            # keep the cache hits; only the rest goes to the heuristic evaluator
+            return self._complete_with_heuristics(items, cached)
+        try:
+            results: dict = dict(cached)
+            pending = [i for i in range(len(items)) if i not in cached]
+            if cached:
+                print(f"[AIService evaluate_answers_batch] {len(cached)} item(s) from the evaluation cache")
+            priority, user = current_llm_context()
+            for round_no in range(1 + self.eval_batch_retries):
+                if not pending:
+                    break
+                chunks = self._chunk_eval_items(pending, items)
+                model = self._route_model("evaluate_batch")
+                cacheable = self._caches_evaluations_from(model)
+                print(f"[AIService evaluate_answers_batch] round {round_no + 1}: {len(pending)} item(s) in {len(chunks)} chunk(s)")
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(chunks)) as ex:
+                    futures = [
+                        ex.submit(run_in_llm_context, priority, user, self._evaluate_chunk, chunk, items, model)
+                        for chunk in chunks
+                    ]
+                    for fut in concurrent.futures.as_completed(futures):
+                        try:
+                            chunk_results = fut.result()
+                        except Exception as e:
+                            print(f"[AIService evaluate_answers_batch] chunk failed: {e}")
+                            continue
+                        results.update(chunk_results)
+                        for idx, res in chunk_results.items():
+                            if keys[idx] and cacheable and self._cacheable_evaluation(res):
+                                self.eval_cache.set(keys[idx], res)
+                pending = [i for i in pending if i not in results]
+                if len(results) == len(cached):
+                    # nothing came back at all: the endpoint is not cooperating
+                    break
+
+            if len(results) == len(cached):
+                # no LLM result at all: let the router use its fallback path
+                return []
+
+            if pending:
+                print(f"[AIService evaluate_answers_batch] evaluating {len(pending)} leftover item(s) individually")
+
+                def _single(idx):
+                    it = items[idx]
+                    q = it.get("question") or ""
+                    ma = it.get("model_answer") or self.generate_answer(q, it.get("skills") or [])
+                    ev = self.evaluate_answer(q, it.get("user_answer") or "", ma)
+                    return idx, {
+                        "model_answer": ma,
+                        "score": int(ev.get("score") or 0),
+                        "strengths": ev.get("strengths") or [],
+                        "weaknesses": ev.get("weaknesses") or [],
+                        "feedback": ev.get("feedback") or "",
+                    }
+
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(pending)) as ex:
+                    for idx, res in ex.map(lambda i: run_in_llm_context(priority, user, _single, i), pending):
+                        results[idx] = res
+
+            return [results[i] for i in range(len(items))]
         except Exception as e:
             print(f"[AIService evaluate_answers_batch error] {e}")
             return []
@@ -964,6 +1550,9 @@ class AIService:
     async def extract_details_from_jd(self, jd_text: str) -> dict:
         """
         Extract company and years of experience from JD.
+
+        The deterministic parser (app/jd_parser.py) answers first; the JD cache
+        and then the LLM are only consulted when its confidence is low.
         
         LOGIC:
         1. If company is found in CSV: return that company + experience level
@@ -973,23 +1562,47 @@ class AIService:
            → Each question already has its own company field from CSV
         """
         try:
-            full_prompt = SYSTEM_PROMPT + "\n\n" + jd_text
-            raw = self._query_ollama(full_prompt)
-            
+            vocab = await asyncio.to_thread(self.vocabulary.get)
+            fast = parse_jd(jd_text, vocab.companies, vocab.levels)
+            if fast["confidence"] >= self.jd_fast_path_min_confidence:
+                print(f"[AIService extract_details_from_jd] fast path (confidence={fast['confidence']}): {fast}")
+                return {k: fast[k] for k in ("company_name", "years_of_experience", "level")}
+            print(f"[AIService extract_details_from_jd] fast path confidence {fast['confidence']} too low; asking the LLM")
+
+            # the cache stands for the route's primary model; a downgraded
+            # fallback's extraction is used but not stored under it
+            jd_model = self.router.primary("jd_extract", self.model)
+            cached, kind = await asyncio.to_thread(self.jd_cache.lookup, jd_text, jd_model)
+            if cached:
+                print(f"[AIService extract_details_from_jd] cache hit ({kind}): {cached}")
+                return cached
+
+            # Identical JDs pasted concurrently share one LLM call.
+            model = self._route_model("jd_extract")
+            key = ("jd", JDExtractionCache.fingerprint(jd_text, model))
+            raw = await self._inflight.do_async(key, lambda: self._aquery_ollama(jd_text, vocab.system_prompt, task="jd_extract", model=model))
+            details = self._parse_jd_details(jd_text, raw)
+            # only cache real LLM extractions of the primary model; text-scan
+            # fallbacks get another try next time
+            if raw and raw.strip() and model == jd_model:
+                await asyncio.to_thread(self.jd_cache.store, jd_text, jd_model, details)
+            return details
+        except Exception as e:
+            print(f"[AIService extract_details_from_jd] ERROR: {e}")
+            return {
+                "company_name": "Unknown Company",
+                "years_of_experience": "6-10",
+                "level": "Strategic",
+            }
+
+    def _parse_jd_details(self, jd_text: str, raw: str) -> dict:
+        """Validate the raw LLM JD-extraction output and fill gaps from the JD text.
+        Pure CPU work, shared by the async extraction path."""
+        try:
             print(f"[AIService extract_details_from_jd] Raw LLM response: {raw[:300]}")
             
             # Parse JSON - strict validation
-            data = {}
-            try:
-                data = json.loads(raw)
-            except Exception:
-                # Try to find JSON in the response
-                start, end = raw.find("{"), raw.rfind("}") + 1
-                if start != -1 and end > start:
-                    try:
-                        data = json.loads(raw[start:end])
-                    except Exception:
-                        pass
+            data = parse_llm_json(raw, "object").value or {}
             
             # Extract company_name - MUST validate strictly
             raw_company = (data.get("company_name") or "").strip()
@@ -1020,11 +1633,12 @@ class AIService:
             # Final fallback: scan JD text for company mentions
             if extracted_company == "Unknown Company":
                 print(f"[AIService] Fallback: scanning JD text for company mentions...")
-                jd_lower = jd_text.lower()
-                
-                # First try to find any CSV company in the JD
-                for company in VALID_COMPANIES:
-                    if company.lower() in jd_lower:
+                # First try to find any CSV company in the JD (one pass over the text)
+                companies = self.vocabulary.get().companies
+                scanner = company_scanner(tuple(companies))
+                found = scanner.hits(jd_text) if scanner else set()
+                for company in companies:
+                    if company in found:
                         print(f"[AIService] Found CSV company '{company}' in JD text")
                         extracted_company = company
                         break
@@ -1059,10 +1673,11 @@ class AIService:
             
             # Extract level (not critical for questions, just metadata)
             level = data.get("level", "Strategic").strip()
-            if level not in VALID_LEVELS:
+            valid_levels = self.vocabulary.get().levels
+            if level not in valid_levels:
                 # Try to find closest match
                 level_lower = level.lower()
-                for vl in VALID_LEVELS:
+                for vl in valid_levels:
                     if vl.lower() == level_lower:
                         level = vl
                         break
@@ -0,0 +1,172 @@
+"""
+Two-tier cache used by AIService: a bounded in-process LRU with TTL in front of
+the shared `cache_entries` table.
+
+The memory tier absorbs repeated lookups inside one worker; the DB tier keeps
+warm entries across restarts/deploys and shares them between uvicorn workers.
+Any DB failure degrades to memory-only caching rather than failing the caller.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable sha256 hex digest of the given parts (joined with a separator)."""
+    raw = "\x1f".join("" if p is None else str(p) for p in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    """Thread-safe LRU/TTL cache with an optional durable DB tier.
+
+    - `namespace` separates caches sharing the `cache_entries` table
+    - `max_entries` caps the in-memory tier (least recently used evicted first)
+    - `ttl_seconds` applies to both tiers; expired DB rows are ignored on
+      lookup and overwritten by the next `set`
+    - `persist` enables the DB tier
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 2000,
+        ttl_seconds: float = 30 * 24 * 3600,
+        persist: bool = True,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.namespace = namespace
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.persist = bool(persist)
+        if session_factory is None and self.persist:
+            from .database import SessionLocal
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "db_errors": 0}
+
+    # ---------------------------- memory tier ---------------------------- #
+    def _memory_get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return value
+
+    def _memory_set(self, key: str, value: Any, expires: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # ------------------------------ DB tier ------------------------------ #
+    def _db_get(self, key: str) -> Any:
+        from .models import CacheEntry
+        db = self._session_factory()
+        try:
+            row = (
+                db.query(CacheEntry.value)
+                .filter(
+                    CacheEntry.namespace == self.namespace,
+                    CacheEntry.key == key,
+                    or_(CacheEntry.expires_at.is_(None), CacheEntry.expires_at > datetime.utcnow()),
+                )
+                .first()
+            )
+            return row[0] if row is not None else None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, value: Any) -> None:
+        from .models import CacheEntry
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        db = self._session_factory()
+        try:
+            row = (
+                db.query(CacheEntry)
+                .filter(CacheEntry.namespace == self.namespace, CacheEntry.key == key)
+                .first()
+            )
+            if row is None:
+                db.add(CacheEntry(namespace=self.namespace, key=key, value=value, expires_at=expires_at))
+            else:
+                row.value = value
+                row.expires_at = expires_at
+            try:
+                db.commit()
+            except IntegrityError:
+                # another worker inserted the same key first; theirs is as good as ours
+                db.rollback()
+        finally:
+            db.close()
+
+    # ----------------------------- public API ---------------------------- #
+    def get(self, key: str) -> Any:
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self.persist:
+            try:
+                value = self._db_get(key)
+            except Exception as e:
+                self._count("db_errors")
+                print(f"[PersistentCache:{self.namespace}] DB read failed: {e}")
+                value = None
+            if value is not None:
+                self._memory_set(key, value, time.time() + self.ttl_seconds)
+                self._count("db_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        if value is None:
+            return
+        self._memory_set(key, value, time.time() + self.ttl_seconds)
+        self._count("sets")
+        if self.persist:
+            try:
+                self._db_set(key, value)
+            except Exception as e:
+                self._count("db_errors")
+                print(f"[PersistentCache:{self.namespace}] DB write failed: {e}")
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+        stats.update({
+            "namespace": self.namespace,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persist": self.persist,
+        })
+        return stats
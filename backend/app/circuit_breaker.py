@@ -0,0 +1,122 @@
+"""
+Circuit breaker shared by every AIService call to the LLM endpoint.
+
+closed    -> calls go through; consecutive failures are counted
+open      -> calls are rejected immediately (callers use heuristic/cached paths)
+             until `recovery_timeout` seconds have passed
+half_open -> up to `half_open_max_calls` probe calls go through; a success
+             closes the circuit, a failure opens it again
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = float(recovery_timeout)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._last_failure = None
+
+    def _refresh(self) -> None:
+        # caller holds the lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._half_open_in_flight = 0
+
+    def _open(self) -> None:
+        # caller holds the lock
+        if self._state == HALF_OPEN:
+            self._stats["opened"] += 1
+            print(f"[CircuitBreaker:{self.name}] OPEN again (probe failed)")
+        elif self._state == CLOSED:
+            self._stats["opened"] += 1
+            print(f"[CircuitBreaker:{self.name}] OPEN after {self._consecutive_failures} consecutive failures")
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        """True if a call may proceed. Every allowed call must be followed by
+        `record_success`, `record_failure` or (no outcome) `release`."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def release(self) -> None:
+        """Give back the slot of an allowed call that ended without an outcome
+        (e.g. a cancelled coroutine), so a half-open probe can be retried."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                print(f"[CircuitBreaker:{self.name}] CLOSED (probe succeeded)")
+            self._state = CLOSED
+            self._half_open_in_flight = 0
+
+    def record_failure(self, error: object = None) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            self._last_failure = str(error)[:200] if error is not None else None
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_failure": self._last_failure,
+                **self._stats,
+            }
@@ -0,0 +1,317 @@
+"""
+Lazily loaded sentence-embedding model used by the heuristic evaluator.
+
+Importing this module is cheap: `sentence_transformers` (and torch) are only
+imported when the model is first needed or when `start_warmup()` is called
+from the app startup hook, which loads it on a daemon thread. Until the model
+is ready, callers get `None` from `get()` and stay on their keyword path, so
+worker start and health checks never wait on torch.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from .cache import content_hash
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+class EmbeddingModel:
+    """Holds one SentenceTransformer, loaded at most once per process."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", enabled: bool = True):
+        self.model_name = model_name
+        self.enabled = enabled
+        self._model = None
+        # _lock guards the short state changes (thread start, publishing the
+        # model and its callbacks); _load_lock serializes the slow load itself
+        # so request paths never wait on it.
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._thread = None
+        self._loading = False
+        self.load_seconds = None
+        self.error = None
+        self._on_ready: list[Callable[[], None]] = []
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingModel":
+        return cls(
+            model_name=os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2"),
+            enabled=_env_flag("EMBEDDINGS_ENABLED", "1"),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._model is not None or self.error is not None or not self.enabled:
+                return
+            self._loading = True
+            started = time.perf_counter()
+            model = None
+            try:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(self.model_name)
+                self.load_seconds = round(time.perf_counter() - started, 3)
+                print(f"[Embeddings] {self.model_name} ready in {self.load_seconds}s — using semantic similarity")
+            except Exception as e:
+                # missing package or model download failure: stay on the keyword path
+                self.error = str(e)[:200]
+                print(f"[Embeddings] unavailable, using keyword heuristics: {self.error}")
+            finally:
+                self._loading = False
+            if model is None:
+                return
+            # publish under the short lock so on_ready() never misses the switch
+            with self._lock:
+                self._model = model
+                callbacks, self._on_ready = self._on_ready, []
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception as e:
+                print(f"[Embeddings] on-ready hook failed: {e}")
+
+    def on_ready(self, fn: Callable[[], None]) -> None:
+        """Run `fn` once the model has loaded (immediately if it already has)."""
+        with self._lock:
+            if self._model is None:
+                self._on_ready.append(fn)
+                return
+        fn()
+
+    def start_warmup(self) -> None:
+        """Load the model on a background thread (no-op if already started)."""
+        if not self.enabled or self._model is not None or self.error is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name="embedding-warmup", daemon=True)
+            self._thread.start()
+
+    def get(self, wait: bool = False):
+        """The loaded model, or None while it is still loading/unavailable.
+
+        With `wait=True` the model is loaded synchronously on first use (for
+        offline scripts); request paths should leave it False.
+        """
+        if self._model is not None:
+            return self._model
+        if wait:
+            self._load()
+        else:
+            self.start_warmup()
+        return self._model
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "loading": self._loading,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+class EmbeddingStore:
+    """Content-addressed cache of embedding vectors for stable texts.
+
+    Skill descriptions, model answers and questions do not change between
+    evaluations, so their vectors are kept in a bounded LRU keyed by
+    content_hash(model name, text) and, when `cache_dir` is set, written to
+    `<cache_dir>/<hash>.npy` so they survive restarts. User answers go through
+    `encode()` and are never cached.
+    """
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        max_entries: int = 4096,
+        cache_dir: Optional[str] = None,
+        batch_size: int = 64,
+    ):
+        self.model = model
+        self.max_entries = max(1, int(max_entries))
+        self.batch_size = max(1, int(batch_size))
+        self.cache_dir = cache_dir or None
+        self._lock = threading.Lock()
+        self._vectors: "OrderedDict[str, object]" = OrderedDict()
+        self._static: set[str] = set()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "encoded": 0, "disk_errors": 0}
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"[Embeddings] cache dir {self.cache_dir} unusable, memory only: {e}")
+                self.cache_dir = None
+        model.on_ready(self._warm_static)
+
+    @classmethod
+    def from_env(cls, model: EmbeddingModel) -> "EmbeddingStore":
+        return cls(
+            model,
+            max_entries=int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "4096")),
+            cache_dir=os.environ.get("EMBEDDING_CACHE_DIR") or None,
+            batch_size=int(os.environ.get("EMBEDDING_BATCH_SIZE", "64")),
+        )
+
+    def _key(self, text: str) -> str:
+        return content_hash(self.model.model_name, text)
+
+    def _remember(self, key: str, vec) -> None:
+        with self._lock:
+            self._vectors[key] = vec
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _disk_get(self, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            import numpy as np
+            return np.load(path, allow_pickle=False)
+        except Exception as e:
+            self._count("disk_errors")
+            print(f"[Embeddings] failed to read {path}: {e}")
+            return None
+
+    def _disk_set(self, key: str, vec) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            import numpy as np
+            tmp = self._disk_path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, vec, allow_pickle=False)
+            os.replace(tmp, self._disk_path(key))
+        except Exception as e:
+            self._count("disk_errors")
+            print(f"[Embeddings] failed to write vector {key}: {e}")
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    def encode(self, texts: list[str]):
+        """Uncached encode (user answers). None while the model is not ready."""
+        model = self.model.get()
+        if model is None:
+            return None
+        self._count("encoded", len(texts))
+        return model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True)
+
+    def encode_cached(self, texts: list[str]) -> Optional[list]:
+        """Vectors for `texts`, encoding only the ones not seen before (in one
+        call). None while the model is not ready."""
+        model = self.model.get()
+        if model is None:
+            return None
+        keys = [self._key(t) for t in texts]
+        out: list = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+        for i, key in enumerate(keys):
+            with self._lock:
+                vec = self._vectors.get(key)
+                if vec is not None:
+                    self._vectors.move_to_end(key)
+            if vec is None:
+                vec = self._disk_get(key)
+                if vec is not None:
+                    self._remember(key, vec)
+                    self._count("disk_hits")
+            else:
+                self._count("hits")
+            if vec is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                out[i] = vec
+
+        if missing:
+            miss_keys = list(missing)
+            miss_texts = [texts[missing[k][0]] for k in miss_keys]
+            self._count("misses", len(miss_keys))
+            self._count("encoded", len(miss_texts))
+            vecs = model.encode(miss_texts, batch_size=self.batch_size, convert_to_numpy=True)
+            for key, vec in zip(miss_keys, vecs):
+                self._remember(key, vec)
+                self._disk_set(key, vec)
+                for i in missing[key]:
+                    out[i] = vec
+        return out
+
+    def register_static(self, texts: Iterable[str]) -> None:
+        """Texts (e.g. skill descriptions) to encode as soon as the model is ready."""
+        with self._lock:
+            self._static.update(t for t in texts if t)
+        if self.model.ready:
+            self._warm_static()
+
+    def _warm_static(self) -> None:
+        with self._lock:
+            texts = sorted(self._static)
+        if texts:
+            self.encode_cached(texts)
+            print(f"[Embeddings] precomputed {len(texts)} static vectors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._vectors)
+        stats["persist_dir"] = self.cache_dir
+        stats["batch_size"] = self.batch_size
+        return stats
+
+
+def _unit_rows(mat):
+    import numpy as np
+    mat = np.asarray(mat, dtype=np.float64)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def batch_similarities(store: EmbeddingStore, user_answers: list[str], model_answers: list[str], skill_texts: list[str]):
+    """Cosine similarities for a whole submission with (at most) two encode calls.
+
+    Returns `(answer_sims, skill_sims)`: answer_sims[i] is cos(user_i, model_i)
+    and skill_sims[i, j] is cos(user_i, skill_j), or None while the model is
+    not ready. User answers are encoded in one uncached call; model answers and
+    skill texts come from the store (one call for whatever is missing).
+    """
+    if not user_answers or not store.model.ready:
+        return None
+    import numpy as np
+
+    user_vecs = store.encode(user_answers)
+    cached = store.encode_cached(list(model_answers) + list(skill_texts))
+    if user_vecs is None or cached is None:
+        return None
+    U = _unit_rows(user_vecs)
+    M = _unit_rows(np.stack(cached[:len(model_answers)]))
+    answer_sims = np.einsum("ij,ij->i", U, M)
+    if skill_texts:
+        S = _unit_rows(np.stack(cached[len(model_answers):]))
+        skill_sims = U @ S.T
+    else:
+        skill_sims = np.zeros((len(user_answers), 0))
+    return answer_sims, skill_sims
+
+
+embedding_model = EmbeddingModel.from_env()
+embedding_store = EmbeddingStore.from_env(embedding_model)
@@ -0,0 +1,205 @@
+"""
+DB-backed queue for `/evaluate-answers` submissions.
+
+The web tier only inserts an `evaluation_jobs` row and returns its id; separate
+`evaluation_worker.py` processes claim queued rows and run the normal
+evaluation pipeline, so slow LLM evaluations no longer hold a request thread
+and DB session for minutes.
+
+Claiming is safe with several workers:
+- Postgres: `SELECT ... FOR UPDATE SKIP LOCKED` on the oldest queued row
+- SQLite (dev): conditional `UPDATE ... WHERE id = :id AND status = 'queued'`,
+  retried when another worker won the race
+
+Job ids are sequential, so reading a job needs more than its id: the owning
+user for signed-in submissions, the submitter's session key (X-Session-Key)
+for anonymous ones. Anonymous callers without a session key get a random read
+key in the 202 response, to send back as X-Session-Key. Only its hash is
+stored, and it never becomes the evaluation's session id.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from .llm_scheduler import PRIORITY_EVAL, llm_context, llm_user_key
+from .models import EvaluationJob, User
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_STALE_SECONDS = int(os.environ.get("EVAL_JOB_STALE_SECONDS", "900"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("EVAL_JOB_MAX_ATTEMPTS", "3"))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _key_hash(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def enqueue_job(db: Session, payload: Any, user_id: Optional[int] = None, session_id: Optional[str] = None,
+                read_key: Optional[str] = None) -> EvaluationJob:
+    """Insert a queued job for an EvaluateRequest (or its dict form) and commit.
+    `read_key` (stored hashed) lets an anonymous caller without a session read it."""
+    job = EvaluationJob(
+        status=QUEUED,
+        payload=jsonable_encoder(payload),
+        user_id=user_id,
+        session_id=str(session_id) if session_id is not None else None,
+        read_key_hash=_key_hash(read_key) if read_key else None,
+        attempts=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    print(f"[EvaluationJobs] queued job id={job.id} user_id={user_id!r}")
+    return job
+
+
+def enqueue_for_caller(db: Session, payload: Any, user_id: Optional[int] = None, session_id: Optional[str] = None) -> dict:
+    """Queue a job for the caller and build the 202 response body."""
+    read_key = secrets.token_urlsafe(24) if user_id is None and not session_id else None
+    job = enqueue_job(db, payload, user_id=user_id, session_id=session_id, read_key=read_key)
+    body = job_to_dict(job)
+    body["poll_url"] = f"/api/interview/evaluation-jobs/{job.id}"
+    if read_key:
+        # the only credential for this anonymous job: poll with X-Session-Key: <session_key>
+        body["session_key"] = read_key
+    return body
+
+
+def can_read_job(job: EvaluationJob, user_id: Optional[int], session_key: Optional[str]) -> bool:
+    """Owner check: the submitting user, or for anonymous jobs the session key
+    they were submitted with (or the read key they were given)."""
+    if job.user_id is not None:
+        return job.user_id == user_id
+    if not session_key:
+        return False
+    if job.read_key_hash:
+        return hmac.compare_digest(job.read_key_hash, _key_hash(str(session_key)))
+    if not job.session_id:
+        return False
+    return hmac.compare_digest(str(job.session_id), str(session_key))
+
+
+def job_to_dict(job: EvaluationJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "result": job.result if job.status == DONE else None,
+        "error": job.error if job.status == FAILED else None,
+    }
+
+
+def requeue_stale_jobs(db: Session, stale_seconds: int = JOB_STALE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+    """Give running jobs whose worker went away back to the queue (or fail them
+    once they have used up their attempts). Returns the number of rows touched."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    stale = db.query(EvaluationJob).filter(EvaluationJob.status == RUNNING, EvaluationJob.started_at < cutoff)
+    failed = stale.filter(EvaluationJob.attempts >= max_attempts).update(
+        {"status": FAILED, "error": "worker timed out", "finished_at": datetime.utcnow()},
+        synchronize_session=False,
+    )
+    requeued = stale.filter(EvaluationJob.attempts < max_attempts).update(
+        {"status": QUEUED, "worker_id": None},
+        synchronize_session=False,
+    )
+    db.commit()
+    if failed or requeued:
+        print(f"[EvaluationJobs] stale jobs: requeued={requeued} failed={failed}")
+    return failed + requeued
+
+
+def _claim_values(worker_id: str) -> dict:
+    return {
+        "status": RUNNING,
+        "worker_id": worker_id,
+        "started_at": datetime.utcnow(),
+        "attempts": EvaluationJob.attempts + 1,
+    }
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[EvaluationJob]:
+    """Atomically move the oldest queued job to running for this worker."""
+    if db.get_bind().dialect.name == "postgresql":
+        job = (
+            db.query(EvaluationJob)
+            .filter(EvaluationJob.status == QUEUED)
+            .order_by(EvaluationJob.id.asc())
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.commit()
+            return None
+        db.query(EvaluationJob).filter(EvaluationJob.id == job.id).update(_claim_values(worker_id), synchronize_session=False)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    # SQLite and friends: no row locks, so claim with a compare-and-set UPDATE
+    for _ in range(5):
+        row = (
+            db.query(EvaluationJob.id)
+            .filter(EvaluationJob.status == QUEUED)
+            .order_by(EvaluationJob.id.asc())
+            .first()
+        )
+        if row is None:
+            return None
+        claimed = (
+            db.query(EvaluationJob)
+            .filter(EvaluationJob.id == row.id, EvaluationJob.status == QUEUED)
+            .update(_claim_values(worker_id), synchronize_session=False)
+        )
+        db.commit()
+        if claimed == 1:
+            return db.get(EvaluationJob, row.id)
+    return None
+
+
+def run_job(db: Session, job: EvaluationJob, max_attempts: int = JOB_MAX_ATTEMPTS) -> EvaluationJob:
+    """Run the regular evaluate-answers pipeline for a claimed job and record the outcome."""
+    from . import schemas
+    from .routers.interview import evaluate_answers
+
+    try:
+        user = db.get(User, job.user_id) if job.user_id else None
+        request = schemas.EvaluateRequest(**(job.payload or {}))
+        with llm_context(PRIORITY_EVAL, llm_user_key(job.user_id, job.session_id)):
+            result = evaluate_answers(
+                payload=request,
+                db=db,
+                current_user=user,
+                x_session_key=job.session_id,
+                session_key=None,
+                async_job=False,
+            )
+        job.status = DONE
+        job.result = jsonable_encoder(result)
+        job.error = None
+    except Exception as e:
+        db.rollback()
+        detail = getattr(e, "detail", None) or str(e)
+        job.error = str(detail)[:2000]
+        job.status = FAILED if (job.attempts or 0) >= max_attempts else QUEUED
+        print(f"[EvaluationJobs] job id={job.id} attempt={job.attempts} failed: {job.error}")
+    job.finished_at = datetime.utcnow() if job.status in (DONE, FAILED) else None
+    db.commit()
+    db.refresh(job)
+    return job
@@ -0,0 +1,203 @@
+"""
+Hedged requests for single-answer evaluation.
+
+`AIService.evaluate_answer` has two LLM paths: the direct `/api/generate`
+evaluation prompt (with one stricter retry) and the wrapper's
+`/api/evaluate-answer` route. Run one after the other, the slower path sets the
+tail latency. With hedging enabled the primary path starts alone; if it has
+not produced a valid result after `HedgePolicy.delay()` seconds (a percentile
+of the primary's recent latencies), the backup path starts too. The first
+valid result wins, and the loser is cancelled.
+
+Cancellation is cooperative: each path runs with a `threading.Event` in a
+context variable. LLM calls check it with `check_cancelled()` before queueing,
+after getting a scheduler slot and between stream chunks. An in-flight stream
+is closed (so Ollama stops decoding), and a path that has not started its next
+call yet never starts it. A plain request already sent (the wrapper route)
+cannot be interrupted; its result is discarded.
+"""
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .llm_router import percentile
+
+_cancel_var: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("llm_cancel", default=None)
+
+
+class HedgeCancelled(Exception):
+    """Raised inside a hedged path once the other path has won."""
+
+
+def check_cancelled() -> None:
+    event = _cancel_var.get()
+    if event is not None and event.is_set():
+        raise HedgeCancelled("hedged request lost the race")
+
+
+def is_cancelled() -> bool:
+    event = _cancel_var.get()
+    return event is not None and event.is_set()
+
+
+def _run_cancellable(event: threading.Event, fn: Callable, *args):
+    _cancel_var.set(event)
+    return fn(*args)
+
+
+class HedgePolicy:
+    """Hedge delay from the primary path's latency distribution, plus statistics.
+
+    - `percentile`: the delay is this percentile of the last `window` primary
+      latencies (so roughly 100 - percentile % of calls get hedged). A primary
+      that loses the race is recorded too, with its elapsed time at
+      cancellation as a censored sample (a lower bound on its latency), so
+      slow primaries still push the delay up instead of dropping out.
+    - `default_delay`: used until `min_samples` latencies have been recorded
+    - `min_delay` / `max_delay`: clamp on the computed delay
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        primary: str = "direct",
+        percentile: float = 90.0,
+        default_delay: float = 8.0,
+        min_delay: float = 0.5,
+        max_delay: float = 60.0,
+        window: int = 100,
+        min_samples: int = 10,
+        max_workers: int = 8,
+    ):
+        self.enabled = enabled
+        self.primary = primary if primary in ("direct", "wrapper") else "direct"
+        self.percentile = float(percentile)
+        self.default_delay = float(default_delay)
+        self.min_delay = float(min_delay)
+        self.max_delay = float(max_delay)
+        self.min_samples = max(1, int(min_samples))
+        self.max_workers = max(2, int(max_workers))
+        self._latencies: deque = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "fallbacks": 0,
+            "primary_wins": 0,
+            "backup_wins": 0,
+            "no_result": 0,
+            "cancelled": 0,
+            "censored": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        return cls(
+            enabled=str(os.environ.get("LLM_HEDGE", "0")).lower() in ("1", "true", "yes"),
+            primary=os.environ.get("LLM_HEDGE_PRIMARY", "direct"),
+            percentile=float(os.environ.get("LLM_HEDGE_PERCENTILE", "90")),
+            default_delay=float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "8")),
+            min_delay=float(os.environ.get("LLM_HEDGE_MIN_DELAY_SECONDS", "0.5")),
+            max_delay=float(os.environ.get("LLM_HEDGE_MAX_DELAY_SECONDS", "60")),
+            window=int(os.environ.get("LLM_HEDGE_WINDOW", "100")),
+            min_samples=int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "10")),
+            max_workers=int(os.environ.get("LLM_HEDGE_WORKERS", "8")),
+        )
+
+    def _executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-hedge")
+            return self._pool
+
+    def delay(self) -> float:
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, min(self.max_delay, percentile(samples, self.percentile)))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def run(self, primary: Callable, backup: Callable, is_valid: Callable = bool):
+        """Run `primary`, hedged with `backup`; returns (result, "primary" | "backup")
+        or (None, None) when neither produced a valid result."""
+        self._count("calls")
+        pool = self._executor()
+        events = {"primary": threading.Event(), "backup": threading.Event()}
+        fns = {"primary": primary, "backup": backup}
+        futures: dict = {}
+
+        def launch(name: str) -> None:
+            ctx = contextvars.copy_context()
+            fut = pool.submit(ctx.run, _run_cancellable, events[name], fns[name])
+            futures[fut] = name
+
+        started = time.monotonic()
+        launch("primary")
+        hedged = False
+        deadline = started + self.delay()
+        winner = result = None
+        while futures:
+            timeout = None if hedged else max(0.0, deadline - time.monotonic())
+            done, _ = concurrent.futures.wait(list(futures), timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                # primary is slower than the hedge delay: start the backup as well
+                hedged = True
+                self._count("hedged")
+                launch("backup")
+                continue
+            for fut in done:
+                name = futures.pop(fut)
+                try:
+                    value = fut.result()
+                except Exception as e:
+                    print(f"[Hedge] {name} path failed: {e}")
+                    value = None
+                valid = value is not None and is_valid(value)
+                if name == "primary" and valid:
+                    with self._lock:
+                        self._latencies.append(time.monotonic() - started)
+                if winner is None and valid:
+                    winner, result = name, value
+            if winner is not None:
+                break
+            if not hedged:
+                # primary finished without a valid result: go to the backup right away
+                hedged = True
+                self._count("fallbacks")
+                launch("backup")
+
+        for fut, name in futures.items():
+            # the loser: stop its stream / next call, and never wait for it
+            events[name].set()
+            fut.cancel()
+            self._count("cancelled")
+            if name == "primary":
+                with self._lock:
+                    self._latencies.append(time.monotonic() - started)
+                    self._stats["censored"] += 1
+        if winner is None:
+            self._count("no_result")
+        else:
+            self._count(f"{winner}_wins")
+        return result, winner
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        calls = stats["calls"]
+        stats["hedge_rate"] = round(stats["hedged"] / calls, 3) if calls else None
+        backups = stats["hedged"] + stats["fallbacks"]
+        stats["backup_win_rate"] = round(stats["backup_wins"] / backups, 3) if backups else None
+        stats["enabled"] = self.enabled
+        stats["primary"] = self.primary
+        stats["delay_seconds"] = round(self.delay(), 3)
+        return stats
@@ -0,0 +1,177 @@
+"""
+Vectorized heuristic evaluator for whole submissions.
+
+Used when the LLM is unavailable and every answer of an interview falls back to
+heuristics at once. Produces exactly what `AIService._heuristic_evaluate`
+returns for each (question, user_answer, model_answer) triple, but computes the
+token overlap, keyword coverage and example/metric/structure signals for all
+answers together:
+
+- answers and ideal-answer sentences are tokenized once into a shared
+  vocabulary and kept as sparse (row, token id) keys, so set overlaps become
+  `np.isin` + `np.bincount` over the whole batch
+- keyword signals are one `np.char.find` per keyword across all answers
+"""
+import random
+import re
+from typing import Iterable
+
+import numpy as np
+
+EXAMPLE_KEYWORDS = ["example", "project", "launched", "led", "implemented", "we did", "for example"]
+METRIC_KEYWORDS = ["nps", "%", "percent", "retention", "growth", "metric", "kpi", "users"]
+LEAD_KEYWORDS = ["summary", "i would", "in short", "approach", "steps"]
+
+TIP_TEMPLATES = [
+    "Start with a one-sentence summary, then outline 2–4 steps, and finish with expected impact.",
+    "Use the STAR format: Situation → Task → Action → Result. Be concise and include metrics.",
+    "Quantify impact where possible (e.g., % lift, absolute users). Mention how you'd measure success.",
+    "Lead with the decision, then explain trade-offs and measurable outcomes. This helps interviewers follow your thinking.",
+]
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.?!])\s+")
+
+
+def _sparse_keys(token_lists: list[list[str]], vocab: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(row, token id) pairs of a COO-style sparse matrix; `vocab` grows as needed."""
+    rows = []
+    ids = []
+    for r, toks in enumerate(token_lists):
+        for t in toks:
+            tid = vocab.get(t)
+            if tid is None:
+                tid = vocab[t] = len(vocab)
+            rows.append(r)
+            ids.append(tid)
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.asarray(rows, dtype=np.int64), np.asarray(ids, dtype=np.int64)
+
+
+def _keyword_hits(texts: np.ndarray, keywords: list[str]) -> np.ndarray:
+    """(n_texts, n_keywords) boolean matrix of substring hits."""
+    if texts.size == 0:
+        return np.zeros((0, len(keywords)), dtype=bool)
+    return np.stack([np.char.find(texts, kw) >= 0 for kw in keywords], axis=1)
+
+
+def heuristic_evaluate_batch(triples: Iterable[tuple]) -> list[dict]:
+    """Heuristic evaluation for (question_text, user_answer, model_answer) triples.
+
+    Returns one {score, strengths, weaknesses, feedback} dict per triple, in order.
+    """
+    triples = list(triples)
+    n = len(triples)
+    if n == 0:
+        return []
+
+    questions = [q or "" for q, _ua, _ma in triples]
+    uas = [(ua or "").strip() for _q, ua, _ma in triples]
+    mas = [(ma or "").strip() for _q, _ua, ma in triples]
+    ua_lower = [ua.lower() for ua in uas]
+    ua_tokens = [ua.split() for ua in ua_lower]
+    ma_tokens = [ma.lower().split() for ma in mas]
+
+    # first four sentences of each ideal answer, for the "points you could add" list
+    sentences = []
+    sentence_item = []
+    for i, ma in enumerate(mas):
+        sents = [s.strip() for s in _SENTENCE_SPLIT_RE.split(ma) if s.strip()][:4]
+        sentences.extend(sents)
+        sentence_item.extend([i] * len(sents))
+    sentence_tokens = [s.lower().split() for s in sentences]
+
+    # ---- sparse token sets: unique (row, token) keys over one shared vocabulary ----
+    vocab: dict = {}
+    ua_rows, ua_ids = _sparse_keys(ua_tokens, vocab)
+    ma_rows, ma_ids = _sparse_keys(ma_tokens, vocab)
+    s_rows, s_ids = _sparse_keys(sentence_tokens, vocab)
+    V = max(1, len(vocab))
+
+    ua_keys = np.unique(ua_rows * V + ua_ids)
+    ma_keys = np.unique(ma_rows * V + ma_ids)
+    ma_sizes = np.bincount(ma_keys // V, minlength=n)
+    overlap = np.bincount(ma_keys[np.isin(ma_keys, ua_keys)] // V, minlength=n)
+
+    n_sent = len(sentences)
+    sent_keys = np.unique(s_rows * V + s_ids)
+    sent_of_key = sent_keys // V
+    item_of_sent = np.asarray(sentence_item, dtype=np.int64)
+    in_answer = np.isin(item_of_sent[sent_of_key] * V + sent_keys % V, ua_keys) if n_sent else np.zeros(0, dtype=bool)
+    sent_sizes = np.bincount(sent_of_key, minlength=n_sent)
+    sent_hits = np.bincount(sent_of_key[in_answer], minlength=n_sent)
+    sent_missing = (sent_hits / np.maximum(1, sent_sizes)) < 0.25
+
+    # ---- keyword / structure signals across all answers at once ----
+    texts = np.asarray(ua_lower, dtype=str)
+    n_words = np.asarray([len(t) for t in ua_tokens], dtype=np.int64)
+    digit_char = np.asarray([any(ch.isdigit() for ch in ua) for ua in uas], dtype=bool)
+    digit_token = np.asarray([any(t.isdigit() for t in toks) for toks in ua_tokens], dtype=bool)
+
+    has_example = _keyword_hits(texts, EXAMPLE_KEYWORDS).any(axis=1) | digit_char
+    has_metrics = _keyword_hits(texts, METRIC_KEYWORDS).any(axis=1) | digit_token
+    has_lead = _keyword_hits(texts, LEAD_KEYWORDS).any(axis=1)
+
+    # ---- score: topical relevance + length + deterministic jitter ----
+    ratio = overlap / np.maximum(1, ma_sizes)
+    topical = np.where(ma_sizes > 0, np.minimum(70.0, ratio * 70).astype(np.int64), 0)
+    length_sig = np.minimum(30, ((n_words / 60) * 30).astype(np.int64))
+
+    # same seeded sequence as the scalar evaluator (tip draw, then jitter)
+    jitter = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        rnd = random.Random()
+        rnd.seed(questions[i] + '|' + uas[i])
+        rnd.choice(TIP_TEMPLATES)
+        jitter[i] = rnd.randint(-6, 6)
+    scores = np.clip(topical + length_sig + jitter, 0, 100)
+
+    missing_by_item: list[list[str]] = [[] for _ in range(n)]
+    for j in np.flatnonzero(sent_missing):
+        missing_by_item[sentence_item[j]].append(sentences[j])
+
+    out = []
+    for i in range(n):
+        score = int(scores[i])
+        strengths = []
+        weaknesses = []
+        tips = []
+        if overlap[i] > 0:
+            strengths.append('You covered some of the key points from the ideal answer.')
+        if has_example[i]:
+            strengths.append('Good — you used a short example to illustrate your point.')
+        if has_metrics[i]:
+            strengths.append('Nice use of metrics to quantify impact.')
+
+        if not has_example[i]:
+            weaknesses.append('Missing a concise example — add a 1–2 sentence STAR example (Situation, Action, Result).')
+            tips.append('Pick one relevant project and state what you changed and the measurable outcome.')
+        if not has_metrics[i]:
+            weaknesses.append('No concrete metrics — include an outcome (e.g., % increase, absolute numbers).')
+            tips.append('State the metric you would track and the expected lift (e.g., +8% conversion).')
+        if not has_lead[i]:
+            weaknesses.append('Starts without a one-line summary — lead with your recommendation.')
+            tips.append("Open with a 1-line recommendation, then list 2–3 steps and finish with impact.")
+
+        feedback_lines = [f"Score: {score}/100."]
+        if strengths:
+            feedback_lines.append('What went well:')
+            feedback_lines.extend(f"- {s}" for s in strengths)
+        if weaknesses:
+            feedback_lines.append('What to improve:')
+            feedback_lines.extend(f"- {w}" for w in weaknesses)
+        if tips:
+            feedback_lines.append('Quick tips:')
+            feedback_lines.extend(f"- {t}" for t in tips[:2])
+        if missing_by_item[i]:
+            feedback_lines.append('Example points you could add:')
+            feedback_lines.extend(f"- {p}" for p in missing_by_item[i][:3])
+        feedback_lines.append('Try: Summary → Approach → Example → Metric.')
+
+        out.append({
+            'score': score,
+            'strengths': strengths,
+            'weaknesses': weaknesses,
+            'feedback': '\n'.join(feedback_lines),
+        })
+    return out
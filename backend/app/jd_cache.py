@@ -0,0 +1,231 @@
+"""
+Cache of JD extraction results (company / years of experience / level).
+
+The same job descriptions get pasted again and again, and each paste used to
+cost a full LLM extraction before the first question could be served. Results
+are kept in a `PersistentCache` (namespace "jd_extract", memory LRU in front of
+`cache_entries`) keyed by a fingerprint of the normalized JD text, so repeats
+are a lookup:
+
+- exact: the JD is case-folded and whitespace-collapsed before hashing, so
+  re-pasted text with different line breaks or capitalization still hits
+- near-duplicate: each entry also records a 64-bit SimHash of the JD's word
+  shingles; a miss on the exact key falls back to the closest stored SimHash
+  within `max_distance` bits (e.g. the same posting with a different location
+  line or a trailing "Apply now" footer). SimHash barely moves when one word
+  changes, so "Join Google" and "Join Stripe" in otherwise identical postings
+  usually land within a few bits: a near hit is only used when the cached
+  company name appears in the new JD and the new JD's explicit years
+  requirement (if any) falls in the cached bucket; otherwise it is a miss
+
+The SimHash index lives in memory and is rebuilt from the table on first use,
+so near-duplicate matching also works across restarts and workers.
+"""
+import hashlib
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import or_
+
+from .cache import PersistentCache, content_hash
+from .jd_parser import UNKNOWN_COMPANY, parse_years
+
+NAMESPACE = "jd_extract"
+SIMHASH_BITS = 64
+# SimHash is split into this many bands; two hashes within `max_distance` bits
+# (< bands) share at least one identical band, so only those are compared.
+SIMHASH_BANDS = 8
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_jd(text: str) -> str:
+    """Case-folded JD text with all whitespace runs collapsed to one space."""
+    return " ".join((text or "").casefold().split())
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """64-bit SimHash over word shingles of the normalized text."""
+    words = _WORD_RE.findall(normalize_jd(text))
+    if not words:
+        return 0
+    grams = [" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1))]
+    weights = [0] * SIMHASH_BITS
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _consistent(jd_text: str, details: dict) -> bool:
+    """Whether a near-duplicate's extraction also fits this JD: its company is
+    named here (a cached "Unknown Company" cannot be checked, so it never
+    qualifies) and an explicit years requirement here maps to the same bucket."""
+    company = (details.get("company_name") or "").strip()
+    if not company or company == UNKNOWN_COMPANY:
+        return False
+    if not re.search(r"(?<![\w-])" + re.escape(company) + r"(?![\w-])", jd_text or "", re.IGNORECASE):
+        return False
+    years = parse_years(jd_text)
+    return years is None or years == details.get("years_of_experience")
+
+
+def _bands(h: int) -> list[tuple[int, int]]:
+    mask = (1 << _BAND_BITS) - 1
+    return [(i, (h >> (i * _BAND_BITS)) & mask) for i in range(SIMHASH_BANDS)]
+
+
+class JDExtractionCache:
+    """Exact + near-duplicate lookup of extraction results.
+
+    - `ttl_seconds` / `max_entries` / `persist` configure the underlying cache
+    - `max_distance`: SimHash bits two JDs may differ by to share a result
+      (0 disables near-duplicate matching)
+    - `index_size`: cap on fingerprints kept in the in-memory SimHash index
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 1000,
+        persist: bool = True,
+        max_distance: int = 3,
+        index_size: int = 5000,
+    ):
+        self.cache = PersistentCache(NAMESPACE, max_entries=max_entries, ttl_seconds=ttl_seconds, persist=persist)
+        self.max_distance = max(0, min(int(max_distance), SIMHASH_BANDS - 1))
+        self.index_size = max(1, int(index_size))
+        self._lock = threading.Lock()
+        # fingerprint -> (model, simhash); band -> fingerprints
+        self._hashes: dict[str, tuple[str, int]] = {}
+        self._bands: dict[tuple[int, int], set] = {}
+        self._index_loaded = not persist
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "near_rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> "JDExtractionCache":
+        return cls(
+            ttl_seconds=float(os.environ.get("JD_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            max_entries=int(os.environ.get("JD_CACHE_MAX_ENTRIES", "1000")),
+            persist=str(os.environ.get("JD_CACHE_PERSIST", "1")).lower() in ("1", "true", "yes"),
+            max_distance=int(os.environ.get("JD_CACHE_SIMHASH_DISTANCE", "3")),
+        )
+
+    @staticmethod
+    def fingerprint(jd_text: str, model: str) -> str:
+        return content_hash(NAMESPACE, model, normalize_jd(jd_text))
+
+    # --------------------------- SimHash index --------------------------- #
+    def _index_locked(self, fp: str, model: str, h: int) -> None:
+        if fp in self._hashes:
+            return
+        if len(self._hashes) >= self.index_size:
+            old_fp, (_m, old_h) = next(iter(self._hashes.items()))
+            del self._hashes[old_fp]
+            for band in _bands(old_h):
+                self._bands.get(band, set()).discard(old_fp)
+        self._hashes[fp] = (model, h)
+        for band in _bands(h):
+            self._bands.setdefault(band, set()).add(fp)
+
+    def _load_index(self) -> None:
+        """Seed the SimHash index from unexpired rows (once per process)."""
+        with self._lock:
+            if self._index_loaded:
+                return
+            self._index_loaded = True
+        from .database import SessionLocal
+        from .models import CacheEntry
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(CacheEntry.key, CacheEntry.value)
+                .filter(
+                    CacheEntry.namespace == NAMESPACE,
+                    or_(CacheEntry.expires_at.is_(None), CacheEntry.expires_at > datetime.utcnow()),
+                )
+                .order_by(CacheEntry.id.desc())
+                .limit(self.index_size)
+                .all()
+            )
+        except Exception as e:
+            print(f"[JDExtractionCache] could not load SimHash index: {e}")
+            rows = []
+        finally:
+            db.close()
+        with self._lock:
+            for key, value in rows:
+                if isinstance(value, dict) and value.get("simhash"):
+                    self._index_locked(key, value.get("model") or "", int(value["simhash"], 16))
+        if rows:
+            print(f"[JDExtractionCache] loaded {len(rows)} SimHash fingerprint(s)")
+
+    def _nearest(self, model: str, h: int) -> Optional[tuple[str, int]]:
+        best = None
+        with self._lock:
+            candidates = set()
+            for band in _bands(h):
+                candidates |= self._bands.get(band, set())
+            for fp in candidates:
+                m, other = self._hashes.get(fp, ("", 0))
+                if m != model:
+                    continue
+                d = hamming(h, other)
+                if d <= self.max_distance and (best is None or d < best[1]):
+                    best = (fp, d)
+        return best
+
+    # ----------------------------- public API ---------------------------- #
+    def lookup(self, jd_text: str, model: str) -> tuple[Optional[dict], Optional[str]]:
+        """Return (details, "exact" | "near") on a hit, (None, None) on a miss."""
+        entry = self.cache.get(self.fingerprint(jd_text, model))
+        if isinstance(entry, dict) and entry.get("details"):
+            self._count("exact_hits")
+            return dict(entry["details"]), "exact"
+
+        if self.max_distance:
+            if not self._index_loaded:
+                self._load_index()
+            near = self._nearest(model, simhash(jd_text))
+            if near is not None:
+                entry = self.cache.get(near[0])
+                if isinstance(entry, dict) and entry.get("details"):
+                    if _consistent(jd_text, entry["details"]):
+                        print(f"[JDExtractionCache] near-duplicate JD (distance={near[1]} bits)")
+                        self._count("near_hits")
+                        return dict(entry["details"]), "near"
+                    print(f"[JDExtractionCache] near-duplicate JD (distance={near[1]} bits) names another company or experience; ignoring")
+                    self._count("near_rejected")
+
+        self._count("misses")
+        return None, None
+
+    def store(self, jd_text: str, model: str, details: dict) -> None:
+        fp = self.fingerprint(jd_text, model)
+        h = simhash(jd_text)
+        self.cache.set(fp, {"details": dict(details), "simhash": format(h, "016x"), "model": model})
+        with self._lock:
+            self._index_locked(fp, model, h)
+        self._count("stores")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["indexed"] = len(self._hashes)
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["near_hits"]) / lookups, 4) if lookups else 0.0
+        stats["max_distance"] = self.max_distance
+        stats["cache"] = self.cache.stats()
+        return stats
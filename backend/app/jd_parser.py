@@ -0,0 +1,263 @@
+"""
+Deterministic JD parser that runs ahead of the LLM extraction.
+
+Most job descriptions name the company and the experience requirement
+plainly ("Senior Product Manager at Google", "5+ years of product
+management experience"), so `parse_jd` finds them with a multi-pattern
+company matcher over the known company vocabulary, a years-of-experience
+parser and a seniority-title parser, in a few milliseconds. It reports a
+confidence in [0, 1]; `AIService.extract_details_from_jd` only calls the LLM
+when that is below JD_FAST_PATH_MIN_CONFIDENCE.
+
+Confidence is the mean of the company and experience confidences:
+- company: only mentions in hiring context count as the employer: the JD's
+  header line, "at X", "Join X", "About X", "X is hiring" and the like. Among
+  those, 1.0 for a single (or clearly dominant) company and 0.5 when several
+  are mentioned about equally often (the first mention wins). Known names
+  that only appear elsewhere ("payment gateways such as Stripe") are capped
+  at UNCONFIRMED_COMPANY_CONFIDENCE, which keeps the total below the fast-path
+  threshold so the LLM decides; 0 when none is found. A name followed by a
+  product word ("Google Analytics", "Microsoft Excel") is a tool, not the
+  employer, and is ignored outside hiring context
+- experience: 1.0 for an explicit "N+ years" / "N-M years" requirement (0.8
+  when a seniority title implies a higher bucket, which then wins), 0.6 for a
+  specific seniority title only, 0.3 for a plain "product manager" title, 0
+  when neither is found (the "6-10" default applies)
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from .multi_match import MultiPatternMatcher
+
+DEFAULT_YEARS = "6-10"
+BUCKETS = ["0-2", "3-5", "6-10", "10+"]
+DEFAULT_LEVEL = "Strategic"
+UNKNOWN_COMPANY = "Unknown Company"
+# Company confidence for known names seen outside hiring context: even with an
+# explicit years requirement (1.0) the total stays at 0.7, under the default
+# JD_FAST_PATH_MIN_CONFIDENCE of 0.8.
+UNCONFIRMED_COMPANY_CONFIDENCE = 0.4
+# A header line longer than this is body text (a JD pasted as one paragraph).
+HEADER_MAX_CHARS = 120
+
+# Words that, right after a company name, make it a product or tool mention.
+PRODUCT_WORDS = frozenset({
+    "analytics", "ads", "adwords", "adsense", "cloud", "maps", "drive", "docs", "sheets", "slides",
+    "workspace", "play", "pay", "wallet", "search", "console", "firebase", "bigquery", "tag",
+    "excel", "office", "teams", "azure", "powerpoint", "word", "dynamics", "outlook", "sharepoint",
+    "aws", "web", "services", "prime", "alexa", "s3", "ec2", "lambda",
+    "api", "apis", "sdk", "sdks", "checkout", "connect", "billing", "payments", "gateway", "radar",
+    "store", "app", "apps", "platform", "kit", "marketplace", "crm", "desk", "books", "suite",
+    "commerce", "pixel", "business", "graph",
+})
+
+# Hiring context right before / right after a company mention.
+_HIRING_BEFORE = re.compile(
+    r"\b(?:at|join|joining|about|careers at|work at|working at|role at|team at)\s+(?:the\s+)?$", re.IGNORECASE
+)
+_HIRING_AFTER = re.compile(
+    r"(?:\s+(?:is|are)\s+(?:hiring|looking|seeking|searching|recruiting)\b|\s+seeks\b|\s+(?:careers|jobs)\b|\s*\|)",
+    re.IGNORECASE,
+)
+
+_YEARS_PATTERNS = [
+    # "3-5 years", "5 to 8 yrs", "3–5+ years"
+    re.compile(r"\b(\d{1,2})\s*(?:-|–|—|to)\s*(\d{1,2})\s*\+?\s*(?:years|yrs)\b"),
+    # "5+ years", "7 plus years"
+    re.compile(r"\b(\d{1,2})\s*(?:\+|plus)\s*(?:years|yrs)\b"),
+    # "at least 4 years", "minimum of 6 years"
+    re.compile(r"\b(?:at least|minimum(?: of)?|min\.?)\s*(\d{1,2})\s*(?:years|yrs)\b"),
+    # "4 years of (product management) experience"
+    re.compile(r"\b(\d{1,2})\s*(?:years|yrs)\b(?:\s+of)?(?:\s+[a-z/&-]+){0,4}?\s+experience\b"),
+]
+
+# (pattern, years bucket, confidence); first match in JD order wins
+_TITLE_PATTERNS = [
+    (re.compile(r"\b(?:principal product manager|principal pm|group product manager|group pm|director of product|product director|head of product|vp,? (?:of )?product|vice president)\b"), "10+", 0.6),
+    (re.compile(r"\b(?:senior product manager|senior pm|sr\.? product manager|sr\.? pm|lead product manager)\b"), "6-10", 0.6),
+    (re.compile(r"\b(?:associate product manager|apm|junior product manager|entry[- ]level|new grad(?:uate)?|product management intern)\b"), "0-2", 0.6),
+    (re.compile(r"\bproduct manager\b"), "3-5", 0.3),
+]
+
+
+def years_to_bucket(years: float) -> str:
+    """Map a years-of-experience figure to the question buckets. Boundaries
+    follow the question bank's own mapping (load_questions._map_years_to_bucket):
+    a "5+ years" requirement is the top of "3-5", and "6+" starts "6-10"."""
+    if years < 3:
+        return "0-2"
+    if years < 6:
+        return "3-5"
+    if years < 10:
+        return "6-10"
+    return "10+"
+
+
+def split_companies(companies: Iterable[str]) -> list[str]:
+    """Individual names from the vocabulary (CSV rows may list several, comma-separated)."""
+    names = set()
+    for entry in companies or []:
+        for name in str(entry).split(","):
+            name = name.strip()
+            if name and name != UNKNOWN_COMPANY:
+                names.add(name)
+    return sorted(names)
+
+
+@lru_cache(maxsize=8)
+def company_matcher(names: tuple) -> Optional[MultiPatternMatcher]:
+    """Matcher over the company names, built once per vocabulary. A hyphen
+    counts as part of a word, so "Google-like" or "Meta-owned" is not a mention."""
+    return MultiPatternMatcher(names, whole_words=True, word_chars="-") if names else None
+
+
+@lru_cache(maxsize=8)
+def company_scanner(names: tuple) -> Optional[MultiPatternMatcher]:
+    """Plain case-insensitive substring matcher over the company names (no word
+    boundaries or hiring-context filters), for last-chance scans."""
+    return MultiPatternMatcher(names) if names else None
+
+
+def _header_end(jd_text: str) -> int:
+    """End offset of the JD's first non-empty line, or 0 when there is no
+    separate title line (single-line JD, or a first line too long for a title)."""
+    body = jd_text.lstrip()
+    if "\n" not in body.rstrip():
+        return 0
+    offset = len(jd_text) - len(body)
+    line = body.split("\n", 1)[0]
+    return offset + len(line) if len(line.strip()) <= HEADER_MAX_CHARS else 0
+
+
+def _hiring_phrase_before(jd_text: str, start: int) -> bool:
+    line_start = jd_text.rfind("\n", 0, start) + 1
+    return bool(_HIRING_BEFORE.search(jd_text[max(line_start, start - 40):start]))
+
+
+def in_hiring_context(jd_text: str, start: int, end: int, header_end: Optional[int] = None) -> bool:
+    """True when the mention at [start, end) names the employer: it is in the
+    header line, or preceded by "at"/"Join"/"About" or followed by "is hiring"."""
+    if header_end is None:
+        header_end = _header_end(jd_text)
+    if start < header_end:
+        return True
+    return _hiring_phrase_before(jd_text, start) or bool(_HIRING_AFTER.match(jd_text, end))
+
+
+def _product_mention(jd_text: str, end: int) -> bool:
+    m = re.match(r"[ \t]+([A-Za-z0-9]+)", jd_text[end:end + 30])
+    return bool(m) and m.group(1).lower() in PRODUCT_WORDS
+
+
+def company_mentions(jd_text: str, companies: Iterable[str]) -> list[tuple]:
+    """(company, in hiring context) for each known company mention, in JD order.
+
+    Matching is case-insensitive, but a mention must start with a capital
+    letter (company names are proper nouns), so "apple pie" or "square
+    footage" do not count. Product mentions ("Google Analytics") are dropped
+    unless a hiring phrase precedes them ("Join Google Cloud")."""
+    matcher = company_matcher(tuple(split_companies(companies)))
+    if matcher is None or not jd_text:
+        return []
+    header_end = _header_end(jd_text)
+    mentions = []
+    # longest match wins ("Zoho CRM" over "Zoho")
+    for hit in matcher.leftmost_longest(jd_text):
+        if not jd_text[hit.start].isupper():
+            continue
+        if _product_mention(jd_text, hit.end) and not _hiring_phrase_before(jd_text, hit.start):
+            continue
+        hiring = in_hiring_context(jd_text, hit.start, hit.end, header_end)
+        mentions.append((hit.pattern, hiring))
+    return mentions
+
+
+def match_companies(jd_text: str, companies: Iterable[str]) -> Counter:
+    """Known company names mentioned in the JD (product mentions excluded),
+    with mention counts."""
+    return Counter(name for name, _ in company_mentions(jd_text, companies))
+
+
+def _pick_company(counts: Counter) -> tuple[str, float]:
+    if not counts:
+        return UNKNOWN_COMPANY, 0.0
+    ranked = counts.most_common()
+    top, top_count = ranked[0]
+    if len(ranked) == 1 or top_count >= 2 * ranked[1][1]:
+        return top, 1.0
+    return top, 0.5
+
+
+def pick_company(jd_text: str, companies: Iterable[str]) -> tuple[str, float]:
+    """(company, confidence): hiring-context mentions decide; other mentions
+    only give a capped confidence (see module docstring)."""
+    mentions = company_mentions(jd_text, companies)
+    hiring = Counter(name for name, is_hiring in mentions if is_hiring)
+    if hiring:
+        return _pick_company(hiring)
+    company, conf = _pick_company(Counter(name for name, _ in mentions))
+    return company, min(conf, UNCONFIRMED_COMPANY_CONFIDENCE)
+
+
+def parse_years(jd_text: str) -> Optional[str]:
+    """Bucket of the highest explicit experience requirement, or None."""
+    text = (jd_text or "").lower()
+    best = None
+    for pattern in _YEARS_PATTERNS:
+        for m in pattern.finditer(text):
+            nums = [int(g) for g in m.groups() if g is not None]
+            if not nums or max(nums) > 25:
+                continue
+            # ranges count at their midpoint ("5-8 years" is a senior role)
+            value = sum(nums) / len(nums) if len(nums) == 2 else nums[0]
+            best = value if best is None else max(best, value)
+    return years_to_bucket(best) if best is not None else None
+
+
+def parse_seniority(jd_text: str) -> tuple[Optional[str], float]:
+    """(bucket, confidence) from the earliest seniority title in the JD."""
+    text = (jd_text or "").lower()
+    found = None
+    for pattern, bucket, conf in _TITLE_PATTERNS:
+        m = pattern.search(text)
+        if m and (found is None or m.start() < found[0] or (m.start() == found[0] and conf > found[2])):
+            found = (m.start(), bucket, conf)
+    return (found[1], found[2]) if found else (None, 0.0)
+
+
+def parse_level(jd_text: str, levels: Iterable[str]) -> str:
+    """Most frequently mentioned question category (at least twice, so a
+    passing "remote" or "growth" does not decide it), defaulting to "Strategic"."""
+    text = (jd_text or "").lower()
+    best, best_count = DEFAULT_LEVEL, 1
+    for level in levels or []:
+        count = len(re.findall(r"\b" + re.escape(str(level).lower()) + r"\b", text))
+        if count > best_count:
+            best, best_count = level, count
+    return best
+
+
+def parse_jd(jd_text: str, companies: Iterable[str], levels: Iterable[str] = ()) -> dict:
+    """Deterministic extraction: company_name, years_of_experience, level and
+    a `confidence` in [0, 1] (see module docstring)."""
+    company, company_conf = pick_company(jd_text, companies)
+
+    years = parse_years(jd_text)
+    title_years, title_conf = parse_seniority(jd_text)
+    if years:
+        years_conf = 1.0
+        # "Senior PM, 5+ years": the title says more than the number alone
+        if title_years and title_conf >= 0.6 and BUCKETS.index(title_years) > BUCKETS.index(years):
+            years, years_conf = title_years, 0.8
+    else:
+        years, years_conf = title_years, title_conf
+    years = years or DEFAULT_YEARS
+
+    return {
+        "company_name": company,
+        "years_of_experience": years,
+        "level": parse_level(jd_text, levels),
+        "confidence": round((company_conf + years_conf) / 2, 2),
+    }
@@ -0,0 +1,239 @@
+"""
+Connection-pooled HTTP clients shared by every AIService call to the LLM wrapper.
+
+Each interview makes 8-20 round-trips to `pmbot-llm-stub`; going through one
+keep-alive pool avoids a fresh TCP handshake (and a TIME_WAIT socket) per call.
+`LLMHttpClient` serves the sync (thread-pooled) routes, `AsyncLLMHttpClient`
+serves the async routes without blocking the event loop.
+"""
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return str(os.environ.get(name, default)).lower() in ("1", "true", "yes")
+
+
+class LLMHttpClient:
+    """Thread-safe wrapper around a single pooled `requests.Session`.
+
+    - `pool_connections`: number of per-host pools kept (wrapper, Ollama, ...)
+    - `pool_maxsize`: keep-alive connections kept per host
+    - `pool_block`: when true, `pool_maxsize` is also a hard per-host limit and
+      extra callers wait for a free connection instead of opening a new one
+    - `connect_timeout` / `read_timeout`: passed to requests as a tuple so a
+      dead host fails fast while slow generations are still allowed to finish
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        pool_block: bool = True,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 600.0,
+    ):
+        self.pool_connections = max(1, int(pool_connections))
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.pool_block = bool(pool_block)
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=0,  # AIService implements its own retry/backoff
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMHttpClient":
+        return cls(
+            pool_connections=_env_int("LLM_POOL_CONNECTIONS", 4),
+            pool_maxsize=_env_int("LLM_POOL_MAXSIZE", 16),
+            pool_block=_env_flag("LLM_POOL_BLOCK", "1"),
+            connect_timeout=_env_float("LLM_CONNECT_TIMEOUT", 5.0),
+            read_timeout=_env_float("LLM_READ_TIMEOUT", 600.0),
+        )
+
+    def timeout(self, read_timeout: float | None = None) -> tuple:
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def request(self, method: str, url: str, read_timeout: float | None = None, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout(read_timeout))
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get(self, url: str, read_timeout: float | None = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, read_timeout=read_timeout, **kwargs)
+
+    def post(self, url: str, read_timeout: float | None = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, read_timeout=read_timeout, **kwargs)
+
+    def stats(self) -> dict:
+        """Pool configuration, request counters and per-host urllib3 pool usage."""
+        hosts = []
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            queued = list(getattr(pool.pool, "queue", []) or [])
+            hosts.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                # total connections ever opened vs requests served shows reuse
+                "connections_opened": pool.num_connections,
+                "requests_served": pool.num_requests,
+                "idle_connections": sum(1 for c in queued if c is not None),
+                "maxsize": self.pool_maxsize,
+            })
+        with self._lock:
+            counters = {
+                "requests": self._requests,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+            }
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            **counters,
+            "hosts": hosts,
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncLLMHttpClient:
+    """Async counterpart of `LLMHttpClient` backed by `httpx.AsyncClient`.
+
+    The underlying client is created lazily on first use so it binds to the
+    running uvicorn event loop rather than to whatever loop (if any) exists
+    when `AIService` is instantiated at import time.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 16,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 600.0,
+    ):
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self._client: httpx.AsyncClient | None = None
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "AsyncLLMHttpClient":
+        return cls(
+            pool_maxsize=_env_int("LLM_POOL_MAXSIZE", 16),
+            connect_timeout=_env_float("LLM_CONNECT_TIMEOUT", 5.0),
+            read_timeout=_env_float("LLM_READ_TIMEOUT", 600.0),
+        )
+
+    def timeout(self, read_timeout: float | None = None) -> httpx.Timeout:
+        read = read_timeout if read_timeout is not None else self.read_timeout
+        return httpx.Timeout(read, connect=self.connect_timeout)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout(),
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize,
+                ),
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, read_timeout: float | None = None, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout(read_timeout))
+        # Single event loop: plain counters are safe without a lock here.
+        self._requests += 1
+        self._in_flight += 1
+        try:
+            return await self._get_client().request(method, url, **kwargs)
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    async def stream(self, method: str, url: str, read_timeout: float | None = None, **kwargs) -> httpx.Response:
+        """Send a request and return as soon as the headers arrive; the caller
+        reads the body (`aiter_lines`) and must `aclose()` the response."""
+        client = self._get_client()
+        kwargs.setdefault("timeout", self.timeout(read_timeout))
+        self._requests += 1
+        self._in_flight += 1
+        try:
+            return await client.send(client.build_request(method, url, **kwargs), stream=True)
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    async def get(self, url: str, read_timeout: float | None = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, read_timeout=read_timeout, **kwargs)
+
+    async def post(self, url: str, read_timeout: float | None = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, read_timeout=read_timeout, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "pool_maxsize": self.pool_maxsize,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "requests": self._requests,
+            "errors": self._errors,
+            "in_flight": self._in_flight,
+            "open": self._client is not None and not self._client.is_closed,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
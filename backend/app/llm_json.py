@@ -0,0 +1,254 @@
+"""
+Tolerant JSON extraction for LLM output.
+
+Models wrap JSON in code fences or prose, use single quotes or Python literals,
+leave trailing commas, and get cut off mid-array by output limits. A failed
+`json.loads` used to cost a whole second LLM call; `parse_llm_json` repairs
+what it can and, for arrays, returns every complete element it found, so only
+the elements that are really missing need another call.
+
+Standard library only: the Ollama wrapper in llm_stub/ imports this module
+too (its image copies it from app/, a checkout finds it via sys.path).
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+_FENCE_RE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)(?:```|$)", re.S)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+@dataclass
+class ParsedJSON:
+    """Outcome of `parse_llm_json`.
+
+    value         parsed object/array (for arrays: only the elements that parsed)
+    repaired      the text needed fixes (fences, quotes, commas, literals)
+    truncated     the JSON was cut off; `value` holds what could be closed/recovered
+    items_found   top-level array elements seen (complete or not)
+    failed_items  positions of array elements that could not be parsed, including
+                  a trailing element cut off by truncation
+    lone_object   an array was expected but the output is a single object: `value`
+                  is that object (not an array, so `indexed_items()` is empty)
+    """
+    value: Any = None
+    repaired: bool = False
+    truncated: bool = False
+    items_found: int = 0
+    failed_items: list = field(default_factory=list)
+    lone_object: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.value is not None
+
+    def indexed_items(self) -> list:
+        """(position, element) pairs of a parsed array, skipping failed positions."""
+        if not isinstance(self.value, list):
+            return []
+        positions = [p for p in range(self.items_found) if p not in self.failed_items]
+        return list(zip(positions, self.value))
+
+
+def strip_code_fences(text: str) -> str:
+    """Contents of the first ``` fenced block, or the text unchanged."""
+    m = _FENCE_RE.search(text or "")
+    return m.group(1) if m else (text or "")
+
+
+def _normalize(text: str) -> str:
+    """Single pass that rewrites single-quoted strings to double-quoted ones,
+    escapes raw newlines inside strings, drops trailing commas and maps Python
+    literals, without touching the contents of double-quoted strings."""
+    out = []
+    i = 0
+    n = len(text)
+    quote = None  # active string delimiter
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < n:
+                nxt = text[i + 1]
+                # \' is not a valid JSON escape
+                out.append("'" if nxt == "'" else ch + nxt)
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':  # bare double quote inside a single-quoted string
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\r":
+                pass
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+            i += 1
+            continue
+        if ch == ",":
+            j = i + 1
+            while j < n and text[j] in " \t\r\n":
+                j += 1
+            if j < n and text[j] in "]}":
+                i += 1  # trailing comma
+                continue
+        if ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        out.append(ch)
+        i += 1
+    if quote:
+        out.append('"')  # close a string cut off by truncation
+    return "".join(out)
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except Exception:
+        return None
+
+
+def _scan(text: str, start: int):
+    """From the opening bracket at `start`, return (end_index or None, [(s, e) of
+    top-level elements], open-bracket stack at the point the text ended)."""
+    stack = []
+    elements = []
+    elem_start = None
+    in_str = False
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_str:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == '"':
+                in_str = False
+            i += 1
+            continue
+        if ch == '"':
+            in_str = True
+            if len(stack) == 1 and elem_start is None:
+                elem_start = i
+        elif ch in "[{":
+            if len(stack) == 1 and elem_start is None:
+                elem_start = i
+            stack.append(ch)
+        elif ch in "]}":
+            if len(stack) == 1:
+                if elem_start is not None:
+                    elements.append((elem_start, i))
+                    elem_start = None
+                return i, elements, []
+            stack.pop()
+        elif ch == "," and len(stack) == 1:
+            if elem_start is not None:
+                elements.append((elem_start, i))
+            elem_start = None
+        elif not ch.isspace() and len(stack) == 1 and elem_start is None:
+            elem_start = i
+        i += 1
+    if elem_start is not None:
+        elements.append((elem_start, None))  # cut off mid-element
+    return None, elements, stack
+
+
+def _close_truncated(fragment: str, stack: list) -> Optional[Any]:
+    """Best effort for a cut-off object: drop the dangling key/value and close."""
+    closers = {"{": "}", "[": "]"}
+    text = fragment.rstrip()
+    for _ in range(3):
+        candidate = text.rstrip().rstrip(",:") + "".join(closers[c] for c in reversed(stack))
+        value = _loads(_normalize(candidate))
+        if value is not None:
+            return value
+        # drop the last (partial) member and try again
+        cut = max(text.rfind(","), text.rfind("{"), text.rfind("["))
+        if cut <= 0:
+            break
+        text = text[:cut] if text[cut] == "," else text[:cut + 1]
+    return None
+
+
+def parse_llm_json(text: str, expect: Optional[str] = None) -> ParsedJSON:
+    """Extract JSON from raw model output.
+
+    `expect` is "object", "array" or None (whichever bracket comes first). For
+    arrays, every complete element is parsed on its own, so one malformed or
+    truncated element does not lose the others. When an array is expected but
+    the first top-level bracket opens an object, that object is returned with
+    `lone_object` set instead of looking for a list inside it.
+    """
+    result = ParsedJSON()
+    if not text or not text.strip():
+        return result
+
+    direct = _loads(text.strip())
+    if direct is not None and (
+        expect is None
+        or (expect == "array" and isinstance(direct, list))
+        or (expect == "object" and isinstance(direct, dict))
+    ):
+        result.value = direct
+        result.items_found = len(direct) if isinstance(direct, list) else 0
+        return result
+    if expect == "array" and isinstance(direct, dict):
+        result.value = direct
+        result.lone_object = True
+        return result
+
+    result.repaired = True
+    raw = strip_code_fences(text).translate(_SMART_QUOTES)
+    # an expected array may come back as a lone object: the first bracket decides
+    openers = "{" if expect == "object" else "[{"
+    positions = [p for p in (raw.find(c) for c in openers) if p != -1]
+    if not positions:
+        return result
+    result.lone_object = expect == "array" and raw[min(positions)] == "{"
+    # normalize from the opening bracket on, so apostrophes in leading prose
+    # are not mistaken for single-quoted strings
+    body = _normalize(raw[min(positions):])
+
+    end, elements, stack = _scan(body, 0)
+    if end is not None:
+        whole = _loads(body[:end + 1])
+        if whole is not None:
+            result.value = whole
+            result.items_found = len(whole) if isinstance(whole, list) else 0
+            return result
+    else:
+        result.truncated = True
+
+    if body[0] == "{":
+        result.value = _close_truncated(body, stack) if end is None else None
+        return result
+
+    # array: keep every element that parses on its own
+    items = []
+    for pos, (s, e) in enumerate(elements):
+        value = _loads(body[s:e].strip()) if e is not None else None
+        if value is None:
+            result.failed_items.append(pos)
+        else:
+            items.append(value)
+    result.items_found = len(elements)
+    result.value = items
+    return result
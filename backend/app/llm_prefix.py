@@ -0,0 +1,132 @@
+"""
+Prompt-prefix reuse bookkeeping for Ollama `/api/generate` calls.
+
+AIService sends each task's fixed instructions as a stable `system` prompt and
+only the per-request text as `prompt`, with `keep_alive` so the model stays
+loaded. Ollama keeps the KV state of the last evaluated prompt per runner slot,
+so when consecutive calls share the same system prefix only the new tokens are
+evaluated; the response's `prompt_eval_count` then comes back well below the
+size of the full prompt (or is omitted entirely when everything was cached).
+
+- `PrefixCacheTracker` turns those counts into hit/miss statistics per task
+- `PromptContextStore` keeps the `context` token array returned by a priming
+  call per (model, system prompt), for the opt-in `LLM_REUSE_CONTEXT` mode
+  where later calls continue from that context instead of re-sending the prefix
+"""
+import threading
+from typing import Optional
+
+from .cache import content_hash
+
+# Rough chars-per-token ratio used to size prompts without a tokenizer.
+CHARS_PER_TOKEN = 4
+# A call counts as a prefix hit when at least this share of the system prompt's
+# estimated tokens was not re-evaluated.
+HIT_FRACTION = 0.5
+# Ollama reports durations in nanoseconds; loads longer than this mean the model
+# was not resident (keep_alive expired or evicted).
+COLD_LOAD_NS = 500_000_000
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1 if text else 0
+
+
+class PrefixCacheTracker:
+    """Thread-safe per-task counters derived from Ollama's timing fields."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: dict[str, dict] = {}
+
+    def _task_locked(self, task: str) -> dict:
+        t = self._tasks.get(task)
+        if t is None:
+            t = self._tasks[task] = {
+                "calls": 0,
+                "reported": 0,
+                "prefix_hits": 0,
+                "cold_loads": 0,
+                "prompt_tokens_est": 0,
+                "prompt_tokens_evaluated": 0,
+            }
+        return t
+
+    def record(self, task: str, system: Optional[str], prompt: str, resp_json: dict) -> Optional[bool]:
+        """Record one response; returns True/False for a prefix hit, or None when
+        the backend did not report token counts (e.g. the wrapper's own routes)."""
+        if not isinstance(resp_json, dict):
+            return None
+        evaluated = resp_json.get("prompt_eval_count")
+        generated = resp_json.get("eval_count")
+        load_ns = resp_json.get("load_duration") or 0
+        system_tokens = estimate_tokens(system)
+        total_tokens = system_tokens + estimate_tokens(prompt)
+
+        hit = None
+        if evaluated is not None or generated is not None:
+            # a missing prompt_eval_count next to an eval_count means the whole
+            # prompt came from cache
+            evaluated = int(evaluated or 0)
+            hit = bool(system_tokens) and (total_tokens - evaluated) >= HIT_FRACTION * system_tokens
+
+        with self._lock:
+            t = self._task_locked(task)
+            t["calls"] += 1
+            t["prompt_tokens_est"] += total_tokens
+            if load_ns >= COLD_LOAD_NS:
+                t["cold_loads"] += 1
+            if hit is not None:
+                t["reported"] += 1
+                t["prompt_tokens_evaluated"] += evaluated
+                if hit:
+                    t["prefix_hits"] += 1
+        return hit
+
+    def stats(self) -> dict:
+        with self._lock:
+            tasks = {}
+            for name, t in self._tasks.items():
+                tasks[name] = {
+                    **t,
+                    "hit_rate": round(t["prefix_hits"] / t["reported"], 3) if t["reported"] else None,
+                }
+            reported = sum(t["reported"] for t in self._tasks.values())
+            hits = sum(t["prefix_hits"] for t in self._tasks.values())
+            return {
+                "calls": sum(t["calls"] for t in self._tasks.values()),
+                "reported": reported,
+                "prefix_hits": hits,
+                "hit_rate": round(hits / reported, 3) if reported else None,
+                "cold_loads": sum(t["cold_loads"] for t in self._tasks.values()),
+                "tasks": tasks,
+            }
+
+
+class PromptContextStore:
+    """`context` arrays from priming calls, keyed by (model, system prompt)."""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._contexts: dict[str, list] = {}
+
+    @staticmethod
+    def key(model: str, system: str) -> str:
+        return content_hash(model or "", system or "")
+
+    def get(self, model: str, system: str) -> Optional[list]:
+        with self._lock:
+            return self._contexts.get(self.key(model, system))
+
+    def set(self, model: str, system: str, context: list) -> None:
+        if not isinstance(context, list) or not context:
+            return
+        with self._lock:
+            if len(self._contexts) >= self.max_entries:
+                self._contexts.pop(next(iter(self._contexts)))
+            self._contexts[self.key(model, system)] = context
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._contexts), "max_entries": self.max_entries}
@@ -0,0 +1,138 @@
+"""
+Per-task generation profiles for Ollama calls.
+
+Calls used to send no generation options at all, so nothing bounded how long a
+rambling model could keep decoding text that was then truncated or discarded.
+Every call type now has a `GenerationProfile` that becomes the `options` of the
+`/api/generate` request:
+
+- `num_predict`: output token cap (per item for batch tasks, so a 4-item batch
+  gets 4x the single-item cap), never more than the context has room for
+- `num_ctx`: context window; one shared value (LLM_NUM_CTX) by default, since
+  Ollama reloads the model whenever a request asks for a different num_ctx
+- `temperature`, `stop`
+- `expect_json`: "object" / "array" when the task answers with one JSON value,
+  so a streamed call can stop as soon as it is complete (app/llm_stream.py)
+
+Because the output is capped, each call's worst-case duration is bounded too:
+`deadline_seconds` is the time to decode `num_predict` tokens at a floor decode
+rate (LLM_MIN_TOKENS_PER_SECOND) plus a fixed allowance for loading and prompt
+evaluation (LLM_CALL_OVERHEAD_SECONDS), and is used as the call's read timeout.
+
+Overrides per task: LLM_PROFILE_<TASK>="num_predict=300;temperature=0.1;stop=END|###"
+(e.g. LLM_PROFILE_EVALUATE). Standard library only: the Ollama wrapper in
+llm_stub/ imports this module too (its image copies it from app/, a checkout
+finds it via sys.path).
+"""
+import os
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+# Shared context window for every task (see module docstring).
+DEFAULT_NUM_CTX = 8192
+# Never cap the output below this many tokens, however long the prompt.
+MIN_NUM_PREDICT = 64
+# Deadline inputs: slowest acceptable decode rate and the allowance for model
+# load + prompt evaluation.
+MIN_TOKENS_PER_SECOND = float(os.environ.get("LLM_MIN_TOKENS_PER_SECOND", "5"))
+CALL_OVERHEAD_SECONDS = float(os.environ.get("LLM_CALL_OVERHEAD_SECONDS", "60"))
+
+
+def decode_deadline(num_predict: int, min_tokens_per_second: float = MIN_TOKENS_PER_SECOND,
+                    overhead_seconds: float = CALL_OVERHEAD_SECONDS) -> float:
+    """Worst-case seconds for a call that may decode up to `num_predict` tokens."""
+    return overhead_seconds + max(0, int(num_predict)) / max(0.1, min_tokens_per_second)
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    task: str
+    num_predict: int
+    temperature: float
+    num_ctx: int = DEFAULT_NUM_CTX
+    stop: tuple = field(default_factory=tuple)
+    per_item: bool = False
+    expect_json: Optional[str] = None
+
+    def max_tokens(self, items: int = 1, prompt_tokens: int = 0) -> int:
+        tokens = self.num_predict * max(1, int(items)) if self.per_item else self.num_predict
+        room = self.num_ctx - max(0, int(prompt_tokens))
+        return max(MIN_NUM_PREDICT, min(tokens, room))
+
+    def options(self, items: int = 1, prompt_tokens: int = 0) -> dict:
+        """Ollama `options` for one call."""
+        opts = {
+            "num_predict": self.max_tokens(items, prompt_tokens),
+            "num_ctx": self.num_ctx,
+            "temperature": self.temperature,
+        }
+        if self.stop:
+            opts["stop"] = list(self.stop)
+        return opts
+
+    def deadline_seconds(self, items: int = 1, prompt_tokens: int = 0,
+                         min_tokens_per_second: float = MIN_TOKENS_PER_SECOND,
+                         overhead_seconds: float = CALL_OVERHEAD_SECONDS) -> float:
+        """Worst-case duration of one call with these options."""
+        return decode_deadline(self.max_tokens(items, prompt_tokens), min_tokens_per_second, overhead_seconds)
+
+    def describe(self, items: int = 1, prompt_tokens: int = 0) -> str:
+        opts = self.options(items, prompt_tokens)
+        stop = f" stop={opts['stop']}" if "stop" in opts else ""
+        return f"task={self.task} num_predict={opts['num_predict']} num_ctx={opts['num_ctx']} temperature={opts['temperature']}{stop}"
+
+
+# Output caps sized from what each task actually returns: a JD extraction is a
+# three-key object, a model answer a few short sections, an evaluation a score
+# with a handful of bullet points.
+DEFAULT_PROFILES = {
+    "jd_extract": GenerationProfile("jd_extract", num_predict=128, temperature=0.0, expect_json="object"),
+    "answer": GenerationProfile("answer", num_predict=512, temperature=0.6, stop=("\nQuestion:",)),
+    "answers_batch": GenerationProfile("answers_batch", num_predict=450, temperature=0.6, per_item=True, expect_json="array"),
+    "evaluate": GenerationProfile("evaluate", num_predict=384, temperature=0.2, expect_json="object"),
+    "evaluate_retry": GenerationProfile("evaluate_retry", num_predict=256, temperature=0.1, expect_json="object"),
+    # model answer + evaluation per item
+    "evaluate_batch": GenerationProfile("evaluate_batch", num_predict=600, temperature=0.2, per_item=True, expect_json="array"),
+    # anything without its own profile (e.g. raw /api/generate through the wrapper)
+    "generate": GenerationProfile("generate", num_predict=512, temperature=0.6),
+}
+
+
+def _parse_override(base: GenerationProfile, spec: str) -> GenerationProfile:
+    changes = {}
+    for part in (spec or "").split(";"):
+        if "=" not in part:
+            continue
+        key, value = (s.strip() for s in part.split("=", 1))
+        try:
+            if key in ("num_predict", "num_ctx"):
+                changes[key] = int(value)
+            elif key == "temperature":
+                changes[key] = float(value)
+            elif key == "stop":
+                changes[key] = tuple(s for s in value.split("|") if s)
+            elif key == "per_item":
+                changes[key] = value.lower() in ("1", "true", "yes")
+            elif key == "expect_json":
+                changes[key] = value if value in ("object", "array") else None
+        except ValueError:
+            print(f"[llm_profiles] ignoring bad value for {base.task}.{key}: {value!r}")
+    return replace(base, **changes) if changes else base
+
+
+def load_profiles(env: Optional[dict] = None) -> dict:
+    """DEFAULT_PROFILES with LLM_NUM_CTX and LLM_PROFILE_<TASK> overrides applied."""
+    env = os.environ if env is None else env
+    num_ctx = int(env.get("LLM_NUM_CTX", str(DEFAULT_NUM_CTX)))
+    profiles = {}
+    for task, profile in DEFAULT_PROFILES.items():
+        profile = replace(profile, num_ctx=num_ctx)
+        profiles[task] = _parse_override(profile, env.get(f"LLM_PROFILE_{task.upper()}", ""))
+    return profiles
+
+
+PROFILES = load_profiles()
+
+
+def profile_for(task: str) -> GenerationProfile:
+    return PROFILES.get(task) or PROFILES["generate"]
@@ -0,0 +1,219 @@
+"""
+Per-task model routing with latency budgets.
+
+AIService used one model for everything (plus hard-coded model names for the
+wrapper routes). `ModelRouter` maps each LLM task to a route, and each route to
+an ordered chain of models: the configured primary first, then smaller models
+to fall back to. Latencies are recorded per (route, model); when the p95 of the
+model currently serving a route exceeds the route's budget, the route is
+downgraded to the next model in its chain. After `recovery_seconds` the route
+goes back to its primary, which has to prove itself again over a fresh window.
+
+Routes and their settings (all optional):
+
+- jd_extract (task jd_extract): LLM_MODEL_JD_EXTRACT, LLM_FALLBACK_MODELS_JD_EXTRACT,
+  LLM_BUDGET_MS_JD_EXTRACT
+- answer (tasks answer, answers_batch): LLM_ANSWER_MODEL, LLM_FALLBACK_MODELS_ANSWER,
+  LLM_BUDGET_MS_ANSWER
+- evaluate (tasks evaluate, evaluate_retry, evaluate_batch): LLM_MODEL_EVALUATE,
+  LLM_FALLBACK_MODELS_EVALUATE, LLM_BUDGET_MS_EVALUATE
+
+An unset primary means "the caller's default": LLM_MODEL for JD extraction and
+evaluation, and `AIService.answer_model` (LLM_ANSWER_MODEL, which
+precompute_answers.py can override) for answers. Fallback lists are
+comma-separated, largest first. A route with no fallback models is measured
+but never downgraded.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+ROUTE_JD = "jd_extract"
+ROUTE_ANSWER = "answer"
+ROUTE_EVALUATE = "evaluate"
+
+# AIService task label -> route
+TASK_ROUTES = {
+    "jd_extract": ROUTE_JD,
+    "answer": ROUTE_ANSWER,
+    "answers_batch": ROUTE_ANSWER,
+    "evaluate": ROUTE_EVALUATE,
+    "evaluate_retry": ROUTE_EVALUATE,
+    "evaluate_batch": ROUTE_EVALUATE,
+}
+
+# env var naming each route's primary model (None: always the caller's default)
+PRIMARY_ENV = {
+    ROUTE_JD: "LLM_MODEL_JD_EXTRACT",
+    ROUTE_ANSWER: None,
+    ROUTE_EVALUATE: "LLM_MODEL_EVALUATE",
+}
+
+DEFAULT_BUDGETS_MS = {
+    ROUTE_JD: 10_000,
+    ROUTE_ANSWER: 30_000,
+    ROUTE_EVALUATE: 20_000,
+}
+
+
+def percentile(values, q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in [0, 100]) of `values`, None when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, min(len(ordered), int(-(-q * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+class _Route:
+    def __init__(self, name: str, primary: Optional[str], fallbacks: list[str], budget_ms: float):
+        self.name = name
+        self.primary = primary
+        self.fallbacks = fallbacks
+        self.budget_ms = budget_ms
+        self.level = 0  # index into the chain currently serving the route
+        self.changed_at = 0.0
+        self.downgrades = 0
+        self.recoveries = 0
+
+    def chain(self, default: str) -> list[str]:
+        chain = [self.primary or default]
+        for m in self.fallbacks:
+            if m not in chain:
+                chain.append(m)
+        return chain
+
+
+class ModelRouter:
+    """Thread-safe task -> model table with p95-based downgrades.
+
+    - `window`: latencies kept per (route, model)
+    - `min_samples`: samples needed before a p95 can trigger a downgrade
+    - `recovery_seconds`: time spent downgraded before retrying the primary
+    """
+
+    def __init__(
+        self,
+        primaries: Optional[dict] = None,
+        fallbacks: Optional[dict] = None,
+        budgets_ms: Optional[dict] = None,
+        window: int = 50,
+        min_samples: int = 10,
+        recovery_seconds: float = 300.0,
+    ):
+        primaries = primaries or {}
+        fallbacks = fallbacks or {}
+        budgets = {**DEFAULT_BUDGETS_MS, **(budgets_ms or {})}
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self.recovery_seconds = float(recovery_seconds)
+        self._lock = threading.Lock()
+        self._routes = {
+            name: _Route(name, primaries.get(name) or None, list(fallbacks.get(name) or []), float(budgets[name]))
+            for name in DEFAULT_BUDGETS_MS
+        }
+        # (route, model) -> recent latencies in ms
+        self._latencies: dict[tuple[str, str], deque] = {}
+        self._calls: dict[tuple[str, str], int] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        primaries, fallbacks, budgets = {}, {}, {}
+        for name in DEFAULT_BUDGETS_MS:
+            suffix = name.upper()
+            primaries[name] = os.environ.get(PRIMARY_ENV[name]) if PRIMARY_ENV[name] else None
+            fallbacks[name] = [m.strip() for m in os.environ.get(f"LLM_FALLBACK_MODELS_{suffix}", "").split(",") if m.strip()]
+            budgets[name] = float(os.environ.get(f"LLM_BUDGET_MS_{suffix}", str(DEFAULT_BUDGETS_MS[name])))
+        return cls(
+            primaries=primaries,
+            fallbacks=fallbacks,
+            budgets_ms=budgets,
+            window=int(os.environ.get("LLM_ROUTE_WINDOW", "50")),
+            min_samples=int(os.environ.get("LLM_ROUTE_MIN_SAMPLES", "10")),
+            recovery_seconds=float(os.environ.get("LLM_ROUTE_RECOVERY_SECONDS", "300")),
+        )
+
+    @staticmethod
+    def route_of(task: str) -> Optional[str]:
+        return TASK_ROUTES.get(task)
+
+    def primary(self, task: str, default: str) -> str:
+        """The configured model for `task`, ignoring downgrades (e.g. for cache keys)."""
+        route = self._routes.get(self.route_of(task))
+        return (route.primary or default) if route else default
+
+    def model_for(self, task: str, default: str) -> str:
+        """Model that should serve `task` right now."""
+        route = self._routes.get(self.route_of(task))
+        if route is None:
+            return default
+        chain = route.chain(default)
+        with self._lock:
+            if route.level and time.monotonic() - route.changed_at >= self.recovery_seconds:
+                # give the primary a fresh window instead of judging it on old samples
+                self._latencies.pop((route.name, chain[0]), None)
+                route.level = 0
+                route.changed_at = time.monotonic()
+                route.recoveries += 1
+                print(f"[ModelRouter] route={route.name} back to primary model {chain[0]}")
+            return chain[min(route.level, len(chain) - 1)]
+
+    def record(self, task: str, model: str, seconds: float, ok: bool = True, default: Optional[str] = None) -> None:
+        """Record one call's latency (failures included: a timeout is slow too)."""
+        route = self._routes.get(self.route_of(task))
+        if route is None or not model:
+            return
+        key = (route.name, model)
+        with self._lock:
+            samples = self._latencies.setdefault(key, deque(maxlen=self.window))
+            samples.append(seconds * 1000.0)
+            self._calls[key] = self._calls.get(key, 0) + 1
+            if not ok:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+            chain = route.chain(default or model)
+            level = min(route.level, len(chain) - 1)
+            if chain[level] != model or level + 1 >= len(chain) or len(samples) < self.min_samples:
+                return
+            p95 = percentile(samples, 95)
+            if p95 is None or p95 <= route.budget_ms:
+                return
+            route.level = level + 1
+            route.changed_at = time.monotonic()
+            route.downgrades += 1
+            # the smaller model starts from a clean window
+            self._latencies.pop((route.name, chain[route.level]), None)
+        print(
+            f"[ModelRouter] route={route.name} p95={p95:.0f}ms over budget {route.budget_ms:.0f}ms "
+            f"on {model}; downgrading to {chain[route.level]}"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {}
+            for name, route in self._routes.items():
+                models = {}
+                for (r, model), calls in self._calls.items():
+                    if r != name:
+                        continue
+                    samples = self._latencies.get((r, model)) or ()
+                    models[model] = {
+                        "calls": calls,
+                        "errors": self._errors.get((r, model), 0),
+                        "samples": len(samples),
+                        "p50_ms": round(percentile(samples, 50), 1) if samples else None,
+                        "p95_ms": round(percentile(samples, 95), 1) if samples else None,
+                    }
+                routes[name] = {
+                    "primary": route.primary,
+                    "fallbacks": list(route.fallbacks),
+                    "budget_ms": route.budget_ms,
+                    "level": route.level,
+                    "downgrades": route.downgrades,
+                    "recoveries": route.recoveries,
+                    "models": models,
+                }
+            return {"routes": routes, "window": self.window, "min_samples": self.min_samples, "recovery_seconds": self.recovery_seconds}
@@ -0,0 +1,231 @@
+"""
+Process-wide admission control for LLM calls.
+
+Every AIService request to the LLM host takes a slot from one `LLMScheduler`, so
+the number of concurrent calls is capped no matter how many request threads,
+evaluation pools or coroutines are asking. When all slots are busy, waiters are
+served by priority class first (interactive JD extraction, then interactive
+evaluation, then background work such as `precompute_answers.py`), and
+round-robin across users within a class so one large submission cannot starve
+everybody else.
+
+The caller's priority and user are carried in context variables: routes set
+them once with `llm_context(...)` and every LLM call made underneath (including
+from thread pools that copy the context) is scheduled accordingly.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Hashable, Optional
+
+PRIORITY_JD = 0
+PRIORITY_EVAL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {
+    PRIORITY_JD: "interactive_jd",
+    PRIORITY_EVAL: "interactive_eval",
+    PRIORITY_BACKGROUND: "background",
+}
+
+_priority_var: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_EVAL)
+_user_var: contextvars.ContextVar[Hashable] = contextvars.ContextVar("llm_user", default="anonymous")
+
+
+@contextmanager
+def llm_context(priority: Optional[int] = None, user: Optional[Hashable] = None):
+    """Set the LLM priority class and/or fairness key for calls made inside the block."""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority_var, _priority_var.set(priority)))
+    if user is not None:
+        tokens.append((_user_var, _user_var.set(user)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def set_llm_context(priority: Optional[int] = None, user: Optional[Hashable] = None) -> None:
+    """Set the LLM context for the rest of the current context (e.g. a sync route
+    handler, whose context copy is discarded when the request ends)."""
+    if priority is not None:
+        _priority_var.set(priority)
+    if user is not None:
+        _user_var.set(user)
+
+
+def run_in_llm_context(priority: Optional[int], user: Optional[Hashable], fn, *args, **kwargs):
+    """Call `fn` under `llm_context` (for thread pool submissions)."""
+    with llm_context(priority, user):
+        return fn(*args, **kwargs)
+
+
+def llm_user_key(user_id: Optional[int] = None, session: Optional[str] = None) -> str:
+    """Fairness key: the user when logged in, else the browser session."""
+    if user_id is not None:
+        return f"user:{user_id}"
+    if session:
+        return f"session:{session}"
+    return "anonymous"
+
+
+def current_llm_context() -> tuple[int, Hashable]:
+    return _priority_var.get(), _user_var.get()
+
+
+class _Waiter:
+    __slots__ = ("priority", "user", "enqueued", "granted", "event", "loop", "future")
+
+    def __init__(self, priority: int, user: Hashable, loop=None):
+        self.priority = priority
+        self.user = user
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class LLMScheduler:
+    """Concurrency cap + priority classes + per-user round-robin, for threads
+    (`slot`) and coroutines (`aslot`)."""
+
+    def __init__(self, max_concurrency: int = 4, wait_window: int = 500):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # priority -> user -> waiters; dict order is the round-robin order
+        self._queues: dict[int, "OrderedDict[Hashable, deque]"] = {p: OrderedDict() for p in PRIORITY_NAMES}
+        self._waits: dict[int, deque] = {p: deque(maxlen=wait_window) for p in PRIORITY_NAMES}
+        self._granted = {p: 0 for p in PRIORITY_NAMES}
+        self._max_queue_depth = 0
+
+    # ----------------------------- internals ----------------------------- #
+    def _queued_locked(self) -> int:
+        return sum(len(dq) for users in self._queues.values() for dq in users.values())
+
+    def _grant_locked(self, w: _Waiter) -> None:
+        w.granted = True
+        self._in_flight += 1
+        self._granted[w.priority] += 1
+        self._waits[w.priority].append(time.monotonic() - w.enqueued)
+
+    def _dispatch_locked(self) -> None:
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            while users and self._in_flight < self.max_concurrency:
+                user, waiters = next(iter(users.items()))
+                w = waiters.popleft()
+                if waiters:
+                    users.move_to_end(user)
+                else:
+                    del users[user]
+                self._grant_locked(w)
+                w.wake()
+            if self._in_flight >= self.max_concurrency:
+                return
+
+    def _enqueue_locked(self, w: _Waiter) -> bool:
+        """Grant immediately when a slot is free and nobody is waiting; else queue."""
+        w.priority = w.priority if w.priority in self._queues else PRIORITY_EVAL
+        if self._in_flight < self.max_concurrency and not self._queued_locked():
+            self._grant_locked(w)
+            return True
+        self._queues[w.priority].setdefault(w.user, deque()).append(w)
+        self._max_queue_depth = max(self._max_queue_depth, self._queued_locked())
+        return False
+
+    def _abandon(self, w: _Waiter) -> None:
+        """Waiter gave up (timeout / cancellation): free its slot or drop it from the queue."""
+        with self._lock:
+            if w.granted:
+                self._in_flight -= 1
+                self._dispatch_locked()
+                return
+            waiters = self._queues[w.priority].get(w.user)
+            if waiters is not None:
+                try:
+                    waiters.remove(w)
+                except ValueError:
+                    pass
+                if not waiters:
+                    del self._queues[w.priority][w.user]
+
+    # ------------------------------ public API ----------------------------- #
+    def acquire(self, priority: Optional[int] = None, user: Optional[Hashable] = None, timeout: Optional[float] = None) -> None:
+        ctx_priority, ctx_user = current_llm_context()
+        w = _Waiter(ctx_priority if priority is None else priority, ctx_user if user is None else user)
+        with self._lock:
+            if self._enqueue_locked(w):
+                return
+        if not w.event.wait(timeout):
+            self._abandon(w)
+            raise TimeoutError(f"LLM scheduler: no slot within {timeout}s")
+
+    async def aacquire(self, priority: Optional[int] = None, user: Optional[Hashable] = None, timeout: Optional[float] = None) -> None:
+        ctx_priority, ctx_user = current_llm_context()
+        w = _Waiter(ctx_priority if priority is None else priority, ctx_user if user is None else user, loop=asyncio.get_running_loop())
+        with self._lock:
+            if self._enqueue_locked(w):
+                return
+        try:
+            await asyncio.wait_for(asyncio.shield(w.future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._abandon(w)
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._dispatch_locked()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None, user: Optional[Hashable] = None, timeout: Optional[float] = None):
+        self.acquire(priority, user, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, priority: Optional[int] = None, user: Optional[Hashable] = None, timeout: Optional[float] = None):
+        await self.aacquire(priority, user, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            classes = {}
+            for p, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[p])
+                classes[name] = {
+                    "queued": sum(len(dq) for dq in self._queues[p].values()),
+                    "users_waiting": len(self._queues[p]),
+                    "granted": self._granted[p],
+                    "wait_ms_avg": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+                    "wait_ms_p95": round(1000 * waits[min(len(waits) - 1, int(0.95 * len(waits)))], 1) if waits else 0.0,
+                    "wait_ms_max": round(1000 * waits[-1], 1) if waits else 0.0,
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queue_depth": self._queued_locked(),
+                "max_queue_depth": self._max_queue_depth,
+                "classes": classes,
+            }
@@ -0,0 +1,180 @@
+"""
+Streamed consumption of Ollama `/api/generate` with early termination.
+
+With `"stream": false` the caller waits for the model's whole output, including
+any chatter after the JSON it asked for, and the decode slot stays busy until
+the model stops on its own. With streaming, each NDJSON line carries a few
+tokens; `StreamAccumulator` collects them and feeds a `JSONCompletionDetector`,
+and the caller closes the stream as soon as the first complete top-level object
+or array has arrived. Closing the connection makes Ollama stop generating.
+
+Endpoints that ignore `stream` and answer with one JSON body (the wrapper's own
+routes, the local stub, error responses) are handled too: the body is returned
+as `StreamResult.body` for the caller's usual parsing.
+
+Standard library only: the Ollama wrapper in llm_stub/ imports this module too
+(its image copies it from app/, a checkout finds it via sys.path).
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+class JSONCompletionDetector:
+    """Incremental brace matcher over streamed text.
+
+    The value starts at the first `{` or `[` that opens a line (after optional
+    indentation) or follows a code fence, whichever kind comes first; brackets
+    inside prose ("Here are the 2 answers [see below]:") are not openers. From
+    there nesting is tracked outside of string literals, and `complete` turns
+    true only when that outermost value closes; `end` is its end offset in the
+    text fed so far. `expect` is informational: an array task that answers with
+    a lone object still completes on the object (callers wrap it), and output
+    where no opener qualifies simply streams to the end."""
+
+    def __init__(self, expect: Optional[str] = None):
+        self.expect = expect
+        self.complete = False
+        self.end: Optional[int] = None
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._offset = 0
+        self._line = ""  # text of the current line before the opener
+
+    def _opener_allowed(self) -> bool:
+        prefix = self._line.strip()
+        return not prefix or (prefix.startswith("```") and "`" not in prefix[3:] and " " not in prefix)
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete or not chunk:
+            return self.complete
+        for i, ch in enumerate(chunk):
+            if not self._started:
+                if ch in "{[" and self._opener_allowed():
+                    self._started = True
+                    self._depth = 1
+                elif ch == "\n":
+                    self._line = ""
+                else:
+                    self._line += ch
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    self.end = self._offset + i + 1
+                    break
+        self._offset += len(chunk)
+        return self.complete
+
+
+@dataclass
+class StreamResult:
+    """Outcome of one streamed call.
+
+    text          concatenated `response` tokens (streamed replies only)
+    body          final JSON object: Ollama's `done` line, or the whole body of a
+                  non-streamed reply (use the caller's usual text extraction)
+    streamed      the endpoint answered with an NDJSON token stream
+    stopped_early the stream was closed once the JSON value was complete
+    chunks        stream lines consumed
+    """
+    text: str = ""
+    body: dict = field(default_factory=dict)
+    streamed: bool = False
+    stopped_early: bool = False
+    chunks: int = 0
+
+
+class StreamAccumulator:
+    """Feed response lines with `add_line` until it returns True, then read `result()`."""
+
+    def __init__(self, expect: Optional[str] = None, deadline: Optional[float] = None):
+        self.detector = JSONCompletionDetector(expect) if expect else None
+        self.deadline = time.monotonic() + deadline if deadline else None
+        self._parts: list[str] = []
+        self._raw: list[str] = []
+        self._result = StreamResult()
+
+    def add_line(self, line) -> bool:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeoutError("LLM stream exceeded its deadline")
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = (line or "").strip()
+        if not line:
+            return False
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            obj = None
+        if not isinstance(obj, dict):
+            # part of a multi-line (pretty-printed) body: parsed in result()
+            self._raw.append(line)
+            return False
+
+        res = self._result
+        if "done" not in obj:
+            # a plain JSON reply from an endpoint that does not stream
+            res.body = obj
+            return True
+        # (a non-streamed Ollama reply is a single line with done=true)
+        res.streamed = res.streamed or not obj.get("done")
+        res.chunks += 1
+        piece = obj.get("response") or ""
+        if piece:
+            self._parts.append(piece)
+        if obj.get("done"):
+            res.body = obj
+            return True
+        if self.detector is not None and self.detector.feed(piece):
+            res.stopped_early = True
+            return True
+        return False
+
+    def result(self) -> StreamResult:
+        res = self._result
+        res.text = "".join(self._parts)
+        if self._raw and not res.body and not res.streamed:
+            try:
+                body = json.loads("\n".join(self._raw))
+                res.body = body if isinstance(body, dict) else {}
+            except ValueError:
+                res.body = {"response": "\n".join(self._raw)}
+        return res
+
+
+class StreamStats:
+    """Thread-safe counters for streamed calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "streamed": 0, "stopped_early": 0, "chunks": 0}
+
+    def record(self, result: StreamResult) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["streamed"] += int(result.streamed)
+            self._stats["stopped_early"] += int(result.stopped_early)
+            self._stats["chunks"] += result.chunks
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["early_stop_rate"] = round(stats["stopped_early"] / stats["streamed"], 3) if stats["streamed"] else None
+        return stats
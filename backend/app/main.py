@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from app.routers import auth, oauth, stubs, interview, leaderboard
 from app.config import settings
+from app.ai_services import ai_service, EVAL_PROMPT_VERSION
+from app.embeddings import embedding_model, embedding_store
 
 app = FastAPI()
 
@@ -28,3 +30,38 @@ app.include_router(interview.router, prefix="/api")
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Interview App API"}
+
+@app.on_event("startup")
+def warm_embedding_model():
+    # loads on a daemon thread; requests use keyword heuristics until it is ready
+    embedding_model.start_warmup()
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await ai_service.aclose()
+
+@app.get("/health/llm")
+def llm_health():
+    """Runtime state of the LLM client (circuit breaker, connection pool usage, caches)."""
+    breaker = ai_service.breaker.stats()
+    return {
+        "status": "ok" if breaker["state"] == "closed" else "degraded",
+        "breaker": breaker,
+        "pool": ai_service.pool_stats(),
+        "answer_cache": ai_service.answer_cache.stats(),
+        "eval_cache": {**ai_service.eval_cache.stats(), "enabled": ai_service.eval_cache_enabled, "prompt_version": EVAL_PROMPT_VERSION},
+        "jd_cache": ai_service.jd_cache.stats(),
+        "coalescing": ai_service._inflight.stats(),
+        "scheduler": ai_service.scheduler.stats(),
+        "routing": ai_service.router.stats(),
+        "streaming": {**ai_service.stream_stats.stats(), "enabled": ai_service.stream},
+        "hedging": ai_service.hedge.stats(),
+        "vocabulary": ai_service.vocabulary.stats(),
+        "prefix_cache": {
+            **ai_service.prefix_cache.stats(),
+            "keep_alive": ai_service.keep_alive,
+            "context_reuse": ai_service.reuse_context,
+            "contexts": ai_service.prompt_contexts.stats(),
+        },
+        "embeddings": {**embedding_model.stats(), "store": embedding_store.stats()},
+    }
@@ -0,0 +1,80 @@
+"""
+Read/write helpers for the precomputed `model_answers` table.
+
+The question bank is static, so ideal answers are generated offline by
+`precompute_answers.py` and the evaluation routes read them here instead of
+generating one per question on the request path.
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from .cache import content_hash
+from .models import ModelAnswer, Question
+
+
+def question_text_hash(text: Optional[str]) -> str:
+    return content_hash((text or "").strip())
+
+
+def _question_text(q: Question) -> str:
+    return q.text or q.question or ""
+
+
+def load_precomputed_answers(db: Session, question_ids: Iterable, model: str) -> Dict[int, str]:
+    """Return {question_id: answer} for the ids that have a current precomputed
+    answer for `model`. Rows generated for an older text of the same id are skipped."""
+    ids = []
+    for qid in question_ids:
+        try:
+            ids.append(int(qid))
+        except (TypeError, ValueError):
+            continue
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(ModelAnswer, Question)
+        .join(Question, Question.id == ModelAnswer.question_id)
+        .filter(ModelAnswer.question_id.in_(ids), ModelAnswer.model == model)
+        .all()
+    )
+    out: Dict[int, str] = {}
+    for ma, q in rows:
+        if ma.answer and ma.question_hash == question_text_hash(_question_text(q)):
+            out[ma.question_id] = ma.answer
+    return out
+
+
+def store_precomputed_answer(db: Session, question: Question, model: str, answer: str) -> None:
+    """Insert or refresh the precomputed answer for (question.id, model). Caller commits."""
+    qhash = question_text_hash(_question_text(question))
+    row = (
+        db.query(ModelAnswer)
+        .filter(ModelAnswer.question_id == question.id, ModelAnswer.model == model)
+        .first()
+    )
+    if row is None:
+        db.add(ModelAnswer(question_id=question.id, model=model, question_hash=qhash, answer=answer))
+    else:
+        row.question_hash = qhash
+        row.answer = answer
+
+
+def precomputed_answers_for_items(db: Session, items: list, model: str) -> Dict[int, str]:
+    """Map item index -> precomputed answer for evaluation payload items whose
+    question dict carries a numeric `id`. Best-effort: DB errors yield {}."""
+    id_by_idx = {}
+    for idx, it in enumerate(items):
+        qobj = (it.get("question") if isinstance(it, dict) else getattr(it, "question", None)) or {}
+        qid = qobj.get("id") if isinstance(qobj, dict) else None
+        if qid is not None and str(qid).isdigit():
+            id_by_idx[idx] = int(qid)
+    if not id_by_idx:
+        return {}
+    try:
+        answers = load_precomputed_answers(db, id_by_idx.values(), model)
+    except Exception as e:
+        print(f"[ModelAnswers] precomputed lookup failed: {e}")
+        return {}
+    return {idx: answers[qid] for idx, qid in id_by_idx.items() if qid in answers}
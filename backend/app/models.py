@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy import JSON
 
@@ -95,3 +95,67 @@ class Evaluation(Base):
     # Store per-question evaluation details as JSON (works across DB backends)
     details = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# ------------------------- Durable cache storage --------------------------- #
+class CacheEntry(Base):
+    """Shared key/value rows backing `app.cache.PersistentCache`.
+
+    One table serves several caches, separated by `namespace` (e.g.
+    "model_answer"), so warm entries survive restarts and are shared by all
+    uvicorn workers.
+    """
+    __tablename__ = "cache_entries"
+    __table_args__ = (UniqueConstraint("namespace", "key", name="uq_cache_entries_namespace_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    namespace = Column(String(64), index=True, nullable=False)
+    key = Column(String(128), nullable=False)
+    value = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=True)
+
+
+# ----------------------- Precomputed ideal answers ------------------------- #
+class ModelAnswer(Base):
+    """Offline-generated ideal answer per question and answer model.
+
+    Filled by `precompute_answers.py`; read by the evaluation routes before
+    falling back to live generation. `question_hash` is the hash of the question
+    text the answer was generated for, so rows left behind after the question
+    bank is reloaded (ids are reassigned) are detected and ignored.
+    """
+    __tablename__ = "model_answers"
+    __table_args__ = (UniqueConstraint("question_id", "model", name="uq_model_answers_question_model"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    question_id = Column(Integer, index=True, nullable=False)
+    model = Column(String(128), nullable=False)
+    question_hash = Column(String(64), nullable=False)
+    answer = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# ------------------------- Evaluation job queue ---------------------------- #
+class EvaluationJob(Base):
+    """Queued `/evaluate-answers` submission, processed by `evaluation_worker.py`.
+
+    status: queued -> running -> done | failed. A running job whose worker died
+    is re-queued once `started_at` is older than the stale timeout.
+    """
+    __tablename__ = "evaluation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(16), index=True, nullable=False, default="queued")
+    payload = Column(JSON, nullable=False)
+    session_id = Column(String(64), nullable=True)
+    # sha256 of the random read key handed to an anonymous submitter without a session
+    read_key_hash = Column(String(64), nullable=True)
+    user_id = Column(Integer, index=True, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(128), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
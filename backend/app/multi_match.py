@@ -0,0 +1,248 @@
+"""
+Multi-pattern matching for company names, brand tokens and keyword lists.
+
+Company detection, the brand sanitizer and the keyword heuristics used to scan
+the same text in ad-hoc ways (`kw in text` loops repeated per skill, one large
+`\\b(a|b|...)\\b` alternation that retries every alternative at every
+position). `MultiPatternMatcher` is built once per vocabulary and answers all
+of those questions from one object:
+
+- `find_all`: every (start, end, pattern) occurrence, overlapping included
+- `hits`: the set of patterns that occur (same answers as `p in text` for
+  each pattern when `whole_words` is off)
+- `leftmost_longest` / `sub`: non-overlapping matches, as a longest-first
+  regex alternation would find them
+- `KeywordGroups`: named keyword lists ("metrics", "examples", ...) checked
+  together, returning the names of the groups that hit
+
+Large vocabularies are compiled into a trie and matched in one pass: the trie
+becomes a single regex whose sibling branches start with distinct characters,
+so the C regex engine walks the text once without retrying patterns, in the
+manner of an Aho-Corasick automaton. Below `TRIE_MIN_PATTERNS` distinct
+patterns, CPython's C substring search per pattern is faster than any single
+pass, so the matcher uses that instead; the answers are the same either way.
+backend/bench_multi_match.py has the numbers.
+
+Standard library only: the stub heuristics in llm_stub/ import this module too
+(found via sys.path, there is no copy).
+"""
+import re
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional
+
+# Below this many distinct patterns, per-pattern `str.find` beats the trie scan
+# (crossover measured at ~150-200 patterns on 10k-character texts).
+TRIE_MIN_PATTERNS = 150
+
+
+class Hit(NamedTuple):
+    start: int
+    end: int
+    pattern: str
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex for a trie node. Sibling branches start with distinct characters,
+    so at most one can match; a pattern end inside the trie becomes a greedy
+    optional group, so the longest pattern at a position is the one reported."""
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + body + ")?" if "" in node else body
+
+
+class MultiPatternMatcher:
+    """Matcher over a fixed set of `patterns`.
+
+    - `case_insensitive`: patterns and text are lower-cased before matching;
+      hits report the pattern as given
+    - `whole_words`: like regex `\\b` at each end of the pattern that is a word
+      character; pattern ends that are punctuation ("%", "1)") match anywhere
+    - `word_chars`: extra characters treated as word characters by
+      `whole_words`, e.g. "-" so that "Google-like" does not match "Google"
+    - `use_trie`: force (True) or disable (False) the single-pass trie scan;
+      by default it is used from TRIE_MIN_PATTERNS distinct patterns up
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        case_insensitive: bool = True,
+        whole_words: bool = False,
+        use_trie: Optional[bool] = None,
+        word_chars: str = "",
+    ):
+        self.case_insensitive = case_insensitive
+        self.whole_words = whole_words
+        self.word_chars = frozenset(word_chars)
+        self.patterns: list[str] = []
+        seen = set()
+        for p in patterns:
+            p = str(p)
+            if p and p not in seen:
+                seen.add(p)
+                self.patterns.append(p)
+
+        # folded pattern -> ids of the patterns that fold to it
+        self._ids: dict[str, list[int]] = {}
+        for pid, p in enumerate(self.patterns):
+            self._ids.setdefault(self._fold(p), []).append(pid)
+        self._lengths = [len(self._fold(p)) for p in self.patterns]
+        self.use_trie = len(self._ids) >= TRIE_MIN_PATTERNS if use_trie is None else bool(use_trie)
+
+        self._regex = None
+        self._prefixes: dict[str, list[int]] = {}
+        if self.use_trie and self._ids:
+            # trie of the folded patterns; "" marks the end of a pattern
+            trie: dict = {}
+            for folded in self._ids:
+                node = trie
+                for ch in folded:
+                    node = node.setdefault(ch, {})
+                node[""] = True
+            self._regex = re.compile("(?=(" + _trie_regex(trie) + "))", re.DOTALL)
+            # every pattern that is a prefix of a given pattern (itself included):
+            # the occurrences starting at a position are the prefixes of the longest one
+            for folded in self._ids:
+                self._prefixes[folded] = [
+                    pid for i in range(1, len(folded) + 1) for pid in self._ids.get(folded[:i], ())
+                ]
+
+    def _fold(self, text: str) -> str:
+        if not self.case_insensitive:
+            return text
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        # a few characters lower-case to two code points; keep offsets aligned
+        return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _is_word(self, ch: str) -> bool:
+        return _is_word(ch) or ch in self.word_chars
+
+    def _bounded(self, text: str, start: int, end: int, pid: int) -> bool:
+        p = self.patterns[pid]
+        if self._is_word(p[0]) and start > 0 and self._is_word(text[start - 1]):
+            return False
+        if self._is_word(p[-1]) and end < len(text) and self._is_word(text[end]):
+            return False
+        return True
+
+    def _scan(self, folded: str):
+        """Yield (start, pattern id) for every occurrence in the folded text."""
+        if self._regex is not None:
+            # one pass of the trie regex, then the shorter patterns nested as prefixes
+            prefixes = self._prefixes
+            for m in self._regex.finditer(folded):
+                for pid in prefixes[m.group(1)]:
+                    yield m.start(), pid
+            return
+        for pattern, ids in self._ids.items():
+            i = folded.find(pattern)
+            while i != -1:
+                for pid in ids:
+                    yield i, pid
+                i = folded.find(pattern, i + 1)
+
+    def find_all(self, text: str) -> list[Hit]:
+        """All occurrences (overlapping included), ordered by start offset."""
+        if not text or not self._ids:
+            return []
+        hits = []
+        for start, pid in self._scan(self._fold(text)):
+            end = start + self._lengths[pid]
+            if self.whole_words and not self._bounded(text, start, end, pid):
+                continue
+            hits.append(Hit(start, end, self.patterns[pid]))
+        hits.sort()
+        return hits
+
+    def hits(self, text: str) -> set:
+        """Patterns occurring at least once."""
+        if not text or not self._ids:
+            return set()
+        if self.whole_words:
+            return {h.pattern for h in self.find_all(text)}
+        folded = self._fold(text)
+        found = set()
+        if self._regex is not None:
+            # distinct longest matches straight from the regex engine, then their prefixes
+            for longest in set(self._regex.findall(folded)):
+                found.update(self.patterns[pid] for pid in self._prefixes[longest])
+        else:
+            for pattern, ids in self._ids.items():
+                if pattern in folded:
+                    found.update(self.patterns[pid] for pid in ids)
+        return found
+
+    def counts(self, text: str) -> Counter:
+        return Counter(h.pattern for h in self.find_all(text))
+
+    def contains_any(self, text: str) -> bool:
+        if not text or not self._ids:
+            return False
+        if self.whole_words:
+            return bool(self.find_all(text))
+        folded = self._fold(text)
+        if self._regex is not None:
+            return self._regex.search(folded) is not None
+        return any(pattern in folded for pattern in self._ids)
+
+    def leftmost_longest(self, text: str) -> list[Hit]:
+        """Non-overlapping hits: the leftmost start wins, then the longest pattern."""
+        chosen = []
+        pos = 0
+        for h in sorted(self.find_all(text), key=lambda h: (h.start, h.start - h.end)):
+            if h.start >= pos:
+                chosen.append(h)
+                pos = h.end
+        return chosen
+
+    def sub(self, text: str, repl: str) -> str:
+        """Replace each leftmost-longest hit with `repl`."""
+        if not text:
+            return text or ""
+        parts = []
+        pos = 0
+        for h in self.leftmost_longest(text):
+            parts.append(text[pos:h.start])
+            parts.append(repl)
+            pos = h.end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+class KeywordGroups:
+    """Several named keyword lists behind one matcher.
+
+    `groups_in(text)` returns the names of the groups with at least one keyword
+    in `text` (substring semantics, as `any(kw in text for kw in group)`)."""
+
+    def __init__(self, groups: dict, case_insensitive: bool = True, whole_words: bool = False):
+        self.groups = {name: list(kws) for name, kws in groups.items()}
+        self._owners: dict[str, set] = {}
+        for name, kws in self.groups.items():
+            for kw in kws:
+                self._owners.setdefault(kw, set()).add(name)
+        self.matcher = MultiPatternMatcher(self._owners, case_insensitive=case_insensitive, whole_words=whole_words)
+
+    def groups_in(self, text: str) -> set:
+        return self.groups_of(self.matcher.hits(text))
+
+    def groups_of(self, keywords: Iterable[str]) -> set:
+        """Group names owning any of `keywords` (e.g. the result of `keywords_in`)."""
+        found = set()
+        for kw in keywords:
+            found |= self._owners.get(kw, set())
+        return found
+
+    def keywords_in(self, text: str) -> set:
+        return self.matcher.hits(text)
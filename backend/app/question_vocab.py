@@ -0,0 +1,147 @@
+"""
+Company / experience-level / category vocabularies for JD extraction.
+
+These used to be read from the 1.4 MB questions CSV with pandas at import time
+of app.ai_services, keeping the whole DataFrame alive in every worker and
+building the JD-extraction system prompt before the app had even started. The
+same values live in the `questions` table (loaded from that CSV), so
+`QuestionVocabulary` reads them from there on first use with three DISTINCT
+queries on indexed columns, keeps the small result in memory, and refreshes it
+after `refresh_seconds`. When the table is empty or unreachable the defaults
+below are used, and the database is tried again after EMPTY_RETRY_SECONDS.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .jd_parser import split_companies
+
+DEFAULT_COMPANIES = ["Unknown Company"]
+DEFAULT_ROLES = ["PM", "Senior PM", "APM", "Group PM", "Principal PM", "Director"]
+DEFAULT_LEVELS = ["Strategic"]
+
+# companies listed in the JD-extraction prompt
+PROMPT_COMPANY_LIMIT = 80
+# while serving the defaults, look at the table again after this many seconds
+EMPTY_RETRY_SECONDS = 60.0
+
+_SYSTEM_PROMPT_TEMPLATE = """
+You are an expert HR and Product Management recruiter. Read the job description carefully and extract these THREE pieces of information:
+
+1️⃣ company_name — The company hiring for this role. Match it to one of these companies if mentioned:
+{companies}
+If the company is NOT in the list above or not clearly mentioned, respond with "Unknown Company".
+
+2️⃣ years_of_experience — Infer the required years of experience from the JD. Return EXACTLY ONE of:
+   "0-2" (entry level, APM, junior PM)
+   "3-5" (mid-level PM)
+   "6-10" (senior PM)
+   "10+" (principal/director level)
+Look for keywords like "years", "experience", "senior", "junior", "lead", "direct". If not found, default to "6-10".
+
+3️⃣ level — The job category or seniority level. Match to one of these:
+{levels}
+Common matches: "Strategic" (if product strategy mentioned), or relevant category.
+
+IMPORTANT RULES:
+- Return ONLY valid JSON, no extra text before or after
+- All values must be EXACTLY as shown in the examples
+- If unsure, use defaults: company="Unknown Company", years="6-10", level="Strategic"
+- Do NOT make up companies or experience levels
+
+Example valid response:
+{{"company_name": "Google", "years_of_experience": "6-10", "level": "Strategic"}}
+"""
+
+
+def build_system_prompt(companies: list, levels: list) -> str:
+    """JD-extraction system prompt for the given vocabularies."""
+    return _SYSTEM_PROMPT_TEMPLATE.format(companies=list(companies)[:PROMPT_COMPANY_LIMIT], levels=list(levels))
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    companies: list      # individual company names (CSV rows may list several)
+    roles: list          # experience levels, e.g. "Senior PM"
+    levels: list         # question categories, e.g. "Strategic"
+    system_prompt: str   # JD-extraction prompt built from the lists above
+    from_db: bool = False
+
+
+def _defaults() -> Vocabulary:
+    return Vocabulary(
+        companies=list(DEFAULT_COMPANIES),
+        roles=list(DEFAULT_ROLES),
+        levels=list(DEFAULT_LEVELS),
+        system_prompt=build_system_prompt(DEFAULT_COMPANIES, DEFAULT_LEVELS),
+    )
+
+
+class QuestionVocabulary:
+    """Lazily loaded, periodically refreshed vocabularies from the `questions` table."""
+
+    def __init__(self, refresh_seconds: float = 3600.0, session_factory: Optional[Callable] = None):
+        self.refresh_seconds = float(refresh_seconds)
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._vocab: Optional[Vocabulary] = None
+        self._loaded_at = 0.0
+        self._stats = {"loads": 0, "db_errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "QuestionVocabulary":
+        return cls(refresh_seconds=float(os.environ.get("QUESTION_VOCAB_REFRESH_SECONDS", "3600")))
+
+    def _load(self) -> Vocabulary:
+        from .models import Question
+        if self._session_factory is None:
+            from .database import SessionLocal
+            self._session_factory = SessionLocal
+        db = self._session_factory()
+        try:
+            def column(col) -> list:
+                return sorted(v for (v,) in db.query(col).filter(col.isnot(None)).distinct().all() if str(v).strip())
+            companies = split_companies(column(Question.company))
+            roles = column(Question.experience_level)
+            levels = column(Question.category)
+        finally:
+            db.close()
+        if not (companies and roles and levels):
+            # no questions loaded yet: serve the defaults, retry after EMPTY_RETRY_SECONDS
+            raise LookupError("questions table is empty")
+        companies = [c for c in companies if c != "Generic"] or list(DEFAULT_COMPANIES)
+        return Vocabulary(companies, roles, levels, build_system_prompt(companies, levels), from_db=True)
+
+    def get(self) -> Vocabulary:
+        """Current vocabularies (loads them on first use; may touch the DB)."""
+        with self._lock:
+            vocab = self._vocab
+            if vocab is not None:
+                max_age = self.refresh_seconds if vocab.from_db else min(self.refresh_seconds, EMPTY_RETRY_SECONDS)
+                if time.monotonic() - self._loaded_at < max_age:
+                    return vocab
+            try:
+                vocab = self._load()
+                self._stats["loads"] += 1
+                print(f"[QuestionVocabulary] loaded {len(vocab.companies)} companies, {len(vocab.roles)} roles, {len(vocab.levels)} levels")
+            except Exception as e:
+                self._stats["db_errors"] += 1
+                if vocab is None or not vocab.from_db:
+                    print(f"[QuestionVocabulary] using defaults: {e}")
+                    vocab = _defaults()
+                # else keep serving the last good snapshot
+            self._vocab = vocab
+            self._loaded_at = time.monotonic()
+            return vocab
+
+    def stats(self) -> dict:
+        with self._lock:
+            vocab = self._vocab
+            stats = dict(self._stats)
+        stats["loaded"] = vocab is not None
+        stats["from_db"] = bool(vocab and vocab.from_db)
+        if vocab is not None:
+            stats.update(companies=len(vocab.companies), roles=len(vocab.roles), levels=len(vocab.levels))
+        return stats
@@ -2,19 +2,28 @@ from typing import Dict, List, Optional, Tuple, Any
 import math
 import random
 import re
+import asyncio
 import concurrent.futures
+import json
+import time
 from datetime import timedelta, datetime
 from sqlalchemy import inspect
 from ..logger import logger
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, not_
 
-from ..database import get_db
-from ..models import Question, ServedQuestion, Evaluation, User
+from ..database import get_db, SessionLocal
+from ..models import Question, ServedQuestion, Evaluation, EvaluationJob, User
 from .. import schemas
 from ..ai_services import ai_service
+from ..model_answers import precomputed_answers_for_items
+from ..evaluation_jobs import can_read_job, enqueue_for_caller, job_to_dict
+from ..multi_match import MultiPatternMatcher
+from ..llm_scheduler import PRIORITY_EVAL, PRIORITY_JD, llm_context, llm_user_key, run_in_llm_context, set_llm_context
 from ..routers.auth import _decode_bearer, get_current_user
 from fastapi.encoders import jsonable_encoder
 
@@ -166,15 +175,13 @@ _BRAND_TOKENS = [
     "App Store","iOS","Azure","Office","Teams","AWS","Prime","Kindle",
     "Freshdesk","Freshservice","Freshsales","Zoho CRM","Zoho Books","Zoho Mail"
 ]
-_SANITIZE_RE = re.compile(
-    r"\b(" + "|".join(re.escape(t) for t in sorted(_BRAND_TOKENS, key=len, reverse=True)) + r")\b",
-    flags=re.IGNORECASE
-)
+# one matcher for all brand tokens: whole words, case-insensitive, longest match wins
+_BRAND_MATCHER = MultiPatternMatcher(_BRAND_TOKENS, whole_words=True)
 
 def _normalize_prompt_brand(text: str, sanitize_to: Optional[str]) -> str:
     if not text or not sanitize_to:
         return text or ""
-    return _SANITIZE_RE.sub(sanitize_to, text)
+    return _BRAND_MATCHER.sub(text, sanitize_to)
 
 _CATEGORY_TO_SKILLS = {
     "strategic": ["Strategy","Prioritization","Business Acumen"],
@@ -438,6 +445,7 @@ def get_interview_questions(
 async def start_interview_with_jd(
     jd_upload: schemas.JDUpload = Body(...),
     db: Session = Depends(get_db),
+    x_session_key: Optional[str] = Header(None, alias="X-Session-Key"),
 ):
     """
     Process JD upload: extract company and experience level, then return questions.
@@ -452,7 +460,9 @@ async def start_interview_with_jd(
     """
     try:
         print("[InterviewRouter /start-with-jd] Processing JD upload...")
-        ai_details = await ai_service.extract_details_from_jd(jd_upload.jd_text)
+        # JD extraction gates the start of an interview: highest LLM priority
+        with llm_context(PRIORITY_JD, llm_user_key(session=x_session_key)):
+            ai_details = await ai_service.extract_details_from_jd(jd_upload.jd_text)
 
         extracted_company = ai_details.get("company_name", "Unknown Company")
         years_of_experience = ai_details.get("years_of_experience", "6-10")
@@ -461,13 +471,15 @@ async def start_interview_with_jd(
         print(f"[InterviewRouter] AI extracted: company='{extracted_company}', years='{years_of_experience}'")
 
         # Decide: use normal mode (company found) or random mode (company not found)
-        company_exists = extracted_company != "Unknown Company" and company_exists_in_db(db, extracted_company)
+        # DB work is blocking, so keep it off the event loop like the LLM call above.
+        company_exists = extracted_company != "Unknown Company" and await run_in_threadpool(company_exists_in_db, db, extracted_company)
         use_random_mode = not company_exists
         
         print(f"[InterviewRouter] company_exists={company_exists}, use_random_mode={use_random_mode}")
 
         # Fetch questions
-        questions_list = _pick_questions(
+        questions_list = await run_in_threadpool(
+            _pick_questions,
             db,
             company=extracted_company if company_exists else None,  # Pass company only if it exists
             role=None,
@@ -502,6 +514,71 @@ async def start_interview_with_jd(
 
 
 # -------------- Evaluate user answers (generate model answers + compare) --------------- #
+def _evaluate_item(it: Any, model_answer: Optional[str], heuristic_eval: Optional[dict] = None) -> Dict[str, Any]:
+    """Evaluate one answered question; returns the per-question result dict."""
+    try:
+        qobj = it.question or {}
+        user_ans = (it.user_answer or "").strip()
+        q_text = qobj.get("question") or qobj.get("text") or ""
+        skills = _infer_skills(qobj.get("category"), qobj.get("complexity"))
+        if not qobj.get("skills"):
+            qobj["skills"] = skills
+        model_ans = model_answer or ai_service.generate_answer(q_text, skills)
+        if heuristic_eval is not None:
+            eval_res = heuristic_eval
+        else:
+            eval_res = ai_service.evaluate_answer(q_text, user_ans, model_ans)
+        score = int(eval_res.get("score") or 0)
+        return {
+            "question": qobj,
+            "model_answer": model_ans,
+            "score": score,
+            "strengths": eval_res.get("strengths") or [],
+            "weaknesses": eval_res.get("weaknesses") or [],
+            "feedback": eval_res.get("feedback") or "",
+        }
+    except Exception as e:
+        print(f"[InterviewRouter] process_eval error: {e}")
+        return {
+            "question": it.question or {},
+            "model_answer": "",
+            "score": 0,
+            "strengths": [],
+            "weaknesses": [],
+            "feedback": "Evaluation failed.",
+        }
+
+
+def _interview_company(payload: schemas.EvaluateRequest) -> Optional[str]:
+    """Company of a JD-based interview, from interview_metadata or the first
+    question's embedded _interview_metadata."""
+    items = payload.items or []
+    interview_company = None
+    if payload.interview_metadata and isinstance(payload.interview_metadata, dict):
+        interview_company = payload.interview_metadata.get("company_name")
+        if interview_company:
+            print(f"[EvaluateAnswers] ✓ Using company from interview_metadata: '{interview_company}'")
+
+    # Fallback: Check if first question has _interview_metadata (from JD extraction)
+    if not interview_company and items:
+        first_item = items[0]
+        if first_item and first_item.question:
+            q_obj = first_item.question
+            # Check if this question has embedded interview metadata
+            if isinstance(q_obj, dict):
+                q_metadata = q_obj.get("_interview_metadata")
+                if q_metadata and isinstance(q_metadata, dict):
+                    interview_company = q_metadata.get("company_name")
+                    if interview_company:
+                        print(f"[EvaluateAnswers] ✓ Extracted company from first question's _interview_metadata: '{interview_company}'")
+    return interview_company
+
+
+def _enqueue_evaluation(db: Session, payload: Any, current_user: Optional[User], session: Optional[str]) -> JSONResponse:
+    body = enqueue_for_caller(db, payload, user_id=(current_user.id if current_user else None), session_id=session)
+    return JSONResponse(status_code=202, content=jsonable_encoder(body))
+
+
 @router.post("/evaluate-answers")
 def evaluate_answers(
     payload: schemas.EvaluateRequest,
@@ -509,12 +586,22 @@ def evaluate_answers(
     current_user: Optional[User] = Depends(get_optional_user),
     x_session_key: Optional[str] = Header(None, alias="X-Session-Key"),
     session_key: Optional[str] = Query(None),
+    async_job: bool = Query(False, alias="async"),
 ):
     """
     Given a list of answered questions (each contains the original question object
     and the user's answer), generate an ideal/model answer and evaluate the user's
     answer against it. Returns per-question evaluation data and an overall score.
+
+    With `?async=true` the submission is queued for `evaluation_worker.py` instead
+    and a 202 with the job id is returned; poll GET /interview/evaluation-jobs/{id}.
     """
+    if async_job:
+        return _enqueue_evaluation(db, payload, current_user, x_session_key or session_key)
+
+    llm_user = llm_user_key(current_user.id if current_user else None, x_session_key or session_key)
+    set_llm_context(PRIORITY_EVAL, llm_user)
+
     print(f"[EvaluateAnswers] ENDPOINT CALLED - payload object: {payload}")
     print(f"[EvaluateAnswers] payload.interview_metadata: {payload.interview_metadata}")
     print(f"[EvaluateAnswers] payload.interview_metadata type: {type(payload.interview_metadata)}")
@@ -535,15 +622,21 @@ def evaluate_answers(
             skills = _infer_skills(category, complexity)
             qlist.append({"question": qtext, "skills": skills})
 
+        # Ideal answers generated offline (precompute_answers.py) skip live generation
+        precomputed = precomputed_answers_for_items(db, items, ai_service.answer_model)
+
         # First, try a single-shot batch evaluation (model answer + evaluation in one call)
         batch_items = []
-        for it in items:
+        for idx, it in enumerate(items):
             qobj = it.question or {}
             qtext = qobj.get("question") or qobj.get("text") or ""
             category = qobj.get("category")
             complexity = qobj.get("complexity")
             skills = _infer_skills(category, complexity)
-            batch_items.append({"question": qtext, "user_answer": (it.user_answer or "").strip(), "skills": skills})
+            batch_item = {"question": qtext, "user_answer": (it.user_answer or "").strip(), "skills": skills}
+            if idx in precomputed:
+                batch_item["model_answer"] = precomputed[idx]
+            batch_items.append(batch_item)
 
         try:
             batch_eval = ai_service.evaluate_answers_batch(batch_items) if batch_items else []
@@ -599,43 +692,33 @@ def evaluate_answers(
         except Exception as e:
             print(f"[InterviewRouter] Batch evaluate failed, falling back: {e}")
 
-        # Generate model answers in a single batch when possible
-        model_answers = ai_service.generate_answers_batch(qlist) if qlist else []
+        # Generate model answers (single batch when possible) only for questions
+        # without a precomputed answer
+        missing = [i for i in range(len(qlist)) if i not in precomputed]
+        generated = ai_service.generate_answers_batch([qlist[i] for i in missing]) if missing else []
+        model_answers = [precomputed.get(i) for i in range(len(qlist))]
+        for i, ans in zip(missing, generated):
+            model_answers[i] = ans
+
+        # LLM down: score the whole submission in one vectorized heuristic pass
+        heuristic_evals = None
+        if ai_service.heuristic_fallback_active():
+            for idx, q in enumerate(qlist):
+                if not model_answers[idx]:
+                    model_answers[idx] = ai_service.generate_answer(q["question"], q["skills"])
+            heuristic_evals = ai_service.heuristic_evaluate_batch([
+                {"question": q["question"], "user_answer": (it.user_answer or "").strip(), "model_answer": model_answers[idx]}
+                for idx, (q, it) in enumerate(zip(qlist, items))
+            ])
 
         # Evaluate in parallel
         def process_eval(idx, it):
-            try:
-                qobj = it.question or {}
-                user_ans = (it.user_answer or "").strip()
-                q_text = qobj.get("question") or qobj.get("text") or ""
-                skills = _infer_skills(qobj.get("category"), qobj.get("complexity"))
-                if not qobj.get("skills"):
-                    qobj["skills"] = skills
-                model_ans = model_answers[idx] if idx < len(model_answers) else ai_service.generate_answer(q_text, skills)
-                eval_res = ai_service.evaluate_answer(q_text, user_ans, model_ans)
-                score = int(eval_res.get("score") or 0)
-                return {
-                    "question": qobj,
-                    "model_answer": model_ans,
-                    "score": score,
-                    "strengths": eval_res.get("strengths") or [],
-                    "weaknesses": eval_res.get("weaknesses") or [],
-                    "feedback": eval_res.get("feedback") or "",
-                }
-            except Exception as e:
-                print(f"[InterviewRouter] process_eval error: {e}")
-                return {
-                    "question": it.question or {},
-                    "model_answer": "",
-                    "score": 0,
-                    "strengths": [],
-                    "weaknesses": [],
-                    "feedback": "Evaluation failed.",
-                }
+            model_ans = model_answers[idx] if idx < len(model_answers) else None
+            return _evaluate_item(it, model_ans, heuristic_evals[idx] if heuristic_evals is not None else None)
 
         max_workers = min(6, max(1, len(items)))
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-            futures = [ex.submit(process_eval, idx, it) for idx, it in enumerate(items)]
+            futures = [ex.submit(run_in_llm_context, PRIORITY_EVAL, llm_user, process_eval, idx, it) for idx, it in enumerate(items)]
             for fut in concurrent.futures.as_completed(futures):
                 r = fut.result()
                 results.append(r)
@@ -648,24 +731,7 @@ def evaluate_answers(
         overall = int(round((total_score / count))) if count > 0 else 0
 
         # Extract company from metadata (for JD-based interviews)
-        interview_company = None
-        if payload.interview_metadata and isinstance(payload.interview_metadata, dict):
-            interview_company = payload.interview_metadata.get("company_name")
-            if interview_company:
-                print(f"[EvaluateAnswers] ✓ Using company from interview_metadata: '{interview_company}'")
-        
-        # Fallback: Check if first question has _interview_metadata (from JD extraction)
-        if not interview_company and items:
-            first_item = items[0]
-            if first_item and first_item.question:
-                q_obj = first_item.question
-                # Check if this question has embedded interview metadata
-                if isinstance(q_obj, dict):
-                    q_metadata = q_obj.get("_interview_metadata")
-                    if q_metadata and isinstance(q_metadata, dict):
-                        interview_company = q_metadata.get("company_name")
-                        if interview_company:
-                            print(f"[EvaluateAnswers] ✓ Extracted company from first question's _interview_metadata: '{interview_company}'")
+        interview_company = _interview_company(payload)
 
         # Persist evaluation to DB (best-effort)
         try:
@@ -702,6 +768,151 @@ def evaluate_answers(
         raise HTTPException(status_code=500, detail=f"Failed to evaluate answers. ({type(exc).__name__})")
 
 
+
+def _stream_event(event: str, data: Dict[str, Any], fmt: str) -> str:
+    payload = jsonable_encoder(data)
+    if fmt == "ndjson":
+        return json.dumps({"event": event, **payload}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.post("/evaluate-answers/stream")
+def evaluate_answers_stream(
+    payload: schemas.EvaluateRequest,
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_session_key: Optional[str] = Header(None, alias="X-Session-Key"),
+    session_key: Optional[str] = Query(None),
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+):
+    """
+    Streaming variant of /evaluate-answers. Emits one `question` event per item as
+    soon as its evaluation finishes (with the item's `index` in the request), then
+    a final `summary` event with `overall_score` once the Evaluation row is saved.
+
+    `format=sse` (default) sends text/event-stream frames; `format=ndjson` sends one
+    JSON object per line with an `event` key.
+    """
+    items = payload.items or []
+    user_id = current_user.id if current_user else None
+    sess = x_session_key or session_key
+    interview_company = _interview_company(payload)
+    llm_user = llm_user_key(user_id, sess)
+
+    def events():
+        # own session: the request-scoped one is not guaranteed to outlive the response
+        db = SessionLocal()
+        ex = concurrent.futures.ThreadPoolExecutor(max_workers=min(6, max(1, len(items))))
+        try:
+            precomputed = precomputed_answers_for_items(db, items, ai_service.answer_model)
+
+            set_llm_context(PRIORITY_EVAL, llm_user)
+            heuristic_evals = None
+            if ai_service.heuristic_fallback_active():
+                model_answers = {}
+                for idx, it in enumerate(items):
+                    qobj = it.question or {}
+                    qtext = qobj.get("question") or qobj.get("text") or ""
+                    model_answers[idx] = precomputed.get(idx) or ai_service.generate_answer(
+                        qtext, _infer_skills(qobj.get("category"), qobj.get("complexity"))
+                    )
+                precomputed = model_answers
+                heuristic_evals = ai_service.heuristic_evaluate_batch([
+                    {
+                        "question": (it.question or {}).get("question") or (it.question or {}).get("text") or "",
+                        "user_answer": (it.user_answer or "").strip(),
+                        "model_answer": model_answers[idx],
+                    }
+                    for idx, it in enumerate(items)
+                ])
+
+            futures = {
+                ex.submit(
+                    run_in_llm_context, PRIORITY_EVAL, llm_user,
+                    _evaluate_item, it, precomputed.get(idx),
+                    heuristic_evals[idx] if heuristic_evals is not None else None,
+                ): idx
+                for idx, it in enumerate(items)
+            }
+            results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+            for fut in concurrent.futures.as_completed(futures):
+                idx = futures[fut]
+                results[idx] = fut.result()
+                yield _stream_event("question", {"index": idx, **results[idx]}, format)
+
+            scores = [int(r.get("score") or 0) for r in results if r is not None]
+            overall = int(round(sum(scores) / len(scores))) if scores else 0
+
+            evaluation_id = None
+            try:
+                details = {"per_question": results, "interview_company": interview_company}
+                ev = Evaluation(session_id=str(sess) if sess is not None else None, user_id=user_id, overall_score=overall, details=details)
+                db.add(ev)
+                db.commit()
+                db.refresh(ev)
+                evaluation_id = ev.id
+                logger.info(f"(Stream) Saved evaluation id={ev.id} session_id={ev.session_id!r} overall_score={ev.overall_score}")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"(Stream) Failed to persist evaluation: {e}", exc_info=True)
+
+            yield _stream_event("summary", {"overall_score": overall, "count": len(scores), "evaluation_id": evaluation_id}, format)
+        except Exception as exc:
+            print(f"[InterviewRouter] Error in /evaluate-answers/stream: {exc}")
+            yield _stream_event("error", {"detail": f"Failed to evaluate answers. ({type(exc).__name__})"}, format)
+        finally:
+            # client gone or done: don't keep evaluating questions nobody will read
+            ex.shutdown(wait=False, cancel_futures=True)
+            db.close()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# -------------- Queued evaluations (see evaluation_worker.py) --------------- #
+@router.post("/evaluation-jobs", status_code=202)
+def submit_evaluation_job(
+    payload: schemas.EvaluateRequest,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_session_key: Optional[str] = Header(None, alias="X-Session-Key"),
+    session_key: Optional[str] = Query(None),
+):
+    """Queue an evaluation and return its job id immediately."""
+    return _enqueue_evaluation(db, payload, current_user, x_session_key or session_key)
+
+
+def _load_job(job_id: int, user_id: Optional[int], session: Optional[str]) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        job = db.get(EvaluationJob, job_id)
+        if job is None or not can_read_job(job, user_id, session):
+            return None
+        return job_to_dict(job)
+    finally:
+        db.close()
+
+
+@router.get("/evaluation-jobs/{job_id}")
+async def get_evaluation_job(
+    job_id: int,
+    current_user: Optional[User] = Depends(get_optional_user),
+    x_session_key: Optional[str] = Header(None, alias="X-Session-Key"),
+    wait: float = Query(0, ge=0, le=30, description="long-poll up to this many seconds for the job to finish"),
+):
+    """Status of a queued evaluation; `result` holds the usual evaluate-answers
+    response once `status` is done. Anonymous jobs are only visible with the
+    X-Session-Key they were submitted with (or the key the 202 returned)."""
+    user_id = current_user.id if current_user else None
+    session = x_session_key
+    deadline = time.monotonic() + wait
+    while True:
+        job = await run_in_threadpool(_load_job, job_id, user_id, session)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Evaluation job not found")
+        if job["status"] in ("done", "failed") or time.monotonic() >= deadline:
+            return jsonable_encoder(job)
+        await asyncio.sleep(1.0)
+
 # -------------- Interview metrics and history --------------- #
 @router.get("/metrics")
 def get_interview_metrics(
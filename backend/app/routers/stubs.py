@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, Body, Depends, Header
+from fastapi import APIRouter, HTTPException, Body, Depends, Header, Query
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Any
 
 from app.database import get_db
 from app.ai_services import ai_service
+from app.model_answers import precomputed_answers_for_items
+from app.evaluation_jobs import enqueue_for_caller
+from app.llm_scheduler import PRIORITY_EVAL, llm_user_key, set_llm_context
 from app.models import Evaluation, User
 from typing import Optional
 from app.routers.auth import _decode_bearer
@@ -45,12 +49,17 @@ def stt():
 
 
 @router.post("/api/interview/evaluate-answers")
-def evaluate_answers_proxy(payload: dict = Body(...), db: Session = Depends(get_db), current_user: Optional[User] = Depends(get_optional_user)) -> Any:
+def evaluate_answers_proxy(payload: dict = Body(...), db: Session = Depends(get_db), current_user: Optional[User] = Depends(get_optional_user), async_job: bool = Query(False, alias="async"), x_session_key: Optional[str] = Header(None, alias="X-Session-Key"), session_key: Optional[str] = Query(None)) -> Any:
 	"""
 	Compatibility proxy: expose /api/interview/evaluate-answers for clients that post there.
 	This delegates to `ai_service` to generate model answers and evaluate user answers.
 	It persists a best-effort `Evaluation` record and returns the same shape as the main router.
+	With `?async=true` the submission is queued for the evaluation worker instead (202 + job id).
 	"""
+	if async_job:
+		body = enqueue_for_caller(db, payload, user_id=(current_user.id if current_user else None), session_id=(x_session_key or session_key))
+		return JSONResponse(status_code=202, content=jsonable_encoder(body))
+	set_llm_context(PRIORITY_EVAL, llm_user_key(current_user.id if current_user else None))
 	try:
 		items = payload.get("items") or []
 		# Prepare minimal batch for generation (only question text)
@@ -60,7 +69,24 @@ def evaluate_answers_proxy(payload: dict = Body(...), db: Session = Depends(get_
 			qtext = qobj.get("question") or qobj.get("text") or ""
 			qlist.append({"question": qtext})
 
-		model_answers = ai_service.generate_answers_batch(qlist) if qlist else []
+		# Ideal answers generated offline (precompute_answers.py) skip live generation
+		precomputed = precomputed_answers_for_items(db, items, ai_service.answer_model)
+		missing = [i for i in range(len(qlist)) if i not in precomputed]
+		generated = ai_service.generate_answers_batch([qlist[i] for i in missing]) if missing else []
+		model_answers = [precomputed.get(i) for i in range(len(qlist))]
+		for i, ans in zip(missing, generated):
+			model_answers[i] = ans
+
+		# LLM down: score the whole submission in one vectorized heuristic pass
+		heuristic_evals = None
+		if ai_service.heuristic_fallback_active():
+			for idx, q in enumerate(qlist):
+				if not model_answers[idx]:
+					model_answers[idx] = ai_service.generate_answer(q["question"])
+			heuristic_evals = ai_service.heuristic_evaluate_batch([
+				{"question": q["question"], "user_answer": (it.get("user_answer") or "").strip(), "model_answer": model_answers[idx]}
+				for idx, (q, it) in enumerate(zip(qlist, items))
+			])
 
 		results = []
 		total = 0
@@ -76,8 +102,11 @@ def evaluate_answers_proxy(payload: dict = Body(...), db: Session = Depends(get_
 				# best-effort: try to infer category/complexity based skills if available
 				if isinstance(qobj.get("category"), str):
 					skills = [qobj.get("category")]
-			model_ans = model_answers[idx] if idx < len(model_answers) else ai_service.generate_answer(qtext, skills)
-			eval_res = ai_service.evaluate_answer(qtext, user_ans, model_ans)
+			model_ans = model_answers[idx] if idx < len(model_answers) and model_answers[idx] else ai_service.generate_answer(qtext, skills)
+			if heuristic_evals is not None:
+				eval_res = heuristic_evals[idx]
+			else:
+				eval_res = ai_service.evaluate_answer(qtext, user_ans, model_ans)
 			score = int(eval_res.get("score") or 0)
 			results.append({
 				"question": qobj,
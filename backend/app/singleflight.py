@@ -0,0 +1,70 @@
+"""
+Request coalescing ("single-flight") for identical in-flight LLM work.
+
+When several callers ask for the same key at once, only the first (the leader)
+runs the function; the others wait on the leader's future and receive the same
+result or exception. The key is released as soon as the call finishes, so this
+complements the answer cache rather than replacing it.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key, for threads (`do`) and for
+    coroutines on one event loop (`do_async`)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._calls[key] = fut
+                self._stats["leaders"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return fut.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        fut.set_result(result)
+        return result
+
+    async def do_async(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _t, k=key: self._tasks.pop(k, None))
+            with self._lock:
+                self._stats["leaders"] += 1
+        else:
+            with self._lock:
+                self._stats["coalesced"] += 1
+        # shield: one waiter being cancelled (client disconnect) must not cancel
+        # the shared call the other waiters depend on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._tasks)
+        return stats
@@ -0,0 +1,139 @@
+"""
+Benchmark app/multi_match.py against the scans it replaced.
+
+Compares, on synthetic long JDs and answers:
+- company detection: `company.lower() in jd_lower` per company vs `MultiPatternMatcher.hits`
+- brand sanitizing: the longest-first `\\b(...)\\b` regex alternation vs `MultiPatternMatcher.sub`
+- skill/signal keywords: `kw in answer` per keyword per skill vs one `KeywordGroups` scan
+- a large vocabulary (`--vocab` synthetic company names), where the matcher
+  switches to its single-pass trie scan
+
+and checks that both sides agree before timing them.
+
+Usage (from backend/):
+    python bench_multi_match.py [--repeat 50] [--sizes 2000,10000,50000] [--vocab 1000]
+"""
+import argparse
+import random
+import re
+import timeit
+
+from app.multi_match import KeywordGroups, MultiPatternMatcher
+from app.routers.interview import _BRAND_TOKENS
+
+# kept local so the benchmark does not need the CSV / database
+COMPANIES = ["Airbnb", "Amazon", "Apple", "Freshworks", "Google", "Meta", "Microsoft", "Netflix", "Salesforce", "Stripe", "Uber", "Zoho"]
+SKILL_KEYWORDS = {
+    "growth": ["growth", "activation", "retention", "acquisition", "funnel", "experiment", "a/b", "ab test", "conversion", "kpi", "metric"],
+    "user experience": ["ux", "user research", "usability", "persona", "wireframe", "prototype", "usability test", "user interview", "journey"],
+    "analytics": ["sql", "analytics", "data", "cohort", "segmentation", "dashboard", "metric", "kpi", "funnel", "measurement"],
+    "vision": ["vision", "roadmap", "strategy", "long-term", "north star", "product vision", "mission"],
+    "social impact": ["impact", "sustainability", "social", "community", "ethics", "accessibility"],
+    "product strategy": ["strategy", "market", "positioning", "value proposition", "differentiation", "segmentation"],
+    "execution": ["execution", "launch", "timeline", "milestone", "stakeholder", "resourcing", "delivery", "implementation"],
+}
+SIGNALS = {
+    "example": ["example", "project", "launched", "led", "for instance"],
+    "metric": ["%", "percent", "nps", "kpi", "metric", "users", "retention", "growth"],
+    "structure": ["i would", "approach", "steps", "first", "second", "then", "finally", "summary"],
+}
+
+FILLER = (
+    "we are looking for a product manager to own the roadmap partner with engineering and design "
+    "define success metrics run experiments and communicate with stakeholders across the organization "
+    "you will drive discovery write specs prioritize the backlog and ship customer facing features"
+).split()
+
+
+def synthetic_text(n_chars: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    vocab = FILLER + [w for kws in SKILL_KEYWORDS.values() for w in kws] + ["Stripe", "Google", "AWS", "iOS"]
+    words = []
+    size = 0
+    while size < n_chars:
+        w = rnd.choice(vocab)
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)
+
+
+def synthetic_vocab(n: int, seed: int = 11) -> list[str]:
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    names = set(COMPANIES)
+    while len(names) < n:
+        names.add("".join(rnd.choice(letters) for _ in range(rnd.randint(4, 10))).title())
+    return sorted(names)
+
+
+def loop_companies(text: str, companies: list[str] = COMPANIES) -> set:
+    lower = text.lower()
+    return {c for c in companies if c.lower() in lower}
+
+
+def loop_skill_signals(answer: str) -> tuple:
+    lower = answer.lower()
+    per_skill = {sk: sum(1 for kw in kws if kw in lower) for sk, kws in SKILL_KEYWORDS.items()}
+    flags = {name: any(kw in lower for kw in kws) for name, kws in SIGNALS.items()}
+    return per_skill, flags
+
+
+def matcher_skill_signals(groups: KeywordGroups, answer: str) -> tuple:
+    found = groups.keywords_in(answer.lower())
+    hit_groups = groups.groups_of(found)
+    per_skill = {sk: sum(1 for kw in kws if kw in found) for sk, kws in SKILL_KEYWORDS.items()}
+    flags = {name: name in hit_groups for name in SIGNALS}
+    return per_skill, flags
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    seconds = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"  {label:<34} {seconds * 1e3:9.3f} ms")
+    return seconds
+
+
+def main(repeat: int, sizes: list[int], vocab_size: int) -> None:
+    company_matcher = MultiPatternMatcher(COMPANIES)
+    vocab = synthetic_vocab(vocab_size)
+    vocab_matcher = MultiPatternMatcher(vocab)
+    brand_regex = re.compile(
+        r"\b(" + "|".join(re.escape(t) for t in sorted(_BRAND_TOKENS, key=len, reverse=True)) + r")\b",
+        flags=re.IGNORECASE,
+    )
+    brand_matcher = MultiPatternMatcher(_BRAND_TOKENS, whole_words=True)
+    groups = KeywordGroups({**SIGNALS, **{f"skill:{k}": v for k, v in SKILL_KEYWORDS.items()}})
+
+    for size in sizes:
+        text = synthetic_text(size)
+        print(f"\ntext of {len(text)} chars")
+
+        assert loop_companies(text) == company_matcher.hits(text)
+        assert brand_regex.sub("X", text) == brand_matcher.sub(text, "X")
+        assert loop_skill_signals(text) == matcher_skill_signals(groups, text)
+        assert loop_companies(text, vocab) == vocab_matcher.hits(text)
+
+        print(" companies")
+        a = bench("loop: company in text", lambda: loop_companies(text), repeat)
+        b = bench("matcher hits", lambda: company_matcher.hits(text), repeat)
+        print(f"  speedup {a / b:5.2f}x")
+        print(" brand sanitizer")
+        a = bench("regex alternation sub", lambda: brand_regex.sub("X", text), repeat)
+        b = bench("matcher sub", lambda: brand_matcher.sub(text, "X"), repeat)
+        print(f"  speedup {a / b:5.2f}x")
+        print(" skill keywords + signals")
+        a = bench("loop: kw in answer per skill", lambda: loop_skill_signals(text), repeat)
+        b = bench("matcher keyword groups", lambda: matcher_skill_signals(groups, text), repeat)
+        print(f"  speedup {a / b:5.2f}x")
+        print(f" {len(vocab)}-name vocabulary (trie scan: {vocab_matcher.use_trie})")
+        a = bench("loop: name in text", lambda: loop_companies(text, vocab), repeat)
+        b = bench("matcher hits", lambda: vocab_matcher.hits(text), repeat)
+        print(f"  speedup {a / b:5.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multi-pattern matcher.")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per timing run")
+    parser.add_argument("--sizes", default="2000,10000,50000", help="comma-separated text sizes in characters")
+    parser.add_argument("--vocab", type=int, default=1000, help="names in the large-vocabulary case")
+    args = parser.parse_args()
+    main(args.repeat, [int(s) for s in args.sizes.split(",") if s.strip()], args.vocab)
@@ -1,6 +1,6 @@
 from app.database import engine, Base
 # Import only the models that exist: User and Question
-from app.models import User, Question, ServedQuestion, Evaluation
+from app.models import User, Question, ServedQuestion, Evaluation, CacheEntry, ModelAnswer, EvaluationJob
 
 print("Creating all database tables...")
 # This will create the 'users' and 'questions' tables.
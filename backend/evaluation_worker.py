@@ -0,0 +1,69 @@
+"""
+Worker process for queued evaluations (see app/evaluation_jobs.py).
+
+Claims queued `evaluation_jobs` rows one at a time and runs the regular
+evaluate-answers pipeline for each. Run as many workers as the LLM backend can
+serve; claiming is safe across processes and hosts.
+
+Usage (from backend/):
+    python evaluation_worker.py [--poll-interval 2] [--once] [--worker-id NAME]
+"""
+import argparse
+import os
+import signal
+import time
+
+from app.database import SessionLocal
+from app.evaluation_jobs import claim_next_job, default_worker_id, requeue_stale_jobs, run_job
+
+_stopping = False
+
+
+def _request_stop(signum, _frame):
+    global _stopping
+    _stopping = True
+    print(f"[evaluation_worker] signal {signum}: finishing current job, then exiting")
+
+
+def work(poll_interval: float = 2.0, once: bool = False, worker_id: str | None = None) -> int:
+    """Process jobs until stopped (or until the queue is empty with `once`).
+    Returns the number of jobs processed."""
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    last_stale_check = 0.0
+    print(f"[evaluation_worker] {worker_id} started (poll every {poll_interval}s)")
+    while not _stopping:
+        db = SessionLocal()
+        try:
+            if time.time() - last_stale_check > 60:
+                requeue_stale_jobs(db)
+                last_stale_check = time.time()
+            job = claim_next_job(db, worker_id)
+            if job is not None:
+                started = time.time()
+                job = run_job(db, job)
+                processed += 1
+                print(f"[evaluation_worker] job id={job.id} -> {job.status} in {time.time() - started:.1f}s")
+                continue
+        except Exception as e:
+            print(f"[evaluation_worker] error: {e}")
+        finally:
+            db.close()
+        if once:
+            break
+        time.sleep(poll_interval)
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued answer evaluations.")
+    parser.add_argument("--poll-interval", type=float, default=float(os.environ.get("EVAL_WORKER_POLL_SECONDS", "2")),
+                        help="seconds to wait when the queue is empty")
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    parser.add_argument("--worker-id", default=None, help="name recorded on claimed jobs (default host-pid)")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    count = work(poll_interval=args.poll_interval, once=args.once, worker_id=args.worker_id)
+    print(f"[evaluation_worker] processed {count} job(s)")
@@ -1,9 +1,15 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import os
 import re
+import sys
 import json
 import random
 
+# multi_match lives in backend/app/ (shared with the backend, standard library only)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app"))
+from multi_match import KeywordGroups
+
 app = Flask(__name__)
 CORS(app)
 
@@ -108,6 +114,24 @@ def generate_model_answer(question, skills=None):
 
     return answer
 
+# Signal keyword lists for evaluate_answer, matched in one pass per text
+_ANSWER_SIGNALS = KeywordGroups({
+    "user_metrics": ["%","percent","metric","kpi","increase","decrease","uplift","nps","activation","retention","conversion","dau","mau"],
+    "user_framework": ["2x2","matrix","framework","step","approach","1)","2)","3)","4)","process","phase"],
+    "user_examples": ["example","project","case","scenario","led","implemented","launched","we did","experienced"],
+    "user_outcomes": ["result","impact","outcome","improve","improved","achieved","success","measure"],
+    "user_timeframe": ["week","month","days","timeline","roadmap","sprint"],
+    "cadence": ["daily","weekly","monthly","cadence"],
+    "model_metrics": ["%","percent","metric","kpi","nps","activation","retention","conversion","dau","mau"],
+    "model_framework": ["2x2","matrix","framework","step","approach","1)","2)","3)","4)","process"],
+    "model_examples": ["example","project","case"],
+})
+_QUESTION_SIGNALS = KeywordGroups({
+    "prioritization": ["prioritize", "priority", "prioritization", "choose", "select features", "rank", "order"],
+    "measurement": ["measure", "measurement", "success", "metric", "kpi", "track", "evaluate"],
+    "strategy": ["strategy", "strategic", "approach", "how would", "how to", "handle", "problem", "challenge"],
+})
+
 def evaluate_answer(question_text, model_answer, user_answer):
     """Generate structured evaluation with human-readable, context-aware feedback."""
     strengths = []
@@ -127,15 +151,17 @@ def evaluate_answer(question_text, model_answer, user_answer):
     concept_sim = overlap / denom if denom > 0 else 0.0
 
     # Detailed signal detection
-    has_user_metrics = any(tok in ua for tok in ["%","percent","metric","kpi","increase","decrease","uplift","nps","activation","retention","conversion","dau","mau"])
-    has_user_framework = any(tok in ua for tok in ["2x2","matrix","framework","step","approach","1)","2)","3)","4)","process","phase"])
-    has_user_examples = any(tok in ua for tok in ["example","project","case","scenario","led","implemented","launched","we did","experienced"])
-    has_user_outcomes = any(tok in ua for tok in ["result","impact","outcome","improve","improved","achieved","success","measure"])
-    has_user_timeframe = any(tok in ua for tok in ["week","month","days","timeline","roadmap","sprint"])
+    ua_signals = _ANSWER_SIGNALS.groups_in(ua)
+    ma_signals = _ANSWER_SIGNALS.groups_in(ma)
+    has_user_metrics = "user_metrics" in ua_signals
+    has_user_framework = "user_framework" in ua_signals
+    has_user_examples = "user_examples" in ua_signals
+    has_user_outcomes = "user_outcomes" in ua_signals
+    has_user_timeframe = "user_timeframe" in ua_signals
     
-    has_model_metrics = any(tok in ma for tok in ["%","percent","metric","kpi","nps","activation","retention","conversion","dau","mau"])
-    has_model_framework = any(tok in ma for tok in ["2x2","matrix","framework","step","approach","1)","2)","3)","4)","process"])
-    has_model_examples = any(tok in ma for tok in ["example","project","case"])
+    has_model_metrics = "model_metrics" in ma_signals
+    has_model_framework = "model_framework" in ma_signals
+    has_model_examples = "model_examples" in ma_signals
 
     # Length analysis
     ua_len = len(ua_tokens)
@@ -172,9 +198,10 @@ def evaluate_answer(question_text, model_answer, user_answer):
         strengths.append("You thought about timing and realistic rollout phases")
 
     # QUESTION-TYPE SPECIFIC SIGNALS
-    is_prioritization = any(w in q for w in ["prioritize", "priority", "prioritization", "choose", "select features", "rank", "order"])
-    is_measurement = any(w in q for w in ["measure", "measurement", "success", "metric", "kpi", "track", "evaluate"])
-    is_strategy = any(w in q for w in ["strategy", "strategic", "approach", "how would", "how to", "handle", "problem", "challenge"])
+    q_signals = _QUESTION_SIGNALS.groups_in(q)
+    is_prioritization = "prioritization" in q_signals
+    is_measurement = "measurement" in q_signals
+    is_strategy = "strategy" in q_signals
 
     # Add targeted strengths/weaknesses per question type to avoid generic repetition
     if is_prioritization:
@@ -193,7 +220,7 @@ def evaluate_answer(question_text, model_answer, user_answer):
         else:
             weaknesses.append("Specify primary metrics (activation, retention, conversion) and their targets")
         # encourage cadence and guardrails
-        if any(tok in ua for tok in ["daily","weekly","monthly","cadence"]):
+        if "cadence" in ua_signals:
             strengths.append("You described a measurement cadence")
         else:
             weaknesses.append("Add measurement cadence (e.g., daily for launch, weekly thereafter) and guardrails")
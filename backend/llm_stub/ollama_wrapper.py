@@ -3,18 +3,32 @@ Ollama Wrapper — Flask service that calls Ollama and translates responses
 for PM Bot's backend evaluation system.
 """
 import os
-import json
+import sys
 import requests
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import time
 
+# llm_json / llm_profiles / llm_stream are the backend's modules (backend/app/):
+# the Docker image copies them next to this file, a checkout imports them from there.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app"))
+
+from llm_json import parse_llm_json
+from llm_profiles import decode_deadline, profile_for
+from llm_stream import StreamAccumulator
+
 app = Flask(__name__)
 CORS(app)
 
 # Ollama runs on localhost:11434 inside container
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
 MODEL = os.environ.get("LLM_MODEL", "llama2")
+# How long Ollama keeps the model loaded after a call (forwarded as keep_alive).
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Stream JSON tasks from Ollama and stop reading once the JSON value is complete.
+STREAM = str(os.environ.get("OLLAMA_STREAM", "1")).lower() in ("1", "true", "yes")
+# Token accounting fields passed back to the backend (prefix-cache statistics).
+_PASSTHROUGH_FIELDS = ("context", "prompt_eval_count", "eval_count", "load_duration", "prompt_eval_duration", "total_duration")
 
 def wait_for_ollama(max_wait=60):
     """Wait for Ollama to be ready."""
@@ -33,35 +47,83 @@ def wait_for_ollama(max_wait=60):
     return False
 
 
-def query_ollama(prompt: str, system_prompt: str = "", temperature: float = 0.7, model: str = None) -> str:
-    """Query Ollama for text generation."""
+def _stream_ollama(payload: dict, timeout: float, expect: str) -> dict:
+    """Streamed /api/generate that stops reading once the `expect` JSON value is
+    complete; returns the same shape as a non-streamed reply."""
+    resp = requests.post(f"{OLLAMA_URL}/api/generate", json={**payload, "stream": True}, timeout=timeout, stream=True)
+    try:
+        if resp.status_code != 200:
+            print(f"[Ollama] Error {resp.status_code}: {resp.text[:200]}")
+            return {}
+        acc = StreamAccumulator(expect, timeout)
+        for line in resp.iter_lines():
+            if acc.add_line(line):
+                break
+        result = acc.result()
+    finally:
+        resp.close()
+    if not result.streamed:
+        return result.body
+    if result.stopped_early:
+        print(f"[Ollama] Closed stream once the JSON {expect} was complete ({result.chunks} chunks)")
+    return {**result.body, "response": result.text}
+
+
+def query_ollama_raw(prompt: str, system_prompt: str = "", temperature: float = None, model: str = None,
+                     context: list = None, keep_alive=None, options: dict = None, task: str = "generate",
+                     expect: str = None) -> dict:
+    """Query Ollama for text generation; returns Ollama's JSON ({} on failure).
+
+    Generation options come from the task's profile (llm_profiles.py); an
+    explicit `temperature` or `options` from the caller override it. Tasks that
+    answer with JSON (`expect`, else the profile's expect_json) are streamed and
+    cut off as soon as the JSON value is complete."""
     if not model:
         model = MODEL
     
     try:
+        profile = profile_for(task)
+        expect = expect or profile.expect_json
+        prompt_tokens = (len(prompt or "") + len(system_prompt or "")) // 4
+        opts = profile.options(prompt_tokens=prompt_tokens)
+        if temperature is not None:
+            opts["temperature"] = temperature
+        opts.update(options or {})
         payload = {
             "model": model,
             "prompt": prompt,
             "stream": False,
-            "temperature": temperature,
+            "keep_alive": KEEP_ALIVE if keep_alive is None else keep_alive,
+            "options": opts,
         }
         if system_prompt:
             payload["system"] = system_prompt
+        if context:
+            payload["context"] = context
+        timeout = decode_deadline(opts.get("num_predict") or 0)
         
-        print(f"[Ollama] Calling {model} with prompt ({len(prompt)} chars)...")
-        resp = requests.post(f"{OLLAMA_URL}/api/generate", json=payload, timeout=180)
+        print(f"[Ollama] Calling {model} with prompt ({len(prompt)} chars, system {len(system_prompt or '')} chars), task={task} options={opts} timeout={timeout:.0f}s...")
+        if STREAM and expect:
+            result = _stream_ollama(payload, timeout, expect)
+            print(f"[Ollama] Got response ({len(result.get('response') or '')} chars, prompt_eval_count={result.get('prompt_eval_count')})")
+            return result
+        resp = requests.post(f"{OLLAMA_URL}/api/generate", json=payload, timeout=timeout)
         
         if resp.status_code == 200:
             result = resp.json()
-            text = result.get("response", "").strip()
-            print(f"[Ollama] Got response ({len(text)} chars)")
-            return text
+            print(f"[Ollama] Got response ({len(result.get('response') or '')} chars, prompt_eval_count={result.get('prompt_eval_count')})")
+            return result
         else:
             print(f"[Ollama] Error {resp.status_code}: {resp.text[:200]}")
-            return ""
+            return {}
     except Exception as e:
         print(f"[Ollama] Exception: {e}")
-        return ""
+        return {}
+
+
+def query_ollama(prompt: str, system_prompt: str = "", temperature: float = None, model: str = None, task: str = "generate") -> str:
+    """Query Ollama for text generation."""
+    return (query_ollama_raw(prompt, system_prompt, temperature, model, task=task).get("response") or "").strip()
 
 
 @app.route('/api/tags', methods=['GET'])
@@ -81,13 +143,26 @@ def generate():
         if not prompt:
             return jsonify({"response": ""})
         
-        # Call Ollama
-        result = query_ollama(prompt, temperature=0.6, model=model)
+        # Call Ollama; system / context / keep_alive / options are forwarded so
+        # the backend's stable system prompts can hit Ollama's prefix cache (and
+        # its per-task options override the wrapper's "generate" profile)
+        raw = query_ollama_raw(
+            prompt,
+            data.get("system") or "",
+            model=model,
+            context=data.get("context"),
+            keep_alive=data.get("keep_alive"),
+            options=data.get("options"),
+            expect=data.get("json_expect"),
+        )
+        result = (raw.get("response") or "").strip()
         
         if not result:
             result = "I would approach this systematically by understanding the problem, analyzing the data, and implementing solutions based on metrics."
         
-        return jsonify({"response": result})
+        body = {"response": result}
+        body.update({k: raw[k] for k in _PASSTHROUGH_FIELDS if k in raw})
+        return jsonify(body)
     
     except Exception as e:
         print(f"[/api/generate] Error: {e}")
@@ -127,7 +202,7 @@ Use clear frameworks, specific metrics, and business thinking. Be concise (150-2
         
         prompt = f"PM Interview Question: {question}\n\nKey Skills: {skills_text}\n\nProvide a high-quality PM answer:"
         
-        answer = query_ollama(prompt, system, temperature=0.6, model=model)
+        answer = query_ollama(prompt, system, model=model, task="answer")
         
         if not answer:
             answer = "I would approach this systematically: 1) Understand the problem deeply, 2) Analyze the data and stakeholders, 3) Develop hypotheses, 4) Test and iterate. Key metrics would include user engagement, retention, and business impact."
@@ -173,20 +248,12 @@ def evaluate_answer():
             f"Example JSON: {example}\n\nJSON:"
         )
 
-        response = query_ollama(prompt, system, temperature=0.3, model=model)
+        response = query_ollama(prompt, system, model=model, task="evaluate")
         
         # Parse JSON
         def try_parse(resp_text: str) -> dict | None:
-            try:
-                json_start = resp_text.find('{')
-                json_end = resp_text.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = resp_text[json_start:json_end]
-                    return json.loads(json_str)
-                else:
-                    return json.loads(resp_text)
-            except Exception:
-                return None
+            data = parse_llm_json(resp_text, "object").value
+            return data if isinstance(data, dict) else None
 
         eval_data = try_parse(response or "")
         # If model returned incomplete/missing fields, retry with an even stricter prompt
@@ -204,11 +271,12 @@ def evaluate_answer():
                 f"IDEAL_ANSWER: {model_answer}\nUSER_ANSWER: {user_answer}\nJSON:"
             )
             print("[Ollama Wrapper] First eval parse incomplete, retrying with stricter prompt")
-            response2 = query_ollama(retry_prompt, system, temperature=0.2, model=model)
+            response2 = query_ollama(retry_prompt, system, model=model, task="evaluate_retry")
             eval_data = try_parse(response2 or "")
 
         # If still incomplete, return an explicit minimal structured response so backend can present an actionable message
-        if not eval_data or not has_required_fields(eval_data):
+        placeholder = not eval_data or not has_required_fields(eval_data)
+        if placeholder:
             print(f"[Ollama Wrapper] Evaluation still incomplete; returning minimal structured response. Resp1 len={len(response or '')} Resp2 len={len(response2 or '') if 'response2' in locals() else 0}")
             eval_data = {
                 "similarity_score": 0.0,
@@ -256,6 +324,9 @@ def evaluate_answer():
             result["strengths"] = []
             result["improvements"] = []
             result["feedback"] = ""
+        if placeholder:
+            # lets callers tell "model gave nothing" apart from a real score of 0
+            result["fallback"] = True
 
         return jsonify(result)
     
@@ -0,0 +1,96 @@
+"""
+Offline batch job: fill the `model_answers` table with an ideal answer for every
+question in the bank, so evaluations never wait on live answer generation.
+
+Resumable: each batch is committed as it completes and questions that already
+have a current answer for the model are skipped, so the job can be stopped and
+re-run at any time (e.g. after `load_questions.py` reloads the bank).
+
+Usage (from backend/):
+    python precompute_answers.py [--batch-size 8] [--limit N] [--model llama3]
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.models import Question
+from app.ai_services import ai_service
+from app.model_answers import load_precomputed_answers, store_precomputed_answer
+from app.routers.interview import _infer_skills
+from app.llm_scheduler import PRIORITY_BACKGROUND, llm_context
+
+
+def _pending_questions(db, model: str, after_id: int, batch_size: int):
+    """Next questions (by id, after `after_id`) without a current answer for `model`."""
+    pending = []
+    while len(pending) < batch_size:
+        rows = (
+            db.query(Question)
+            .filter(Question.id > after_id)
+            .order_by(Question.id.asc())
+            .limit(batch_size * 4)
+            .all()
+        )
+        if not rows:
+            break
+        done = load_precomputed_answers(db, [q.id for q in rows], model)
+        for q in rows:
+            after_id = q.id
+            if q.id not in done and (q.text or q.question):
+                pending.append(q)
+                if len(pending) >= batch_size:
+                    break
+    return pending, after_id
+
+
+def precompute(batch_size: int = 8, limit: int | None = None, model: str | None = None) -> dict:
+    if model:
+        ai_service.answer_model = model
+    model = ai_service.answer_model
+
+    db = SessionLocal()
+    stored = 0
+    skipped = 0
+    cursor = 0
+    started = time.time()
+    try:
+        while limit is None or stored + skipped < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stored - skipped)
+            batch, cursor = _pending_questions(db, model, cursor, size)
+            if not batch:
+                break
+
+            qlist = [
+                {"question": q.text or q.question or "", "skills": _infer_skills(q.category, q.complexity)}
+                for q in batch
+            ]
+            # background class: yields LLM slots to interactive requests in this process
+            with llm_context(PRIORITY_BACKGROUND, "precompute"):
+                answers = ai_service.generate_answers_batch(qlist)
+
+            for q, item, answer in zip(batch, qlist, answers):
+                # Only answers from the answer model itself land in the answer cache;
+                # template fallbacks and answers from a downgraded fallback model
+                # are left for a later run instead of being stored as "ideal".
+                key = ai_service._answer_cache_key(item["question"], item["skills"])
+                if answer and ai_service.answer_cache.get(key) == answer:
+                    store_precomputed_answer(db, q, model, answer)
+                    stored += 1
+                else:
+                    skipped += 1
+            db.commit()
+            print(f"[precompute_answers] up to question id={cursor}: stored={stored} skipped={skipped} ({time.time() - started:.0f}s)")
+    finally:
+        db.close()
+    return {"model": model, "stored": stored, "skipped": skipped}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute ideal answers for the question bank.")
+    parser.add_argument("--batch-size", type=int, default=8, help="questions per generate_answers_batch call")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many questions")
+    parser.add_argument("--model", default=None, help="answer model (defaults to LLM_ANSWER_MODEL)")
+    args = parser.parse_args()
+
+    stats = precompute(batch_size=max(1, args.batch_size), limit=args.limit, model=args.model)
+    print(f"Precomputed answers. Model={stats['model']}, Stored={stats['stored']}, Skipped={stats['skipped']}")
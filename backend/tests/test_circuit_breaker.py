@@ -0,0 +1,30 @@
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure("boom")
+    assert breaker.state == HALF_OPEN  # recovery_timeout=0: probe right away
+    return breaker
+
+
+def test_single_probe_then_close_or_reopen():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    breaker = half_open_breaker()
+    breaker.recovery_timeout = 60
+    assert breaker.allow_request()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+
+
+def test_released_probe_can_be_retried():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    breaker.release()  # e.g. the probing coroutine was cancelled
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from app.hedging import HedgePolicy, is_cancelled
+
+
+def policy(delay=0.05):
+    # min_samples=1 so recorded latencies drive the delay as soon as there is one
+    return HedgePolicy(enabled=True, default_delay=delay, min_delay=0.01, min_samples=1)
+
+
+def slow(value, seconds):
+    def fn():
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_fast_primary_wins_without_hedging():
+    h = policy(delay=1.0)
+    backup_calls = []
+    assert h.run(lambda: "p", lambda: backup_calls.append(1) or "b") == ("p", "primary")
+    stats = h.stats()
+    assert (stats["hedged"], stats["primary_wins"], stats["censored"], backup_calls) == (0, 1, 0, [])
+    assert h.delay() < 1.0  # the primary's latency replaced the default delay
+
+
+def test_backup_started_after_delay_wins_and_primary_is_cancelled():
+    h = policy(delay=0.05)
+    primary_saw_cancel = threading.Event()
+
+    def primary():
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            if is_cancelled():
+                primary_saw_cancel.set()
+                return None
+            time.sleep(0.01)
+        return "p"
+
+    started = time.monotonic()
+    assert h.run(primary, lambda: "b") == ("b", "backup")
+    assert 0.05 <= time.monotonic() - started < 1.0
+    assert primary_saw_cancel.wait(1.0)
+    stats = h.stats()
+    assert (stats["hedged"], stats["backup_wins"], stats["cancelled"]) == (1, 1, 1)
+
+
+def test_invalid_primary_falls_back_to_backup_right_away():
+    h = policy(delay=5.0)
+    started = time.monotonic()
+    assert h.run(lambda: {}, lambda: {"score": 1}) == ({"score": 1}, "backup")
+    assert time.monotonic() - started < 1.0
+    stats = h.stats()
+    assert (stats["fallbacks"], stats["hedged"], stats["backup_wins"]) == (1, 0, 1)
+    # an invalid result is not a latency sample
+    assert h.delay() == 5.0
+
+    def boom():
+        raise RuntimeError("primary down")
+    assert h.run(boom, lambda: "b") == ("b", "backup")
+    assert h.run(lambda: None, lambda: None) == (None, None)
+    assert h.stats()["no_result"] == 1
+
+
+def test_losing_primary_records_censored_sample():
+    h = policy(delay=0.05)
+    assert h.run(slow("p", 0.5), slow("b", 0.1)) == ("b", "backup")
+    stats = h.stats()
+    assert stats["censored"] == 1
+    # the sample is the primary's elapsed time when it was cancelled: delay + backup time
+    assert 0.15 <= h.delay() < 0.5
@@ -0,0 +1,44 @@
+from app.jd_cache import JDExtractionCache, hamming, normalize_jd, simhash
+
+BODY = " ".join(
+    f"You will own the roadmap for area {i}, partner with design and engineering, and define success metrics."
+    for i in range(30)
+)
+GOOGLE_JD = f"Senior Product Manager\nJoin Google as a senior PM with 8+ years of experience. {BODY}"
+DETAILS = {"company_name": "Google", "years_of_experience": "6-10", "level": "Strategic"}
+
+
+def make_cache():
+    return JDExtractionCache(persist=False, max_distance=3)
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = make_cache()
+    cache.store(GOOGLE_JD, "m", DETAILS)
+    assert cache.lookup(GOOGLE_JD.upper().replace(" ", "  "), "m") == (DETAILS, "exact")
+    assert cache.lookup(GOOGLE_JD, "other-model") == (None, None)
+    assert normalize_jd(" A\n b ") == "a b"
+
+
+def test_near_duplicate_with_same_company_hits():
+    cache = make_cache()
+    cache.store(GOOGLE_JD, "m", DETAILS)
+    near = GOOGLE_JD + " Apply now."
+    assert hamming(simhash(near), simhash(GOOGLE_JD)) <= 3
+    assert cache.lookup(near, "m") == (DETAILS, "near")
+
+
+def test_near_duplicate_naming_another_company_misses():
+    cache = make_cache()
+    cache.store(GOOGLE_JD, "m", DETAILS)
+    stripe_jd = GOOGLE_JD.replace("Join Google", "Join Stripe")
+    assert cache.lookup(stripe_jd, "m") == (None, None)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["near_rejected"] == 1
+
+
+def test_near_duplicate_with_other_years_misses():
+    cache = make_cache()
+    cache.store(GOOGLE_JD, "m", DETAILS)
+    junior = GOOGLE_JD.replace("8+ years", "1+ years") + " Apply now."
+    assert cache.lookup(junior, "m") == (None, None)
@@ -0,0 +1,51 @@
+from app.jd_parser import company_scanner, match_companies, parse_jd, parse_years, years_to_bucket
+
+COMPANIES = ["Amazon, Google, Microsoft", "Stripe", "Flipkart", "Swiggy", "Meta"]
+
+
+def test_hiring_company_beats_tool_mentions():
+    jd = ("Senior Product Manager\nFlipkart is hiring a PM with 6+ years of experience. "
+          "You will use Google Analytics and Microsoft Excel daily.")
+    out = parse_jd(jd, COMPANIES)
+    assert out["company_name"] == "Flipkart"
+    assert out["years_of_experience"] == "6-10"
+    assert out["confidence"] == 1.0
+
+
+def test_product_mentions_are_not_companies():
+    jd = "Senior PM\nYou will use Google Analytics and Microsoft Excel daily."
+    assert parse_jd(jd, COMPANIES)["company_name"] == "Unknown Company"
+    assert not match_companies(jd, COMPANIES)
+
+
+def test_mention_outside_hiring_context_stays_below_fast_path():
+    jd = "We are looking for someone with 5+ years of experience integrating payment gateways such as Stripe."
+    out = parse_jd(jd, COMPANIES)
+    assert out["company_name"] == "Stripe"
+    assert out["confidence"] < 0.8
+
+
+def test_hiring_phrases():
+    assert parse_jd("Join Google Cloud as a PM, 8 years experience.", COMPANIES)["company_name"] == "Google"
+    out = parse_jd("We're hiring a Senior Product Manager at Meta with 8 years of product experience.", COMPANIES)
+    assert (out["company_name"], out["confidence"]) == ("Meta", 1.0)
+
+
+def test_years_buckets_follow_question_bank():
+    # "5+ years" sits at the top of the question bank's "3-5" bucket
+    assert years_to_bucket(5) == "3-5"
+    assert years_to_bucket(6) == "6-10"
+    assert parse_years("5+ years of product management experience") == "3-5"
+    assert parse_years("5-8 years") == "6-10"
+    assert parse_years("no number here") is None
+
+
+def test_hyphenated_names_are_not_mentions():
+    assert not match_companies("A Google-like culture with a Meta-style review process.", COMPANIES)
+    assert match_companies("Join Google (Search-Ads team).", COMPANIES) == {"Google": 1}
+
+
+def test_scanner_is_a_plain_substring_scan():
+    # the LLM-failure fallback keeps the old `company.lower() in jd_lower` behaviour
+    scanner = company_scanner(("Google", "Microsoft", "Stripe"))
+    assert scanner.hits("5 years of experience at microsoft, Google-like pace") == {"Microsoft", "Google"}
@@ -0,0 +1,41 @@
+from app.llm_json import parse_llm_json, strip_code_fences
+
+
+def test_lone_object_is_not_searched_for_an_inner_list():
+    raw = '{"index":1,"score":70,"strengths":["a","b"],"weaknesses":[],"feedback":"ok"}'
+    parsed = parse_llm_json(raw, "array")
+    assert parsed.lone_object
+    assert parsed.value["score"] == 70
+    assert parsed.indexed_items() == []
+
+
+def test_lone_object_in_prose_and_truncated():
+    parsed = parse_llm_json('Sure!\n{"score": 70, "strengths": ["a", "b"], "feedback": "cut', "array")
+    assert parsed.lone_object and parsed.truncated
+    assert parsed.value["strengths"] == ["a", "b"]
+
+
+def test_array_after_prose_and_fences():
+    raw = "Here you go:\n```json\n[{'a': 1}, {\"a\": 2,},]\n```"
+    parsed = parse_llm_json(raw, "array")
+    assert parsed.value == [{"a": 1}, {"a": 2}]
+    assert parsed.repaired and not parsed.lone_object
+
+
+def test_truncated_array_keeps_complete_elements():
+    parsed = parse_llm_json('[{"a": 1}, {"a": 2}, {"a": 3, "b": "cut', "array")
+    assert parsed.truncated
+    assert parsed.items_found == 3
+    assert parsed.failed_items == [2]
+    assert parsed.indexed_items() == [(0, {"a": 1}), (1, {"a": 2})]
+
+
+def test_object_with_python_literals():
+    parsed = parse_llm_json("Result: {'ok': True, 'missing': None, 'note': \"it's fine\"}", "object")
+    assert parsed.value == {"ok": True, "missing": None, "note": "it's fine"}
+
+
+def test_empty_and_fences():
+    assert not parse_llm_json("", "array").ok
+    assert not parse_llm_json("no json here", "object").ok
+    assert strip_code_fences("```json\n[1]\n```") == "[1]\n"
@@ -0,0 +1,80 @@
+from app.llm_router import ModelRouter, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile(values, 100) == 5
+    assert percentile(range(1, 101), 95) == 95
+    assert percentile([7.5], 95) == 7.5
+    assert percentile([], 95) is None
+
+
+def make_router(**kw):
+    return ModelRouter(
+        fallbacks={"evaluate": ["small", "tiny"]},
+        budgets_ms={"evaluate": 1000},
+        min_samples=3,
+        recovery_seconds=3600,
+        **kw,
+    )
+
+
+def test_downgrade_when_p95_exceeds_budget():
+    router = make_router()
+    for _ in range(2):
+        router.record("evaluate", "big", 5.0, default="big")
+    # not enough samples yet
+    assert router.model_for("evaluate_batch", "big") == "big"
+    router.record("evaluate", "big", 5.0, default="big")
+    assert router.model_for("evaluate", "big") == "small"
+    # the fallback starts from a clean window and is judged on its own samples
+    for _ in range(3):
+        router.record("evaluate_retry", "small", 0.2, default="big")
+    assert router.model_for("evaluate", "big") == "small"
+    for _ in range(3):
+        router.record("evaluate", "small", 2.0, default="big")
+    assert router.model_for("evaluate", "big") == "tiny"
+    # end of the chain: stays on the last model
+    for _ in range(3):
+        router.record("evaluate", "tiny", 9.0, default="big")
+    stats = router.stats()["routes"]["evaluate"]
+    assert (router.model_for("evaluate", "big"), stats["level"], stats["downgrades"]) == ("tiny", 2, 2)
+
+
+def test_fast_model_and_other_routes_stay_put():
+    router = make_router()
+    for _ in range(10):
+        router.record("evaluate", "big", 0.5, default="big")
+        # no fallbacks configured for answers: measured but never downgraded
+        router.record("answer", "llama3", 60.0, default="llama3")
+    assert router.model_for("evaluate", "big") == "big"
+    assert router.model_for("answer", "llama3") == "llama3"
+    assert router.stats()["routes"]["answer"]["models"]["llama3"]["calls"] == 10
+
+
+def test_samples_from_a_model_not_serving_the_route_are_ignored():
+    router = make_router()
+    for _ in range(5):
+        router.record("evaluate", "small", 5.0, default="big")
+    assert router.model_for("evaluate", "big") == "big"
+
+
+def test_recovery_returns_to_primary_with_fresh_window():
+    router = make_router()
+    for _ in range(3):
+        router.record("evaluate", "big", 5.0, default="big")
+    assert router.model_for("evaluate", "big") == "small"
+    router.recovery_seconds = 0
+    assert router.model_for("evaluate", "big") == "big"
+    stats = router.stats()["routes"]["evaluate"]
+    assert (stats["level"], stats["recoveries"], stats["models"]["big"]["samples"]) == (0, 1, 0)
+
+
+def test_unknown_task_uses_default():
+    router = make_router()
+    router.record("generate", "big", 99.0, default="big")
+    assert router.model_for("generate", "big") == "big"
+    assert router.route_of("generate") is None
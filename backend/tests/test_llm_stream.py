@@ -0,0 +1,48 @@
+import json
+
+from app.llm_stream import JSONCompletionDetector, StreamAccumulator
+
+
+def feed_chunks(detector, text, size=3):
+    for i in range(0, len(text), size):
+        if detector.feed(text[i:i + size]):
+            return True
+    return False
+
+
+def test_array_task_completes_on_lone_object():
+    text = '{"index": 1, "score": 70, "strengths": ["clear", "metrics"], "feedback": "ok"} trailing'
+    d = JSONCompletionDetector("array")
+    assert feed_chunks(d, text)
+    assert json.loads(text[:d.end])["feedback"] == "ok"
+
+
+def test_brackets_in_prose_are_not_openers():
+    text = 'Here are the 2 answers [see below]:\n[{"a": 1}, {"a": [2, 3]}]\nThanks!'
+    d = JSONCompletionDetector("array")
+    assert feed_chunks(d, text)
+    assert json.loads(text[text.index("\n[") + 1:d.end]) == [{"a": 1}, {"a": [2, 3]}]
+
+
+def test_code_fence_and_strings():
+    text = '```json\n{"text": "a } in [a] string", "n": {"m": 1}}\n```'
+    d = JSONCompletionDetector("object")
+    assert feed_chunks(d, text, size=1)
+    assert json.loads(text[text.index("{"):d.end])["n"] == {"m": 1}
+
+
+def test_opener_inside_a_sentence_never_starts():
+    d = JSONCompletionDetector("object")
+    assert not feed_chunks(d, 'The answer is {"score": 5} I think')
+
+
+def test_accumulator_stops_early_and_handles_plain_bodies():
+    acc = StreamAccumulator("object")
+    lines = [json.dumps({"response": piece, "done": False}) for piece in ['{"sco', 're": 5}', " extra"]]
+    assert [acc.add_line(line) for line in lines[:2]] == [False, True]
+    res = acc.result()
+    assert res.streamed and res.stopped_early and res.text == '{"score": 5}'
+
+    plain = StreamAccumulator("object")
+    assert plain.add_line(json.dumps({"score": 1}))
+    assert plain.result().body == {"score": 1}
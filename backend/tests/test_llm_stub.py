@@ -0,0 +1,29 @@
+import ast
+import re
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+STUB = BACKEND / "llm_stub"
+
+
+def local_imports(path):
+    """Top-level modules a stub script imports that exist in backend/app/."""
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+        elif isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+    return {n for n in names if (BACKEND / "app" / f"{n}.py").exists()}
+
+
+def test_stub_has_no_copies_of_backend_modules():
+    shared = local_imports(STUB / "ollama_wrapper.py") | local_imports(STUB / "app.py")
+    assert {"llm_json", "llm_profiles", "llm_stream", "multi_match"} <= shared
+    assert not [name for name in shared if (STUB / f"{name}.py").exists()]
+
+
+def test_stub_image_copies_the_shared_modules_from_app():
+    dockerfile = (STUB / "Dockerfile").read_text(encoding="utf-8")
+    copied = set(re.findall(r"\bapp/(\w+)\.py\b", dockerfile))
+    assert local_imports(STUB / "ollama_wrapper.py") <= copied
@@ -0,0 +1,59 @@
+import re
+
+from app.multi_match import KeywordGroups, MultiPatternMatcher
+from app.routers.interview import _BRAND_TOKENS, _normalize_prompt_brand
+
+TEXTS = [
+    "At Google we shipped Zoho CRM integrations for Zoho Books and Gmail users.",
+    "google-cloud, GOOGLE, Googler, iOS/Android apps; App Store review; teams in Teams.",
+    "Nothing to see here.",
+    "AWS + Azure: Prime Video on Kindle, Office 365 (Slack, Square_Cash, Meta's).",
+    "",
+]
+
+
+def old_brand_sub(text, repl):
+    """The longest-first \\b(...)\\b alternation the brand sanitizer used to run."""
+    pattern = re.compile(
+        r"\b(" + "|".join(re.escape(t) for t in sorted(_BRAND_TOKENS, key=len, reverse=True)) + r")\b",
+        flags=re.IGNORECASE,
+    )
+    return pattern.sub(repl, text)
+
+
+def test_brand_sanitizer_matches_old_regex():
+    for text in TEXTS:
+        assert _normalize_prompt_brand(text, "the company") == old_brand_sub(text, "the company")
+
+
+def test_whole_word_hits_match_regex_boundaries():
+    for use_trie in (False, True):
+        m = MultiPatternMatcher(_BRAND_TOKENS, whole_words=True, use_trie=use_trie)
+        for text in TEXTS:
+            expected = {t for t in _BRAND_TOKENS if re.search(r"\b" + re.escape(t) + r"\b", text, re.IGNORECASE)}
+            assert m.hits(text) == expected
+            assert m.contains_any(text) == bool(expected)
+
+
+def test_substring_hits_match_in_operator_with_and_without_trie():
+    patterns = ["%", "kpi", "a/b", "ab test", "ab", "users", "us", "Straße"]
+    texts = [t.lower() for t in TEXTS] + ["a/b test lifted kpi by 5%", "STRASSE vs straße"]
+    for use_trie in (False, True):
+        m = MultiPatternMatcher(patterns, use_trie=use_trie)
+        for text in texts:
+            assert m.hits(text) == {p for p in patterns if p.lower() in text.lower()}
+
+
+def test_word_chars_extend_the_boundary():
+    plain = MultiPatternMatcher(["Google"], whole_words=True)
+    hyphen = MultiPatternMatcher(["Google"], whole_words=True, word_chars="-")
+    text = "A Google-like culture at Google."
+    assert [h.start for h in plain.find_all(text)] == [2, 25]
+    assert [h.start for h in hyphen.find_all(text)] == [25]
+
+
+def test_keyword_groups():
+    groups = KeywordGroups({"metric": ["%", "retention"], "example": ["project", "launched"]})
+    assert groups.groups_in("we launched it and retention rose 5%") == {"metric", "example"}
+    assert groups.keywords_in("Retention only") == {"retention"}
+    assert groups.groups_in("nothing") == set()